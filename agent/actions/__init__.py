@@ -0,0 +1,20 @@
+"""
+Actions module initialization
+"""
+from .executor import ActionError, ActionExecutor, ActionResult, action_executor, method_allowed
+from .protocol import ActionRequest, build_actions_prompt, format_results, parse_actions, strip_actions
+from .selector import EndpointSelector
+
+__all__ = [
+    "ActionError",
+    "ActionExecutor",
+    "ActionResult",
+    "action_executor",
+    "method_allowed",
+    "ActionRequest",
+    "EndpointSelector",
+    "build_actions_prompt",
+    "format_results",
+    "parse_actions",
+    "strip_actions"
+]
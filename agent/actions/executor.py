@@ -0,0 +1,338 @@
+"""
+Action Executor - Agent'lara kayıtlı endpoint'leri çağıran paylaşımlı HTTP katmanı
+"""
+from dataclasses import dataclass
+from typing import Dict, Any, Optional, List, Tuple
+from urllib.parse import quote, urlsplit
+import asyncio
+import ipaddress
+import json
+import re
+import socket
+import string
+import time
+
+import httpx
+
+from core import metrics, tracing
+from core.cache import TTLCache
+from core.config import settings
+from core.logging import logger
+
+
+# Methods whose parameters travel in the query string
+QUERY_METHODS = {"GET", "DELETE", "HEAD"}
+METHODS = QUERY_METHODS | {"POST", "PUT", "PATCH"}
+# Methods callable without the endpoint's allow_mutation opt-in
+SAFE_METHODS = {"GET", "HEAD"}
+
+_NO_STORE_RE = re.compile(r"no-store|no-cache|private", re.IGNORECASE)
+_MAX_AGE_RE = re.compile(r"max-age=(\d+)", re.IGNORECASE)
+
+
+class ActionError(ValueError):
+    """Endpoint cannot be called with the given parameters"""
+
+
+@dataclass
+class ActionResult:
+    """Outcome of one endpoint call"""
+    name: str
+    method: str
+    url: str
+    endpoint_id: Optional[str] = None
+    status: Optional[int] = None
+    data: Any = None
+    error: Optional[str] = None
+    elapsed_ms: float = 0.0
+    cached: bool = False
+    truncated: bool = False
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None and self.status is not None and 200 <= self.status < 300
+
+    def summary(self) -> Dict[str, Any]:
+        """Call metadata without the payload, for API responses"""
+        return {
+            "endpoint_id": self.endpoint_id,
+            "name": self.name,
+            "method": self.method,
+            "status": self.status,
+            "ok": self.ok,
+            "cached": self.cached,
+            "elapsed_ms": self.elapsed_ms,
+            "error": self.error
+        }
+
+
+def method_allowed(endpoint: Dict[str, Any]) -> bool:
+    """GET / HEAD, or a mutating method the endpoint explicitly opted in to"""
+    return str(endpoint.get("method", "GET")).upper() in SAFE_METHODS or bool(endpoint.get("allow_mutation"))
+
+
+def build_request(endpoint: Dict[str, Any], params: Optional[Dict[str, Any]] = None) -> Tuple[str, str, Dict, Any]:
+    """
+    Resolve an endpoint definition and call parameters into a request
+
+    `{name}` placeholders in the URL are filled from params; the remaining
+    params become the query string (GET / DELETE / HEAD) or the JSON body.
+    Methods other than GET / HEAD need `allow_mutation` on the endpoint.
+
+    Returns:
+        (method, url, query params, json body or None)
+    """
+    method = str(endpoint.get("method", "GET")).upper()
+    if method not in METHODS:
+        raise ActionError(f"Unsupported method: {method}")
+    if not method_allowed(endpoint):
+        raise ActionError(f"{method} endpoints need allow_mutation")
+    params = dict(params or {})
+
+    template = endpoint.get("url", "")
+    fields = [name for _, name, _, _ in string.Formatter().parse(template) if name]
+    missing = [name for name in fields if name not in params]
+    if missing:
+        raise ActionError(f"Missing URL parameters: {', '.join(missing)}")
+    url = template.format(**{name: quote(str(params.pop(name)), safe="") for name in fields})
+
+    parts = urlsplit(url)
+    if parts.scheme not in ("http", "https") or not parts.hostname:
+        raise ActionError(f"Invalid endpoint URL: {url}")
+    allowed = [h.strip().lower() for h in settings.ACTIONS_ALLOWED_HOSTS.split(",") if h.strip()]
+    if allowed and parts.hostname.lower() not in allowed:
+        raise ActionError(f"Host not allowed: {parts.hostname}")
+
+    if method in QUERY_METHODS:
+        return method, url, params, None
+    return method, url, {}, params or None
+
+
+def is_public_address(address: str) -> bool:
+    """False for loopback, private (RFC 1918 / ULA), link-local (cloud metadata) and reserved ranges"""
+    ip = ipaddress.ip_address(address.split("%", 1)[0])
+    if isinstance(ip, ipaddress.IPv6Address) and ip.ipv4_mapped:
+        ip = ip.ipv4_mapped
+    return ip.is_global and not ip.is_multicast
+
+
+class ActionExecutor:
+    """
+    Invokes registered agent endpoints
+    - One shared httpx.AsyncClient: keep-alive connection pool per host
+    - Per-host concurrency limit so one slow tenant API cannot take all connections
+    - TTL + LRU cache for successful GETs (honours Cache-Control no-store / max-age);
+      identical GETs in flight at the same time share one request
+    - execute_many() runs the independent calls of one turn in parallel
+    - Hosts are resolved before the call and non-public addresses are refused;
+      the connection goes to the checked address so DNS cannot rebind it
+    """
+
+    def __init__(
+        self,
+        timeout: Optional[float] = None,
+        connect_timeout: Optional[float] = None,
+        max_connections: Optional[int] = None,
+        max_keepalive: Optional[int] = None,
+        per_host_concurrency: Optional[int] = None,
+        cache_ttl: Optional[float] = None,
+        cache_size: Optional[int] = None,
+        max_response_bytes: Optional[int] = None,
+        allow_private: Optional[bool] = None
+    ):
+        self.timeout = timeout or settings.ACTIONS_TIMEOUT
+        self.connect_timeout = connect_timeout or settings.ACTIONS_CONNECT_TIMEOUT
+        self.max_connections = max_connections or settings.ACTIONS_MAX_CONNECTIONS
+        self.max_keepalive = max_keepalive or settings.ACTIONS_MAX_KEEPALIVE
+        self.per_host_concurrency = per_host_concurrency or settings.ACTIONS_PER_HOST_CONCURRENCY
+        self.cache_ttl = settings.ACTIONS_CACHE_TTL if cache_ttl is None else cache_ttl
+        self.cache_size = cache_size or settings.ACTIONS_CACHE_SIZE
+        self.max_response_bytes = max_response_bytes or settings.ACTIONS_MAX_RESPONSE_BYTES
+        self.allow_private = settings.ACTIONS_ALLOW_PRIVATE_NETWORKS if allow_private is None else allow_private
+
+        self._client: Optional[httpx.AsyncClient] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._host_limits: Dict[str, asyncio.Semaphore] = {}
+        self._cache = TTLCache(self.cache_size, self.cache_ttl)
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    def _get_client(self) -> httpx.AsyncClient:
+        """Client bound to the running loop; connections cannot cross loops"""
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._loop is not loop:
+            self._client = httpx.AsyncClient(
+                timeout=httpx.Timeout(self.timeout, connect=self.connect_timeout),
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_keepalive,
+                    keepalive_expiry=30.0
+                ),
+                follow_redirects=False,
+                headers={"User-Agent": "compagent-actions/1.0"}
+            )
+            self._loop = loop
+            self._host_limits = {}
+            self._inflight = {}
+        return self._client
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def _resolve(self, url: str) -> Tuple[str, Dict[str, str], Dict[str, Any]]:
+        """
+        Pin the URL to a checked address of its host
+
+        Returns:
+            (url with the address as host, Host header, request extensions)
+        """
+        parts = urlsplit(url)
+        host = parts.hostname
+        port = parts.port or (443 if parts.scheme == "https" else 80)
+        try:
+            infos = await asyncio.get_running_loop().getaddrinfo(host, port, type=socket.SOCK_STREAM)
+        except socket.gaierror as e:
+            raise ActionError(f"Cannot resolve {host}: {e}")
+        addresses = [info[4][0] for info in infos]
+        if not addresses:
+            raise ActionError(f"Cannot resolve {host}")
+        if not self.allow_private and not all(is_public_address(address) for address in addresses):
+            raise ActionError(f"Host resolves to a non-public address: {host}")
+
+        address = addresses[0]
+        literal = f"[{address}]" if ":" in address else address
+        netloc = f"{literal}:{parts.port}" if parts.port else literal
+        pinned = parts._replace(netloc=netloc).geturl()
+        extensions = {"sni_hostname": host} if parts.scheme == "https" else {}
+        return pinned, {"Host": parts.netloc.rsplit("@", 1)[-1]}, extensions
+
+    def _store(self, key: str, result: ActionResult, cache_control: str):
+        if _NO_STORE_RE.search(cache_control):
+            return
+        ttl = self.cache_ttl
+        max_age = _MAX_AGE_RE.search(cache_control)
+        if max_age:
+            ttl = min(ttl, int(max_age.group(1)))
+        self._cache.set(key, result, ttl)
+
+    async def execute(
+        self,
+        endpoint: Dict[str, Any],
+        params: Optional[Dict[str, Any]] = None
+    ) -> ActionResult:
+        """
+        Call one endpoint; never raises, failures are reported in the result
+
+        Args:
+            endpoint: Stored endpoint ({"id", "name", "method", "url", ...})
+            params: URL placeholders plus query / body parameters
+        """
+        name = endpoint.get("name", "")
+        try:
+            method, url, query, body = build_request(endpoint, params)
+        except ActionError as e:
+            metrics.ACTION_REQUESTS.labels("invalid").inc()
+            return ActionResult(name, str(endpoint.get("method", "")).upper(), endpoint.get("url", ""),
+                                endpoint.get("id"), error=str(e))
+
+        if method != "GET" or self.cache_ttl <= 0:
+            return await self._send(endpoint, method, url, query, body)
+
+        key = str(httpx.URL(url, params=query))
+        cached = self._cache.get(key)
+        metrics.record_cache("action_get", cached is not None)
+        if cached is not None:
+            metrics.ACTION_REQUESTS.labels("cached").inc()
+            return ActionResult(**{**cached.__dict__, "endpoint_id": endpoint.get("id"), "name": name,
+                                   "cached": True, "elapsed_ms": 0.0})
+
+        self._get_client()
+        pending = self._inflight.get(key)
+        if pending is not None:
+            result = await asyncio.shield(pending)
+            return ActionResult(**{**result.__dict__, "endpoint_id": endpoint.get("id"), "name": name,
+                                   "cached": True})
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            result = await self._send(endpoint, method, url, query, body, cache_key=key)
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            future.exception()      # consumed here; waiters re-raise it
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+    async def _send(
+        self,
+        endpoint: Dict[str, Any],
+        method: str,
+        url: str,
+        query: Dict[str, Any],
+        body: Any,
+        cache_key: Optional[str] = None
+    ) -> ActionResult:
+        client = self._get_client()
+        host = urlsplit(url).netloc
+        limit = self._host_limits.setdefault(host, asyncio.Semaphore(self.per_host_concurrency))
+        result = ActionResult(endpoint.get("name", ""), method, url, endpoint.get("id"))
+
+        started = time.perf_counter()
+        try:
+            pinned, headers, extensions = await self._resolve(url)
+            async with limit:
+                with tracing.span("action", method=method, host=host):
+                    async with client.stream(method, pinned, params=query or None, json=body,
+                                             headers=headers, extensions=extensions) as response:
+                        data = bytearray()
+                        async for chunk in response.aiter_bytes():
+                            data.extend(chunk)
+                            if len(data) > self.max_response_bytes:
+                                result.truncated = True
+                                del data[self.max_response_bytes:]
+                                break
+            result.status = response.status_code
+            result.data = self._decode(bytes(data), response.headers.get("content-type", ""), result.truncated)
+            if not result.ok:
+                result.error = f"HTTP {response.status_code}"
+        except ActionError as e:
+            result.error = str(e)
+        except httpx.TimeoutException:
+            result.error = "timeout"
+        except httpx.HTTPError as e:
+            result.error = f"{type(e).__name__}: {e}"
+        result.elapsed_ms = round((time.perf_counter() - started) * 1000, 2)
+
+        outcome = "ok" if result.ok else ("timeout" if result.error == "timeout" else "error")
+        metrics.ACTION_REQUESTS.labels(outcome).inc()
+        metrics.ACTION_DURATION.labels(method).observe(result.elapsed_ms / 1000)
+        if result.ok and cache_key is not None:
+            self._store(cache_key, result, response.headers.get("cache-control", ""))
+        if not result.ok:
+            logger.warning(f"Action {result.name} ({method} {host}) failed: {result.error}")
+        return result
+
+    @staticmethod
+    def _decode(data: bytes, content_type: str, truncated: bool) -> Any:
+        text = data.decode("utf-8", errors="replace")
+        if "json" in content_type and not truncated:
+            try:
+                return json.loads(text)
+            except ValueError:
+                pass
+        return text
+
+    async def execute_many(
+        self,
+        calls: List[Tuple[Dict[str, Any], Optional[Dict[str, Any]]]]
+    ) -> List[ActionResult]:
+        """Run independent (endpoint, params) calls concurrently, results in call order"""
+        return list(await asyncio.gather(*(self.execute(endpoint, params) for endpoint, params in calls)))
+
+
+# Global instance
+action_executor = ActionExecutor()
@@ -0,0 +1,100 @@
+"""
+Action Protocol - LLM'in endpoint çağırması için prompt bölümü ve cevap ayrıştırma
+
+Model bir endpoint çağırmak istediğinde cevabında şu etiketi üretir:
+
+    <action name="Get order">{"order_id": "A-1001"}</action>
+
+Birden fazla etiket aynı turda paralel çalıştırılır; sonuçlar ikinci bir LLM
+çağrısına "Action results" olarak verilir ve nihai cevap oradan gelir.
+"""
+from dataclasses import dataclass
+from typing import Dict, Any, Optional, List
+import json
+import re
+
+from .executor import ActionResult
+
+
+_ACTION_RE = re.compile(r'<action\s+name\s*=\s*"([^"]+)"\s*>(.*?)</action>', re.DOTALL | re.IGNORECASE)
+
+
+@dataclass
+class ActionRequest:
+    """One <action> tag emitted by the model"""
+    name: str
+    params: Dict[str, Any]
+    error: Optional[str] = None
+
+
+def _clip(text: Any, max_chars: Optional[int]) -> str:
+    text = str(text)
+    if max_chars and len(text) > max_chars:
+        return text[:max_chars] + " ..."
+    return text
+
+
+def describe_endpoint(endpoint: Dict[str, Any], example_chars: Optional[int] = None) -> str:
+    """Prompt entry of one endpoint; examples are clipped to example_chars"""
+    lines = [f'- name: "{endpoint.get("name", "")}"',
+             f'  call: {str(endpoint.get("method", "GET")).upper()} {endpoint.get("url", "")}']
+    if endpoint.get("description"):
+        lines.append(f"  description: {endpoint['description']}")
+    if endpoint.get("request_example"):
+        lines.append(f"  request example: {_clip(endpoint['request_example'], example_chars)}")
+    if endpoint.get("response_example"):
+        lines.append(f"  response example: {_clip(endpoint['response_example'], example_chars)}")
+    return "\n".join(lines)
+
+
+def build_actions_prompt(
+    endpoints: List[Dict[str, Any]],
+    max_calls: int,
+    example_chars: Optional[int] = None
+) -> str:
+    """System prompt section listing the callable endpoints"""
+    listed = "\n".join(describe_endpoint(endpoint, example_chars) for endpoint in endpoints)
+    return f"""
+Actions:
+You can call these API endpoints to look up live data or perform tasks for the user:
+{listed}
+
+To call endpoints, reply with only action tags (at most {max_calls}), one per line:
+<action name="endpoint name">{{"parameter": "value"}}</action>
+URL placeholders like {{order_id}} must be given as parameters. Independent calls
+can be requested together. If no call is needed, answer normally without tags.
+"""
+
+
+def parse_actions(text: str) -> List[ActionRequest]:
+    """Action tags in a model response, in order"""
+    requests = []
+    for name, raw in _ACTION_RE.findall(text or ""):
+        raw = raw.strip()
+        try:
+            params = json.loads(raw) if raw else {}
+            if not isinstance(params, dict):
+                raise ValueError("parameters must be a JSON object")
+            requests.append(ActionRequest(name.strip(), params))
+        except ValueError as e:
+            requests.append(ActionRequest(name.strip(), {}, error=f"Invalid parameters: {e}"))
+    return requests
+
+
+def strip_actions(text: str) -> str:
+    """Model text without action tags"""
+    return _ACTION_RE.sub("", text or "").strip()
+
+
+def format_results(results: List[ActionResult], max_chars: int) -> str:
+    """Action results as the follow-up user message"""
+    blocks = []
+    for result in results:
+        if result.ok:
+            payload = result.data if isinstance(result.data, str) else json.dumps(result.data, ensure_ascii=False)
+            if len(payload) > max_chars:
+                payload = payload[:max_chars] + " ...(truncated)"
+            blocks.append(f'[{result.name}] {result.method} {result.url} -> {result.status}\n{payload}')
+        else:
+            blocks.append(f'[{result.name}] failed: {result.error}')
+    return "Action results:\n\n" + "\n\n".join(blocks)
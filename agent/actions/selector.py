@@ -0,0 +1,128 @@
+"""
+Endpoint Selector - her turda mesajla ilgili endpoint'leri seçen embedding index'i
+"""
+from typing import Dict, Any, Callable, List, Optional, Tuple
+import hashlib
+
+import numpy as np
+
+from core.config import settings
+from core.logging import logger
+from .protocol import describe_endpoint
+
+
+def endpoint_text(endpoint: Dict[str, Any], example_chars: Optional[int] = None) -> str:
+    """Text embedded for an endpoint: name, description and (clipped) examples"""
+    example_chars = example_chars or settings.ACTIONS_EXAMPLE_CHARS
+    parts = [str(endpoint.get("name") or ""), str(endpoint.get("description") or "")]
+    for key in ("request_example", "response_example"):
+        if endpoint.get(key):
+            parts.append(str(endpoint[key])[:example_chars])
+    return "\n".join(part for part in parts if part)
+
+
+def estimate_tokens(text: str) -> int:
+    return len(text) // 4 + 1
+
+
+class EndpointSelector:
+    """
+    Agent endpoint'leri için relevance index'i
+    - Endpoint metni (ad, açıklama, örnekler) eklenirken embed edilir;
+      vektörler agent başına endpoint id + içerik hash'i ile tutulur
+    - Eksik / değişmiş endpoint'ler seçim sırasında tek çağrıda embed edilir
+      (yeniden başlatma sonrası ilk tur, agent güncellemeleri)
+    - Tüm endpoint'ler sınırlara sığıyorsa embedding yapılmadan hepsi döner
+    """
+
+    def __init__(
+        self,
+        embed: Callable[..., List[List[float]]],
+        max_endpoints: Optional[int] = None,
+        token_budget: Optional[int] = None,
+        example_chars: Optional[int] = None
+    ):
+        self.embed = embed
+        self.max_endpoints = max_endpoints or settings.ACTIONS_MAX_ENDPOINTS
+        self.token_budget = token_budget or settings.ACTIONS_PROMPT_TOKENS
+        self.example_chars = example_chars or settings.ACTIONS_EXAMPLE_CHARS
+        self._vectors: Dict[str, Dict[str, Tuple[str, np.ndarray]]] = {}
+
+    def invalidate(self, agent_id: str):
+        """Drop the vectors of one agent"""
+        self._vectors.pop(agent_id, None)
+
+    def _key(self, endpoint: Dict[str, Any]) -> str:
+        return str(endpoint.get("id") or endpoint.get("name") or "")
+
+    def index(self, agent_id: str, endpoints: List[Dict[str, Any]]) -> int:
+        """
+        Embed endpoints whose text is new or changed
+
+        Returns:
+            Number of endpoints embedded
+        """
+        vectors = self._vectors.setdefault(agent_id, {})
+        pending = []
+        for endpoint in endpoints:
+            text = endpoint_text(endpoint, self.example_chars)
+            digest = hashlib.sha1(text.encode("utf-8")).hexdigest()
+            cached = vectors.get(self._key(endpoint))
+            if cached is None or cached[0] != digest:
+                pending.append((self._key(endpoint), digest, text))
+        if not pending:
+            return 0
+
+        embeddings = np.asarray(self.embed([text for _, _, text in pending], operation="endpoint"), dtype=np.float32)
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        embeddings /= np.where(norms == 0, 1.0, norms)
+        for (key, digest, _), vector in zip(pending, embeddings):
+            vectors[key] = (digest, vector)
+        return len(pending)
+
+    def select(self, agent_id: str, message: str, endpoints: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Endpoints to offer for one turn
+
+        Ranked by cosine similarity to the message, then added greedily while
+        their prompt entries fit `token_budget`; at most `max_endpoints`.
+
+        Args:
+            agent_id: Agent owning the endpoints
+            message: User message of the turn
+            endpoints: All endpoints registered on the agent
+
+        Returns:
+            Selected endpoints, most relevant first
+        """
+        if not endpoints:
+            return []
+        entries = [describe_endpoint(endpoint, self.example_chars) for endpoint in endpoints]
+        costs = [estimate_tokens(entry) for entry in entries]
+        if len(endpoints) <= self.max_endpoints and sum(costs) <= self.token_budget:
+            return list(endpoints)
+
+        try:
+            self.index(agent_id, endpoints)
+            query = np.asarray(self.embed([message], operation="query")[0], dtype=np.float32)
+        except Exception as e:
+            # Without embeddings keep registration order; the budget still applies
+            logger.warning(f"Endpoint ranking failed for agent {agent_id}: {e}")
+            order = list(range(len(endpoints)))
+        else:
+            vectors = self._vectors[agent_id]
+            keys = {self._key(endpoint) for endpoint in endpoints}
+            for stale in [key for key in vectors if key not in keys]:
+                del vectors[stale]
+            matrix = np.stack([vectors[self._key(endpoint)][1] for endpoint in endpoints])
+            order = np.argsort(-(matrix @ query), kind="stable").tolist()
+
+        selected, used = [], 0
+        for i in order:
+            if used + costs[i] > self.token_budget:
+                continue
+            selected.append(endpoints[i])
+            used += costs[i]
+            if len(selected) >= self.max_endpoints:
+                break
+        return selected
@@ -0,0 +1,17 @@
+"""
+Analytics module initialization
+"""
+from .events import InteractionEvent
+from .event_store import EventStore, event_store
+from .recorder import track_interaction, record_usage, record_confidence, record_cache_hit, record_error
+
+__all__ = [
+    "InteractionEvent",
+    "EventStore",
+    "event_store",
+    "track_interaction",
+    "record_usage",
+    "record_confidence",
+    "record_cache_hit",
+    "record_error"
+]
@@ -0,0 +1,165 @@
+"""
+Event Store - Append-only analytics event storage on SQLite
+"""
+from typing import Dict, Any, Optional, List, Deque
+from collections import deque
+from dataclasses import fields
+from pathlib import Path
+import sqlite3
+import threading
+
+from core.config import settings
+from core.logging import logger
+from .events import InteractionEvent
+from .heavy_hitters import QuestionTracker
+from .rollups import RollupEngine
+
+
+# Caller identity is only sketched; question text is kept only as the
+# normalized top-K entries of the top-questions sketch (top_questions table)
+TRANSIENT_FIELDS = {"user_id", "question"}
+COLUMNS = [f.name for f in fields(InteractionEvent) if f.name not in TRANSIENT_FIELDS]
+
+
+class EventStore:
+    """
+    Non-blocking, append-only interaction event store
+    - record() only appends to an in-memory buffer
+    - A background thread flushes batches into an indexed SQLite table
+    - Range summaries merge the rollup buckets covering the range, so counts,
+      averages and distinct sessions / users describe the same events
+    - Each flushed batch is also folded into time-bucketed rollups
+      and per-agent top-question sketches
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        flush_interval: float = 1.0,
+        batch_size: int = 500
+    ):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+
+        self._buffer: Deque[InteractionEvent] = deque()
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._init_schema()
+        self.rollups = RollupEngine(self._conn, self._lock)
+        self.questions = QuestionTracker(
+            self._conn, self._lock, settings.ANALYTICS_TOP_QUESTIONS_CAPACITY
+        )
+        self._backfill_rollups()
+
+        self._thread = threading.Thread(target=self._run, name="analytics-flush", daemon=True)
+        self._thread.start()
+        logger.info(f"EventStore initialized at {self.db_path}")
+
+    def _init_schema(self):
+        """Create the events table and its indexes"""
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS events (
+                    kind TEXT NOT NULL,
+                    agent_id TEXT,
+                    session_id TEXT,
+                    ts REAL NOT NULL,
+                    latency_ms REAL NOT NULL,
+                    prompt_tokens INTEGER NOT NULL,
+                    completion_tokens INTEGER NOT NULL,
+                    confidence REAL,
+                    cache_hit INTEGER NOT NULL,
+                    error INTEGER NOT NULL
+                )
+            """)
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_events_ts ON events (ts)")
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_events_agent_ts ON events (agent_id, ts)"
+            )
+            self._conn.commit()
+
+    def _backfill_rollups(self):
+        """Build rollups from existing events the first time they are enabled"""
+        with self._lock:
+            has_rollups = self._conn.execute("SELECT 1 FROM rollups LIMIT 1").fetchone()
+            if has_rollups:
+                return
+            cursor = self._conn.execute(f"SELECT {', '.join(COLUMNS)} FROM events")
+            while True:
+                rows = cursor.fetchmany(10_000)
+                if not rows:
+                    break
+                self.rollups.add_events(InteractionEvent(*row) for row in rows)
+            self.rollups.persist()
+            self._conn.commit()
+
+    def record(self, event: InteractionEvent):
+        """Buffer an event; never blocks on I/O"""
+        self._buffer.append(event)
+        if len(self._buffer) >= self.batch_size:
+            self._wakeup.set()
+
+    def flush(self):
+        """Write all buffered events to the database"""
+        with self._lock:
+            batch: List[InteractionEvent] = []
+            while self._buffer:
+                batch.append(self._buffer.popleft())
+            if not batch:
+                return
+            placeholders = ", ".join("?" for _ in COLUMNS)
+            self._conn.executemany(
+                f"INSERT INTO events ({', '.join(COLUMNS)}) VALUES ({placeholders})",
+                [tuple(getattr(event, c) for c in COLUMNS) for event in batch]
+            )
+            self.rollups.add_events(batch)
+            self.rollups.persist()
+            self.questions.add_events(batch)
+            self.questions.persist()
+            self._conn.commit()
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Error flushing analytics events: {e}")
+
+    def summarize(
+        self,
+        start_ts: float,
+        end_ts: float,
+        kinds: Optional[List[str]] = None,
+        agent_id: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Aggregate events in [start_ts, end_ts)
+
+        Args:
+            start_ts: Range start (unix seconds)
+            end_ts: Range end (unix seconds)
+            kinds: Event kinds to include (default: all)
+            agent_id: Restrict to one agent / product
+
+        Returns:
+            Counts, averages and token totals for the range. Every figure
+            comes from the same rollup buckets, so edges are aligned to the
+            minute (or the coarser bucket once minutes have aged out).
+        """
+        self.flush()
+        return self.rollups.query(start_ts, end_ts, agent_id, kinds).summary()
+
+
+# Global instance
+event_store = EventStore(
+    settings.ANALYTICS_DB_PATH,
+    flush_interval=settings.ANALYTICS_FLUSH_INTERVAL,
+    batch_size=settings.ANALYTICS_BATCH_SIZE
+)
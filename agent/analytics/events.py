@@ -0,0 +1,31 @@
+"""
+Analytics events - Etkileşim olay modeli
+"""
+from typing import Optional
+from dataclasses import dataclass, field
+import time
+
+
+@dataclass
+class InteractionEvent:
+    """
+    One interaction with the platform
+    - kind: chat, agent_chat, configure or upload
+    - agent_id: agent id, or product id for product chat / configure
+    - user_id: caller identity (API key or client address), only hashed into
+      distinct-user sketches and never stored
+    - question: user message; not stored with the event, but its normalized
+      form is kept (and persisted) while it is among the agent's top-K questions
+    """
+    kind: str
+    agent_id: Optional[str] = None
+    session_id: Optional[str] = None
+    ts: float = field(default_factory=time.time)
+    latency_ms: float = 0.0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    confidence: Optional[float] = None
+    cache_hit: bool = False
+    error: bool = False
+    user_id: Optional[str] = field(default=None, repr=False)
+    question: Optional[str] = field(default=None, repr=False)
@@ -0,0 +1,177 @@
+"""
+Heavy hitters - Space-Saving ile en sık sorulan sorular
+"""
+from typing import Dict, Any, List, Tuple, Iterable, Set
+import heapq
+import json
+import re
+import sqlite3
+import threading
+
+from .events import InteractionEvent
+
+
+_PUNCTUATION_RE = re.compile(r"[^\w\s]", re.UNICODE)
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_question(text: str, max_length: int = 200) -> str:
+    """Casefold, strip punctuation and collapse whitespace"""
+    text = _PUNCTUATION_RE.sub(" ", text.casefold())
+    return _WHITESPACE_RE.sub(" ", text).strip()[:max_length]
+
+
+class SpaceSaving:
+    """
+    Space-Saving top-K frequency sketch
+    - Keeps at most `capacity` counters regardless of stream length
+    - A counter overestimates its item by at most its recorded error
+    - Every item with true frequency > total / capacity is guaranteed to be tracked
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.total = 0
+        self._counters: Dict[str, List[int]] = {}      # item -> [count, error]
+        self._heap: List[Tuple[int, str]] = []         # lazy min-heap of (count, item)
+
+    def add(self, item: str, weight: int = 1):
+        self.total += weight
+        counter = self._counters.get(item)
+
+        if counter is None:
+            if len(self._counters) < self.capacity:
+                counter = self._counters[item] = [0, 0]
+            else:
+                # Replace the minimum counter; the new item inherits its count as error
+                min_count, min_item = self._pop_min()
+                del self._counters[min_item]
+                counter = self._counters[item] = [min_count, min_count]
+
+        counter[0] += weight
+        heapq.heappush(self._heap, (counter[0], item))
+        if len(self._heap) > 4 * self.capacity:
+            self._heap = [(c[0], i) for i, c in self._counters.items()]
+            heapq.heapify(self._heap)
+
+    def _pop_min(self) -> Tuple[int, str]:
+        """Pop the live minimum, discarding stale heap entries"""
+        while True:
+            count, item = heapq.heappop(self._heap)
+            counter = self._counters.get(item)
+            if counter is not None and counter[0] == count:
+                return count, item
+
+    def top(self, k: int) -> List[Dict[str, Any]]:
+        """Top-k items with count and error bounds"""
+        ranked = heapq.nlargest(k, self._counters.items(), key=lambda kv: kv[1][0])
+        return [
+            {
+                "question": item,
+                "count": count,
+                "error": error,
+                "guaranteed_count": count - error
+            }
+            for item, (count, error) in ranked
+        ]
+
+    @property
+    def max_error(self) -> float:
+        """Upper bound on the overestimate of any counter"""
+        return self.total / self.capacity if self.capacity else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"capacity": self.capacity, "total": self.total, "counters": self._counters}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "SpaceSaving":
+        sketch = cls(data["capacity"])
+        sketch.total = data["total"]
+        sketch._counters = {k: list(v) for k, v in data["counters"].items()}
+        sketch._heap = [(c[0], i) for i, c in sketch._counters.items()]
+        heapq.heapify(sketch._heap)
+        return sketch
+
+
+class QuestionTracker:
+    """
+    Streaming top questions per agent / product
+    - One Space-Saving sketch per agent, updated from flushed chat events
+    - Sketches of changed agents are persisted next to the raw events; this
+      stores the normalized text of the tracked questions
+    """
+
+    def __init__(self, conn: sqlite3.Connection, lock: threading.Lock, capacity: int):
+        self._conn = conn
+        self._lock = lock
+        self.capacity = capacity
+        self._sketches: Dict[str, SpaceSaving] = {}
+        self._dirty: Set[str] = set()
+        self._init_schema()
+        self._load()
+
+    def _init_schema(self):
+        with self._lock:
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS top_questions (
+                    agent_id TEXT PRIMARY KEY,
+                    data TEXT NOT NULL
+                )
+            """)
+            self._conn.commit()
+
+    def _load(self):
+        with self._lock:
+            rows = self._conn.execute("SELECT agent_id, data FROM top_questions").fetchall()
+        for agent_id, data in rows:
+            self._sketches[agent_id] = SpaceSaving.from_dict(json.loads(data))
+
+    def add_events(self, events: Iterable[InteractionEvent]):
+        """Count the questions of a batch of events (caller holds the lock)"""
+        for event in events:
+            if not event.question or not event.agent_id:
+                continue
+            question = normalize_question(event.question)
+            if not question:
+                continue
+            sketch = self._sketches.get(event.agent_id)
+            if sketch is None:
+                sketch = self._sketches[event.agent_id] = SpaceSaving(self.capacity)
+            sketch.add(question)
+            self._dirty.add(event.agent_id)
+
+    def persist(self):
+        """Upsert sketches that changed (caller holds the lock)"""
+        if not self._dirty:
+            return
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO top_questions (agent_id, data) VALUES (?, ?)",
+            [(a, json.dumps(self._sketches[a].to_dict())) for a in self._dirty]
+        )
+        self._dirty.clear()
+
+    def top(self, agent_id: str, k: int = 10) -> Dict[str, Any]:
+        """
+        Most frequent normalized questions of an agent
+
+        Returns:
+            Items with count / error, the stream total and the global error bound
+        """
+        with self._lock:
+            sketch = self._sketches.get(agent_id)
+            if sketch is None:
+                return {"agent_id": agent_id, "total": 0, "max_error": 0.0, "items": []}
+            return {
+                "agent_id": agent_id,
+                "total": sketch.total,
+                "max_error": round(sketch.max_error, 2),
+                "items": sketch.top(k)
+            }
+
+    def faq_candidates(self, agent_id: str, min_count: int = 5, k: int = 20) -> List[str]:
+        """Questions asked at least min_count times (by guaranteed count)"""
+        return [
+            item["question"]
+            for item in self.top(agent_id, k)["items"]
+            if item["guaranteed_count"] >= min_count
+        ]
@@ -0,0 +1,158 @@
+"""
+HyperLogLog - Birleştirilebilir tekil sayım (distinct count) sketch'i
+"""
+from typing import Dict, Any, Optional
+import base64
+import hashlib
+import math
+import zlib
+
+import numpy as np
+
+
+class HyperLogLog:
+    """
+    Mergeable distinct-count sketch
+    - 2^precision registers, ~1.04 / sqrt(m) standard error
+      (0.8% at p=14, 3.3% at p=10)
+    - Starts sparse (register -> rank dict) and turns dense (uint8 array)
+      once the dict would outweigh the registers
+    - Merging is a per-register max (np.maximum), so any window is a union of
+      buckets; sketches of different precision merge at the lower one
+    """
+
+    PRECISION = 14
+    _INVERSE_POWERS = np.array([2.0 ** -r for r in range(66)])
+
+    def __init__(self, precision: int = PRECISION):
+        if not 4 <= precision <= 16:
+            raise ValueError(f"Unsupported HyperLogLog precision: {precision}")
+        self.precision = precision
+        self.m = 1 << precision
+        # A dict entry costs ~64x a register byte
+        self.sparse_limit = max(16, self.m >> 6)
+        self._sparse: Optional[Dict[int, int]] = {}
+        self._dense: Optional[np.ndarray] = None
+
+    @staticmethod
+    def _hash(value: str) -> int:
+        return int.from_bytes(
+            hashlib.blake2b(value.encode("utf-8"), digest_size=8).digest(), "big"
+        )
+
+    def add(self, value: str):
+        h = self._hash(value)
+        index = h >> (64 - self.precision)
+        remainder = h & ((1 << (64 - self.precision)) - 1)
+        rank = (64 - self.precision) - remainder.bit_length() + 1
+        self._set(index, rank)
+
+    def _set(self, index: int, rank: int):
+        if self._dense is not None:
+            if rank > self._dense[index]:
+                self._dense[index] = rank
+            return
+        if rank > self._sparse.get(index, 0):
+            self._sparse[index] = rank
+            if len(self._sparse) > self.sparse_limit:
+                self._densify()
+
+    def _densify(self):
+        dense = np.zeros(self.m, dtype=np.uint8)
+        if self._sparse:
+            dense[list(self._sparse)] = list(self._sparse.values())
+        self._dense = dense
+        self._sparse = None
+
+    def reduced(self, precision: int) -> "HyperLogLog":
+        """
+        The same sketch at a lower precision
+
+        The index bits that are dropped become the leading bits of the
+        remainder: a register keeps its rank shifted by the dropped width when
+        they are all zero, otherwise the rank is read from those bits.
+        """
+        if precision > self.precision:
+            raise ValueError("Cannot raise HyperLogLog precision")
+        if precision == self.precision:
+            return self
+        shift = self.precision - precision
+        if self._dense is not None:
+            indexes = np.flatnonzero(self._dense)
+            ranks = self._dense[indexes].astype(np.int64)
+        else:
+            indexes = np.fromiter(self._sparse, dtype=np.int64, count=len(self._sparse))
+            ranks = np.fromiter(self._sparse.values(), dtype=np.int64, count=len(self._sparse))
+        low = indexes & ((1 << shift) - 1)
+        # bit_length of the dropped bits, vectorized
+        bits = np.where(low > 0, np.floor(np.log2(np.maximum(low, 1))).astype(np.int64) + 1, 0)
+        new_ranks = np.where(low > 0, shift - bits + 1, ranks + shift)
+
+        sketch = HyperLogLog(precision)
+        sketch._densify()
+        np.maximum.at(sketch._dense, indexes >> shift, new_ranks.astype(np.uint8))
+        if np.count_nonzero(sketch._dense) <= sketch.sparse_limit:
+            nonzero = np.flatnonzero(sketch._dense)
+            sketch._sparse = dict(zip(nonzero.tolist(), sketch._dense[nonzero].tolist()))
+            sketch._dense = None
+        return sketch
+
+    def _adopt(self, other: "HyperLogLog"):
+        self.precision, self.m, self.sparse_limit = other.precision, other.m, other.sparse_limit
+        self._sparse, self._dense = other._sparse, other._dense
+
+    def merge(self, other: "HyperLogLog"):
+        if other.precision < self.precision:
+            self._adopt(self.reduced(other.precision))
+        elif other.precision > self.precision:
+            other = other.reduced(self.precision)
+
+        if other._dense is not None:
+            if self._dense is None:
+                self._densify()
+            np.maximum(self._dense, other._dense, out=self._dense)
+        else:
+            for index, rank in other._sparse.items():
+                self._set(index, rank)
+
+    def __len__(self) -> int:
+        return self.count()
+
+    def count(self) -> int:
+        """Estimated number of distinct values added"""
+        m = self.m
+        if self._dense is None:
+            if not self._sparse:
+                return 0
+            # Few registers set: linear counting is near exact
+            return round(m * math.log(m / (m - len(self._sparse))))
+
+        zeros = m - int(np.count_nonzero(self._dense))
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / float(self._INVERSE_POWERS[self._dense].sum())
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * math.log(m / zeros)
+        return round(estimate)
+
+    def to_dict(self) -> Dict[str, Any]:
+        if self._dense is None:
+            return {"p": self.precision, "sparse": self._sparse}
+        packed = base64.b64encode(zlib.compress(self._dense.tobytes())).decode("ascii")
+        return {"p": self.precision, "dense": packed}
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]], precision: int = PRECISION) -> "HyperLogLog":
+        """
+        Sketch from to_dict() output; `precision` is used for empty data.
+        Sketches stored before precision was recorded are p=14.
+        """
+        if not data:
+            return cls(precision)
+        sketch = cls(data.get("p", cls.PRECISION))
+        if "dense" in data:
+            raw = zlib.decompress(base64.b64decode(data["dense"]))
+            sketch._dense = np.frombuffer(raw, dtype=np.uint8).copy()
+            sketch._sparse = None
+        else:
+            sketch._sparse = {int(k): v for k, v in data["sparse"].items()}
+        return sketch
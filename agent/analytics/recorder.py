@@ -0,0 +1,80 @@
+"""
+Interaction recorder - Request yolundan analytics olayı toplama
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Iterator, Optional
+import time
+
+from .events import InteractionEvent
+from .event_store import event_store
+
+
+_current_event: ContextVar[Optional[InteractionEvent]] = ContextVar(
+    "compagent_interaction", default=None
+)
+
+
+@contextmanager
+def track_interaction(
+    kind: str,
+    agent_id: Optional[str] = None,
+    session_id: Optional[str] = None,
+    question: Optional[str] = None,
+    user_id: Optional[str] = None
+) -> Iterator[InteractionEvent]:
+    """
+    Record one interaction event around a request handler
+
+    Latency is measured here; LLM usage and errors reported further down
+    the call stack (record_usage / record_error) are added to the same event.
+    """
+    event = InteractionEvent(
+        kind=kind,
+        agent_id=agent_id,
+        session_id=session_id,
+        question=question,
+        user_id=user_id
+    )
+    token = _current_event.set(event)
+    started_at = time.perf_counter()
+    try:
+        yield event
+    except Exception:
+        event.error = True
+        raise
+    finally:
+        event.latency_ms = (time.perf_counter() - started_at) * 1000
+        _current_event.reset(token)
+        event_store.record(event)
+
+
+def record_usage(response: Any):
+    """Add token usage of an LLM response to the current interaction"""
+    event = _current_event.get()
+    usage = getattr(response, "usage", None)
+    if event is None or usage is None:
+        return
+    event.prompt_tokens += getattr(usage, "prompt_tokens", 0) or 0
+    event.completion_tokens += getattr(usage, "completion_tokens", 0) or 0
+
+
+def record_confidence(confidence: float):
+    """Set the answer confidence of the current interaction"""
+    event = _current_event.get()
+    if event is not None:
+        event.confidence = confidence
+
+
+def record_cache_hit():
+    """Mark the current interaction as answered without an LLM call"""
+    event = _current_event.get()
+    if event is not None:
+        event.cache_hit = True
+
+
+def record_error():
+    """Mark the current interaction as failed"""
+    event = _current_event.get()
+    if event is not None:
+        event.error = True
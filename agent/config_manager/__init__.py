@@ -2,5 +2,6 @@
 Config Manager module initialization
 """
 from .config_handler import ConfigHandler
+from .pricing import PriceTable, PricingCatalog, pricing_catalog
 
-__all__ = ["ConfigHandler"]
+__all__ = ["ConfigHandler", "PriceTable", "PricingCatalog", "pricing_catalog"]
@@ -2,9 +2,19 @@
 Config Handler - Ürün yapılandırma yöneticisi
 """
 from typing import Dict, Any, Optional, List
-from groq import Groq
+import asyncio
+import copy
+import hashlib
+import json
+
+from core import metrics
+from core.cache import TTLCache
 from core.config import settings
 from core.logging import logger
+from agent.analytics import record_error
+from agent.llm import ModelRouter, model_router
+from agent.scheduler import Priority
+from .pricing import PricingCatalog, pricing_catalog
 
 
 class ConfigHandler:
@@ -13,17 +23,45 @@ class ConfigHandler:
     - Kullanıcı gereksinimlerini analiz eder
     - Optimal yapılandırma önerir
     - Kurulum adımları oluşturur
+    - Aynı girdiler için yapılandırma TTL + LRU önbellekten döner; AI
+      önerileri ayrı önbellekte tutulur, fiyat değişikliği onları geçersiz kılmaz
     """
     
-    def __init__(self):
-        self.client = Groq(api_key=settings.GROQ_API_KEY)
-        logger.info("ConfigHandler initialized with Groq")
+    def __init__(self, router: Optional[ModelRouter] = None, pricing: Optional[PricingCatalog] = None):
+        self.router = router or model_router
+        self.pricing = pricing or pricing_catalog
+        self._configurations = TTLCache(settings.CONFIG_CACHE_SIZE, settings.CONFIG_CACHE_TTL)
+        self._recommendations = TTLCache(settings.CONFIG_AI_CACHE_SIZE, settings.CONFIG_AI_CACHE_TTL)
+        self._inflight: Dict[str, asyncio.Future] = {}
+        logger.info("ConfigHandler initialized with model router")
+    
+    @property
+    def pricing_version(self) -> str:
+        """Catalog version; part of the configuration cache key"""
+        return self.pricing.version
+    
+    @staticmethod
+    def cache_key(*parts: Any) -> str:
+        """
+        sha256 of the canonical JSON of parts
+        
+        Dict keys are sorted, so wizard inputs sent in any key order share an
+        entry; list order is kept because it shows up in the output.
+        """
+        canonical = json.dumps(parts, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+    
+    def clear_cache(self):
+        """Drop memoized configurations and recommendations"""
+        self._configurations.clear()
+        self._recommendations.clear()
     
     async def generate_configuration(
         self,
         product_id: str,
         user_inputs: Dict[str, Any],
-        requirements: Optional[List[str]] = None
+        requirements: Optional[List[str]] = None,
+        priority: Priority = Priority.ANALYSIS
     ) -> Dict[str, Any]:
         """
         Kullanıcı girdilerine göre yapılandırma oluştur
@@ -32,28 +70,44 @@ class ConfigHandler:
             product_id: Ürün ID'si
             user_inputs: Kullanıcı girdi verileri
             requirements: Ek gereksinimler
+            priority: AI önerileri için scheduler önceliği
             
         Returns:
             Yapılandırma detayları
         """
         try:
+            key = self.cache_key(product_id, user_inputs, requirements or [], self.pricing_version)
+            cached = self._configurations.get(key)
+            metrics.record_cache("configuration", cached is not None)
+            if cached is not None:
+                # Callers own the returned dict
+                return copy.deepcopy(cached)
+            
             # Build configuration based on inputs
             config = {
                 "settings": self._build_settings(user_inputs),
                 "setup_steps": self._generate_setup_steps(user_inputs),
-                "pricing": self._calculate_pricing(user_inputs),
+                "pricing": self._calculate_pricing(user_inputs, product_id),
                 "integrations": self._determine_integrations(user_inputs)
             }
+            cacheable = True
             
             # Enhance with AI if requirements provided
             if requirements:
                 ai_enhancements = await self._get_ai_recommendations(
                     product_id,
                     user_inputs,
-                    requirements
+                    requirements,
+                    priority
                 )
+                if ai_enhancements is None:
+                    # Fallback text is returned but never memoized
+                    ai_enhancements = "AI önerileri şu anda kullanılamıyor."
+                    cacheable = False
                 config["ai_recommendations"] = ai_enhancements
             
+            if cacheable:
+                self._configurations.set(key, copy.deepcopy(config))
             logger.info(f"Generated configuration for product: {product_id}")
             return config
             
@@ -64,7 +118,8 @@ class ConfigHandler:
     async def analyze_requirements(
         self,
         product_id: str,
-        requirements: List[str]
+        requirements: List[str],
+        priority: Priority = Priority.ANALYSIS
     ) -> Dict[str, Any]:
         """
         Müşteri gereksinimlerini analiz et
@@ -72,6 +127,7 @@ class ConfigHandler:
         Args:
             product_id: Ürün ID'si
             requirements: Gereksinim listesi
+            priority: Scheduler önceliği
             
         Returns:
             Analiz ve öneriler
@@ -80,9 +136,9 @@ class ConfigHandler:
             # Prepare prompt for AI analysis
             prompt = self._build_requirements_prompt(requirements)
             
-            response = self.client.chat.completions.create(
-                model=settings.GROQ_MODEL,
-                messages=[
+            completion = await self.router.complete(
+                "analysis",
+                [
                     {
                         "role": "system",
                         "content": "Sen bir SaaS ürün yapılandırma uzmanısın. Müşteri gereksinimlerini analiz ederek en uygun yapılandırmayı öneriyorsun."
@@ -92,11 +148,14 @@ class ConfigHandler:
                         "content": prompt
                     }
                 ],
+                query=prompt,
+                agent_id=product_id,
+                priority=priority,
                 temperature=0.5,
                 max_tokens=800
             )
             
-            analysis = response.choices[0].message.content
+            analysis = completion.text
             
             return {
                 "analysis": analysis,
@@ -156,30 +215,9 @@ class ConfigHandler:
         
         return steps
     
-    def _calculate_pricing(self, user_inputs: Dict[str, Any]) -> float:
-        """Tahmini fiyatlandırma hesapla"""
-        base_price = 99.0  # Base monthly price
-        
-        # Scale multiplier
-        scale = user_inputs.get("scale", "standard")
-        scale_multiplier = {
-            "small": 0.5,
-            "standard": 1.0,
-            "large": 2.0,
-            "enterprise": 5.0
-        }.get(scale, 1.0)
-        
-        # Feature count multiplier
-        features = user_inputs.get("features", [])
-        feature_cost = len(features) * 10.0
-        
-        # Integration multiplier
-        integrations = user_inputs.get("api_integrations", [])
-        integration_cost = len(integrations) * 20.0
-        
-        total = (base_price * scale_multiplier) + feature_cost + integration_cost
-        
-        return round(total, 2)
+    def _calculate_pricing(self, user_inputs: Dict[str, Any], product_id: Optional[str] = None) -> float:
+        """Tahmini fiyatlandırma hesapla (ürünün katalog tablosuyla)"""
+        return self.pricing.quote(product_id, user_inputs)
     
     def _determine_integrations(self, user_inputs: Dict[str, Any]) -> List[Dict[str, str]]:
         """Gerekli entegrasyonları belirle"""
@@ -207,9 +245,49 @@ class ConfigHandler:
         self,
         product_id: str,
         user_inputs: Dict[str, Any],
-        requirements: List[str]
-    ) -> str:
-        """AI destekli öneriler al"""
+        requirements: List[str],
+        priority: Priority = Priority.ANALYSIS
+    ) -> Optional[str]:
+        """
+        AI destekli öneriler al
+        
+        Memoized independently of pricing; concurrent identical requests
+        share one LLM call, scheduled at the first caller's priority.
+        None when the call failed.
+        """
+        key = self.cache_key(product_id, user_inputs, requirements)
+        cached = self._recommendations.get(key)
+        metrics.record_cache("configuration_ai", cached is not None)
+        if cached is not None:
+            return cached
+        
+        pending = self._inflight.get(key)
+        if pending is not None:
+            return await asyncio.shield(pending)
+        
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            text = await self._request_ai_recommendations(product_id, user_inputs, requirements, priority)
+            if text is not None:
+                self._recommendations.set(key, text)
+            future.set_result(text)
+            return text
+        except BaseException as e:
+            future.set_exception(e)
+            future.exception()      # consumed here; waiters re-raise it
+            raise
+        finally:
+            self._inflight.pop(key, None)
+    
+    async def _request_ai_recommendations(
+        self,
+        product_id: str,
+        user_inputs: Dict[str, Any],
+        requirements: List[str],
+        priority: Priority
+    ) -> Optional[str]:
+        """Upstream call behind _get_ai_recommendations"""
         try:
             prompt = f"""
 Müşteri Girdileri: {user_inputs}
@@ -219,21 +297,25 @@ Bu bilgilere göre en uygun yapılandırma önerilerini liste halinde ver.
 Her öneri için kısa açıklama ekle.
 """
             
-            response = self.client.chat.completions.create(
-                model=settings.GROQ_MODEL,
-                messages=[
+            completion = await self.router.complete(
+                "recommendation",
+                [
                     {"role": "system", "content": "SaaS yapılandırma uzmanısın."},
                     {"role": "user", "content": prompt}
                 ],
+                query=prompt,
+                agent_id=product_id,
+                priority=priority,
                 temperature=0.6,
                 max_tokens=400
             )
             
-            return response.choices[0].message.content
+            return completion.text
             
         except Exception as e:
             logger.error(f"Error getting AI recommendations: {str(e)}")
-            return "AI önerileri şu anda kullanılamıyor."
+            record_error()
+            return None
     
     def _build_requirements_prompt(self, requirements: List[str]) -> str:
         """Gereksinim analizi için prompt oluştur"""
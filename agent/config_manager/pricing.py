@@ -0,0 +1,207 @@
+"""
+Pricing - ürün bazlı fiyat kataloğu ve vektörize toplu teklif hesaplama
+
+Fiyat = base_price * scale çarpanı + özellik ücretleri + entegrasyon ücretleri.
+Katalog PRICING_CATALOG_PATH'teki JSON dosyasından okunur; dosya yoksa
+yerleşik varsayılan tablo kullanılır. Ürün kayıtları varsayılan tablonun
+yalnızca değişen alanlarını içerir (fiyat map'leri varsayılanla birleştirilir):
+
+    {
+      "default": {"base_price": 99.0, "scale_multipliers": {"small": 0.5, ...}},
+      "products": {"prod_123": {"base_price": 149.0, "feature_prices": {"sso": 40.0}}}
+    }
+"""
+from dataclasses import dataclass, field, asdict
+from pathlib import Path
+from typing import Dict, Any, Optional, List, Sequence, Tuple
+import hashlib
+import json
+
+import numpy as np
+
+from core.config import settings
+from core.logging import logger
+
+
+DEFAULT_TABLE: Dict[str, Any] = {
+    "currency": "USD",
+    "base_price": 99.0,
+    "scale_multipliers": {"small": 0.5, "standard": 1.0, "large": 2.0, "enterprise": 5.0},
+    "default_scale_multiplier": 1.0,
+    "feature_price": 10.0,
+    "feature_prices": {},
+    "integration_price": 20.0,
+    "integration_prices": {}
+}
+
+
+def _factorize(values: Sequence[str]) -> Tuple[np.ndarray, List[str]]:
+    """Integer codes of values and the distinct values in first-seen order"""
+    index: Dict[str, int] = {}
+    codes = np.fromiter(
+        (index.setdefault(value, len(index)) for value in values), dtype=np.intp, count=len(values)
+    )
+    return codes, list(index)
+
+
+def _cents(amount: float) -> int:
+    """Catalog price in integer cents"""
+    return int(round(float(amount) * 100))
+
+
+def round_cents(cents: Any) -> Any:
+    """
+    Fractional cents rounded half up, as currency amounts
+
+    Prices are summed in cents, so only base_price * scale multiplier can be
+    fractional. The scalar and vectorized paths both round here and therefore
+    agree on half cents.
+    """
+    return np.floor(np.asarray(cents, dtype=np.float64) + 0.5) / 100
+
+
+@dataclass
+class PriceTable:
+    """Prices of one product"""
+    currency: str = "USD"
+    base_price: float = 99.0
+    scale_multipliers: Dict[str, float] = field(default_factory=dict)
+    default_scale_multiplier: float = 1.0
+    feature_price: float = 10.0
+    feature_prices: Dict[str, float] = field(default_factory=dict)
+    integration_price: float = 20.0
+    integration_prices: Dict[str, float] = field(default_factory=dict)
+
+    def __post_init__(self):
+        # Integer cents: item sums are exact and independent of summation order
+        self._base = _cents(self.base_price)
+        self._feature = _cents(self.feature_price)
+        self._features = {name: _cents(price) for name, price in self.feature_prices.items()}
+        self._integration = _cents(self.integration_price)
+        self._integrations = {name: _cents(price) for name, price in self.integration_prices.items()}
+
+    def price(self, scale: str, features: Sequence[str], integrations: Sequence[str]) -> float:
+        """Monthly price of one configuration"""
+        multiplier = self.scale_multipliers.get(scale, self.default_scale_multiplier)
+        cents = (
+            self._base * multiplier
+            + sum(self._features.get(feature, self._feature) for feature in features)
+            + sum(self._integrations.get(name, self._integration) for name in integrations)
+        )
+        return float(round_cents(cents))
+
+    def scale_multipliers_of(self, scales: Sequence[str]) -> np.ndarray:
+        codes, distinct = _factorize(scales)
+        lookup = np.array(
+            [self.scale_multipliers.get(scale, self.default_scale_multiplier) for scale in distinct],
+            dtype=np.float64
+        )
+        return lookup[codes] if len(codes) else np.zeros(0)
+
+    @staticmethod
+    def _set_cents(sets: Sequence[Sequence[str]], unit: int, overrides: Dict[str, int]) -> np.ndarray:
+        """Summed cents of each item set; items without an override cost `unit`"""
+        lengths = np.fromiter((len(items) for items in sets), dtype=np.intp, count=len(sets))
+        if not overrides:
+            return lengths.astype(np.int64) * unit
+        flat = [item for items in sets for item in items]
+        codes, distinct = _factorize(flat)
+        prices = np.array([overrides.get(item, unit) for item in distinct], dtype=np.int64)
+        owners = np.repeat(np.arange(len(sets)), lengths)
+        return np.bincount(owners, weights=prices[codes] if len(codes) else None, minlength=len(sets))
+
+    def feature_cents(self, feature_sets: Sequence[Sequence[str]]) -> np.ndarray:
+        return self._set_cents(feature_sets, self._feature, self._features)
+
+    def integration_cents(self, integration_sets: Sequence[Sequence[str]]) -> np.ndarray:
+        return self._set_cents(integration_sets, self._integration, self._integrations)
+
+    def price_many(
+        self,
+        scales: Sequence[str],
+        feature_sets: Sequence[Sequence[str]],
+        integration_sets: Sequence[Sequence[str]]
+    ) -> np.ndarray:
+        """Prices of n configurations given as three parallel sequences"""
+        cents = (
+            self._base * self.scale_multipliers_of(scales)
+            + self.feature_cents(feature_sets)
+            + self.integration_cents(integration_sets)
+        )
+        return round_cents(cents)
+
+    def price_grid(
+        self,
+        scales: Sequence[str],
+        feature_sets: Sequence[Sequence[str]],
+        integration_sets: Sequence[Sequence[str]]
+    ) -> np.ndarray:
+        """(scales, feature_sets, integration_sets) array of every combination's price"""
+        cents = (
+            (self._base * self.scale_multipliers_of(scales))[:, None, None]
+            + self.feature_cents(feature_sets)[None, :, None]
+            + self.integration_cents(integration_sets)[None, None, :]
+        )
+        return round_cents(cents)
+
+
+class PricingCatalog:
+    """
+    Ürün bazlı fiyat tabloları
+    - Ürün kayıtları varsayılan tablonun üzerine uygulanır
+    - version, kataloğun kanonik JSON'unun hash'idir; fiyat değişince
+      yapılandırma önbelleği anahtarları da değişir
+    """
+
+    def __init__(self, data: Optional[Dict[str, Any]] = None):
+        data = data or {}
+        self.default = {**DEFAULT_TABLE, **data.get("default", {})}
+        self.products: Dict[str, Dict[str, Any]] = dict(data.get("products", {}))
+        self._tables: Dict[str, PriceTable] = {}
+        canonical = json.dumps(
+            {"default": self.default, "products": self.products}, sort_keys=True, separators=(",", ":")
+        )
+        self.version = hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:16]
+
+    @classmethod
+    def load(cls, path: Optional[str] = None) -> "PricingCatalog":
+        """Catalog from a JSON file; the built-in table when the path is unset or missing"""
+        path = settings.PRICING_CATALOG_PATH if path is None else path
+        if not path or not Path(path).exists():
+            if path:
+                logger.warning(f"Pricing catalog {path} not found, using built-in prices")
+            return cls()
+        catalog = cls(json.loads(Path(path).read_text(encoding="utf-8")))
+        logger.info(f"Loaded pricing catalog {path}: {len(catalog.products)} products, version {catalog.version}")
+        return catalog
+
+    def table(self, product_id: Optional[str] = None) -> PriceTable:
+        """Price table of a product (the default table for unknown products)"""
+        key = product_id if product_id in self.products else ""
+        table = self._tables.get(key)
+        if table is None:
+            merged = dict(self.default)
+            for name, value in self.products.get(key, {}).items():
+                # Per-item price maps extend the default map instead of replacing it
+                if isinstance(value, dict) and isinstance(merged.get(name), dict):
+                    value = {**merged[name], **value}
+                merged[name] = value
+            table = self._tables[key] = PriceTable(**{
+                name: merged[name] for name in PriceTable.__dataclass_fields__ if name in merged
+            })
+        return table
+
+    def quote(self, product_id: Optional[str], user_inputs: Dict[str, Any]) -> float:
+        """Price of one configuration wizard input"""
+        return self.table(product_id).price(
+            user_inputs.get("scale", "standard"),
+            user_inputs.get("features", []),
+            user_inputs.get("api_integrations", [])
+        )
+
+    def describe(self, product_id: Optional[str] = None) -> Dict[str, Any]:
+        return {"version": self.version, **asdict(self.table(product_id))}
+
+
+# Global instance
+pricing_catalog = PricingCatalog.load()
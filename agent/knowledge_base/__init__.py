@@ -2,5 +2,8 @@
 Knowledge Base module initialization
 """
 from .knowledge_manager import KnowledgeManager
+from .bundle import BundleError, BundleWriter, KnowledgeBundle
+from .vector_store import MmapVectorClient, MmapCollection
 
-__all__ = ["KnowledgeManager"]
+__all__ = ["KnowledgeManager", "BundleError", "BundleWriter", "KnowledgeBundle",
+           "MmapVectorClient", "MmapCollection"]
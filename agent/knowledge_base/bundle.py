@@ -0,0 +1,185 @@
+"""
+Knowledge Bundle - Chunk, metadata ve embedding'lerin taşınabilir binary formatı
+
+Bundle bir dizindir:
+    manifest.json           format, sürüm, satır sayısı, boyut, embedding modeli
+    embeddings.npy          float32 (N, D) matris, np.load(mmap_mode="r") ile açılır
+    <table>.bin             UTF-8 kayıtların art arda eklenmiş hali
+    <table>.idx.npy         int64 (N + 1) offset dizisi
+
+Tablolar: ids, documents, metadatas (satır başına JSON). Okuma tarafında
+hiçbir dosya belleğe tamamen yüklenmez; satırlar mmap üzerinden dilimlenir.
+"""
+from pathlib import Path
+from typing import Dict, Any, Optional, List, Iterator, Tuple
+import json
+import time
+
+import numpy as np
+
+
+FORMAT = "compagent-knowledge-bundle"
+VERSION = 1
+MANIFEST = "manifest.json"
+EMBEDDINGS = "embeddings.npy"
+TABLES = ("ids", "documents", "metadatas")
+FILES = [MANIFEST, EMBEDDINGS] + [f"{t}{suffix}" for t in TABLES for suffix in (".bin", ".idx.npy")]
+
+
+class BundleError(ValueError):
+    """Bundle is missing, malformed or incompatible"""
+
+
+class _StringTableWriter:
+    """Append-only UTF-8 blob plus row offsets"""
+
+    def __init__(self, directory: Path, name: str):
+        self.directory = directory
+        self.name = name
+        self._file = open(directory / f"{name}.bin", "wb")
+        self._offsets = [0]
+
+    def extend(self, values: List[str]):
+        for value in values:
+            data = value.encode("utf-8")
+            self._file.write(data)
+            self._offsets.append(self._offsets[-1] + len(data))
+
+    def close(self):
+        self._file.close()
+        np.save(self.directory / f"{self.name}.idx.npy", np.asarray(self._offsets, dtype=np.int64))
+
+
+class _StringTable:
+    """Memory-mapped string table"""
+
+    def __init__(self, directory: Path, name: str):
+        self.offsets = np.load(directory / f"{name}.idx.npy", mmap_mode="r")
+        blob = directory / f"{name}.bin"
+        # np.memmap cannot map an empty file
+        self.blob = np.memmap(blob, dtype=np.uint8, mode="r") if blob.stat().st_size else np.empty(0, np.uint8)
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def slice(self, start: int, end: int) -> List[str]:
+        offsets = self.offsets[start:end + 1]
+        data = self.blob[offsets[0]:offsets[-1]].tobytes()
+        base = int(offsets[0])
+        return [
+            data[int(a) - base:int(b) - base].decode("utf-8")
+            for a, b in zip(offsets[:-1], offsets[1:])
+        ]
+
+
+class BundleWriter:
+    """
+    Streams a collection export into a bundle directory
+    - The embedding matrix is preallocated on disk once the dimension is known
+    - Rows are appended batch by batch; nothing is held in memory
+    """
+
+    def __init__(self, path: str, count: int, manifest: Optional[Dict[str, Any]] = None):
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.count = count
+        self.manifest = dict(manifest or {})
+        self.written = 0
+        self._embeddings: Optional[np.memmap] = None
+        self._tables = {name: _StringTableWriter(self.path, name) for name in TABLES}
+
+    def write(
+        self,
+        ids: List[str],
+        documents: List[str],
+        metadatas: List[Dict[str, Any]],
+        embeddings: List[List[float]]
+    ):
+        if self.written + len(ids) > self.count:
+            raise BundleError(f"More rows than announced ({self.count})")
+        if self._embeddings is None:
+            dimensions = len(embeddings[0]) if embeddings else 0
+            self._embeddings = np.lib.format.open_memmap(
+                self.path / EMBEDDINGS, mode="w+", dtype=np.float32, shape=(self.count, dimensions)
+            )
+        self._embeddings[self.written:self.written + len(ids)] = np.asarray(embeddings, dtype=np.float32)
+        self._tables["ids"].extend(ids)
+        self._tables["documents"].extend(documents)
+        self._tables["metadatas"].extend(json.dumps(m or {}, ensure_ascii=False) for m in metadatas)
+        self.written += len(ids)
+
+    def close(self) -> Dict[str, Any]:
+        """Flush all files and write the manifest"""
+        if self.written != self.count:
+            raise BundleError(f"Wrote {self.written} of {self.count} rows")
+        if self._embeddings is None:
+            # Empty collection; zero-size arrays cannot be memory-mapped
+            np.save(self.path / EMBEDDINGS, np.empty((0, 0), dtype=np.float32))
+            dimensions = 0
+        else:
+            dimensions = self._embeddings.shape[1]
+            self._embeddings.flush()
+            self._embeddings = None
+        for table in self._tables.values():
+            table.close()
+
+        manifest = {
+            **self.manifest,
+            "format": FORMAT,
+            "version": VERSION,
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "count": self.count,
+            "dimensions": dimensions,
+            "dtype": "float32",
+            "files": {name: (self.path / name).stat().st_size for name in FILES if name != MANIFEST}
+        }
+        (self.path / MANIFEST).write_text(json.dumps(manifest, indent=2, ensure_ascii=False), encoding="utf-8")
+        return manifest
+
+
+class KnowledgeBundle:
+    """
+    Read-only, memory-mapped view of a bundle
+    - Embedding batches are slices of the mapped matrix (no copy until used)
+    """
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        manifest_path = self.path / MANIFEST
+        if not manifest_path.exists():
+            raise BundleError(f"No {MANIFEST} in {self.path}")
+        self.manifest: Dict[str, Any] = json.loads(manifest_path.read_text(encoding="utf-8"))
+        if self.manifest.get("format") != FORMAT or self.manifest.get("version") != VERSION:
+            raise BundleError(
+                f"Unsupported bundle {self.manifest.get('format')} v{self.manifest.get('version')}"
+            )
+        for name, size in self.manifest.get("files", {}).items():
+            file = self.path / name
+            if not file.exists() or file.stat().st_size != size:
+                raise BundleError(f"{name} is missing or truncated")
+
+        self.embeddings = np.load(self.path / EMBEDDINGS, mmap_mode="r" if len(self) else None)
+        self._tables = {name: _StringTable(self.path, name) for name in TABLES}
+        if any(len(table) != len(self) for table in self._tables.values()):
+            raise BundleError("Row counts of the bundle files do not match")
+
+    def __len__(self) -> int:
+        return int(self.manifest["count"])
+
+    @property
+    def dimensions(self) -> int:
+        return int(self.manifest["dimensions"])
+
+    def batches(
+        self,
+        batch_size: int
+    ) -> Iterator[Tuple[List[str], List[str], List[Dict[str, Any]], np.ndarray]]:
+        """(ids, documents, metadatas, embeddings) in row order"""
+        for start in range(0, len(self), batch_size):
+            end = min(start + batch_size, len(self))
+            yield (
+                self._tables["ids"].slice(start, end),
+                self._tables["documents"].slice(start, end),
+                [json.loads(m) for m in self._tables["metadatas"].slice(start, end)],
+                self.embeddings[start:end]
+            )
@@ -1,11 +1,41 @@
 """
 Knowledge Manager - Document and vector database management with ChromaDB
 """
-from typing import Dict, Any, Optional, List
+from collections import OrderedDict
+from typing import Dict, Any, Optional, List, Iterable, Tuple
+import hashlib
 import json
+import os
+import re
+import threading
+import time
 import uuid
+import zlib
+from core import metrics, tracing
+from core.config import settings
 from core.logging import logger
+from agent.qa_engine.fast_path import fast_path
+from .bundle import BundleError, BundleWriter, KnowledgeBundle
+from .vector_store import MmapVectorClient
 import chromadb
+from chromadb.utils import embedding_functions
+
+
+# Collection layouts
+PER_AGENT = "per_agent"
+SHARDED = "sharded"
+
+AGENT_PREFIX = "agent_"
+SHARD_PREFIX = "shard_"
+TENANT_KEY = "agent_id"
+
+# Vector backends
+CHROMA = "chroma"
+MMAP = "mmap"
+
+# Metadata written per chunk, as opposed to the caller's document metadata
+CHUNK_KEYS = {"doc_id", "chunk_index", "total_chunks", "content_hash"}
+
 
 class KnowledgeManager:
     """
@@ -13,27 +43,116 @@ class KnowledgeManager:
     - Stores and retrieves product information
     - Indexes documents
     - Performs vector search for relevant information
+    - Keeps an LRU registry of collection handles so the request path does
+      not hit Chroma's metadata store on every call (lock guarded; used from
+      the event loop and worker threads)
+    - Agent collections ("agent_<id>") are either one Chroma collection per
+      agent (per_agent) or packed into a fixed number of shard collections
+      and scoped with where={"agent_id": ...} (sharded)
+    - Vectors are stored in ChromaDB (chroma) or in memory-mapped matrices
+      searched in-process (mmap, see vector_store.py)
     """
     
-    def __init__(self):
+    def __init__(
+        self,
+        persist_directory: str = "./data/chroma",
+        chunk_strategy: Optional[str] = None,
+        chunk_size: Optional[int] = None,
+        chunk_overlap: Optional[int] = None,
+        layout: Optional[str] = None,
+        shards: Optional[int] = None,
+        backend: Optional[str] = None,
+        quantization: Optional[str] = None
+    ):
         self.knowledge_base: Dict[str, Dict[str, Any]] = {}
+        self.embedding_function = embedding_functions.DefaultEmbeddingFunction()
+        self.chunk_strategy = chunk_strategy or settings.KNOWLEDGE_CHUNK_STRATEGY
+        self.chunk_size = chunk_size or settings.KNOWLEDGE_CHUNK_SIZE
+        self.chunk_overlap = (
+            settings.KNOWLEDGE_CHUNK_OVERLAP if chunk_overlap is None else chunk_overlap
+        )
+        if self.chunk_size < 1 or (
+            self.chunk_strategy == "fixed" and not 0 <= self.chunk_overlap < self.chunk_size
+        ):
+            raise ValueError(
+                f"Invalid chunking: size {self.chunk_size}, overlap {self.chunk_overlap} "
+                f"(overlap must be smaller than the chunk size)"
+            )
+        self._collections: "OrderedDict[str, Any]" = OrderedDict()
+        # Used from the event loop and from worker threads (search_batch, bundles)
+        self._collections_lock = threading.Lock()
+        self.collection_cache_size = settings.KNOWLEDGE_COLLECTION_CACHE_SIZE
+        self.layout = layout or settings.KNOWLEDGE_LAYOUT
+        self.shards = shards or settings.KNOWLEDGE_SHARDS
+        if self.layout not in (PER_AGENT, SHARDED):
+            raise ValueError(f"Unknown knowledge layout: {self.layout}")
+        self.backend = backend or settings.VECTOR_BACKEND
+        if self.backend not in (CHROMA, MMAP):
+            raise ValueError(f"Unknown vector backend: {self.backend}")
+        
+        if self.backend == MMAP:
+            # Chroma-compatible client; the rest of the manager is backend agnostic
+            self.chroma_client = MmapVectorClient(
+                path=os.path.join(persist_directory, MMAP),
+                dtype=settings.VECTOR_DTYPE,
+                ann_threshold=settings.VECTOR_ANN_THRESHOLD,
+                quantization_mode=quantization or settings.VECTOR_QUANTIZATION,
+                quantize_min_rows=settings.VECTOR_QUANTIZE_MIN_ROWS,
+                rescore_factor=settings.VECTOR_RESCORE_FACTOR,
+                subvector_dims=settings.VECTOR_PQ_SUBVECTOR_DIMS
+            )
+            logger.info("KnowledgeManager initialized with mmap vector store")
+            return
         
         # Initialize ChromaDB with new persistent client
         try:
-            self.chroma_client = chromadb.PersistentClient(path="./data/chroma")
+            self.chroma_client = chromadb.PersistentClient(path=persist_directory)
             logger.info("KnowledgeManager initialized with ChromaDB")
         except Exception as e:
             logger.warning(f"ChromaDB initialization failed, using in-memory: {e}")
             self.chroma_client = chromadb.Client()
             logger.info("KnowledgeManager initialized with in-memory ChromaDB")
     
+    def is_sharded(self, collection_name: str) -> bool:
+        """Whether the collection lives inside a shard collection"""
+        return self.layout == SHARDED and collection_name.startswith(AGENT_PREFIX)
+    
+    def shard_name(self, collection_name: str) -> str:
+        """Stable shard of an agent collection"""
+        tenant = collection_name.removeprefix(AGENT_PREFIX)
+        return f"{SHARD_PREFIX}{zlib.crc32(tenant.encode('utf-8')) % self.shards:04d}"
+    
+    def physical_name(self, collection_name: str) -> str:
+        """Chroma collection that stores a logical collection"""
+        return self.shard_name(collection_name) if self.is_sharded(collection_name) else collection_name
+    
+    def scoped_collection(self, collection_name: str) -> Tuple[Any, Optional[Dict[str, str]]]:
+        """
+        Chroma collection and where filter holding a logical collection
+        
+        Returns:
+            (collection handle, {"agent_id": ...} in the sharded layout, else None)
+        """
+        if self.is_sharded(collection_name):
+            shard = self.physical_name(collection_name)
+            if shard not in self._collections:
+                self.create_collection(shard)
+            where = {TENANT_KEY: collection_name.removeprefix(AGENT_PREFIX)}
+            return self.get_collection(shard), where
+        return self.get_collection(collection_name), None
+    
     def create_collection(self, collection_name: str):
         """Create a new collection in ChromaDB"""
+        if self.is_sharded(collection_name):
+            collection, _ = self.scoped_collection(collection_name)
+            return collection
         try:
             collection = self.chroma_client.get_or_create_collection(
                 name=collection_name,
-                metadata={"description": f"Knowledge base for {collection_name}"}
+                metadata={"description": f"Knowledge base for {collection_name}"},
+                embedding_function=self.embedding_function
             )
+            self._remember_collection(collection_name, collection)
             logger.info(f"Created/retrieved collection: {collection_name}")
             return collection
         except Exception as e:
@@ -42,26 +161,154 @@ class KnowledgeManager:
     
     def delete_collection(self, collection_name: str):
         """Delete a collection from ChromaDB"""
+        if self.is_sharded(collection_name):
+            try:
+                shard, where = self.scoped_collection(collection_name)
+                shard.delete(where=where)
+                logger.info(f"Deleted {collection_name} from {shard.name}")
+            except Exception as e:
+                logger.error(f"Error deleting collection {collection_name}: {e}")
+            return
+        
+        self.invalidate_collection(collection_name)
         try:
             self.chroma_client.delete_collection(name=collection_name)
             logger.info(f"Deleted collection: {collection_name}")
         except Exception as e:
             logger.error(f"Error deleting collection {collection_name}: {e}")
     
-    def chunk_text(self, text: str, chunk_size: int = 1000, overlap: int = 200) -> List[str]:
-        """Split text into overlapping chunks"""
+    def get_collection(self, collection_name: str):
+        """
+        Collection handle from the registry, fetched from Chroma on a miss
+        
+        Raises:
+            ValueError: Collection does not exist
+        """
+        with self._collections_lock:
+            collection = self._collections.get(collection_name)
+            if collection is not None:
+                self._collections.move_to_end(collection_name)
+        metrics.record_cache("collection_handle", collection is not None)
+        if collection is not None:
+            return collection
+        
+        collection = self.chroma_client.get_collection(
+            name=collection_name,
+            embedding_function=self.embedding_function
+        )
+        self._remember_collection(collection_name, collection)
+        return collection
+    
+    def _remember_collection(self, collection_name: str, collection):
+        with self._collections_lock:
+            self._collections[collection_name] = collection
+            self._collections.move_to_end(collection_name)
+            while len(self._collections) > self.collection_cache_size:
+                self._collections.popitem(last=False)
+    
+    def invalidate_collection(self, collection_name: Optional[str] = None):
+        """Drop one cached handle, or all of them"""
+        with self._collections_lock:
+            if collection_name is None:
+                self._collections.clear()
+            else:
+                self._collections.pop(collection_name, None)
+    
+    def preload_collections(self, collection_names: Iterable[str]) -> int:
+        """
+        Warm the registry, e.g. with the collections of recently active agents
+        
+        Args:
+            collection_names: Collections to load; missing ones are skipped
+            
+        Returns:
+            Number of handles loaded
+        """
+        loaded = 0
+        physical = dict.fromkeys(self.physical_name(name) for name in collection_names)
+        for collection_name in physical:
+            if collection_name in self._collections:
+                continue
+            try:
+                self.get_collection(collection_name)
+                loaded += 1
+            except Exception as e:
+                logger.debug(f"Skipping preload of {collection_name}: {e}")
+        logger.info(f"Preloaded {loaded} collection handles")
+        return loaded
+    
+    def embed(self, texts: List[str], operation: str = "query") -> List[List[float]]:
+        """Embed texts with the knowledge base embedding model"""
+        started_at = time.perf_counter()
+        with tracing.span("embed", operation=operation, count=len(texts)):
+            embeddings = self.embedding_function(texts)
+        metrics.EMBEDDING_DURATION.labels(operation).observe(time.perf_counter() - started_at)
+        return embeddings
+    
+    def chunk_text(
+        self,
+        text: str,
+        chunk_size: Optional[int] = None,
+        overlap: Optional[int] = None
+    ) -> List[str]:
+        """Split text with the configured strategy ("fixed" or "paragraph")"""
+        chunk_size = chunk_size or self.chunk_size
+        overlap = self.chunk_overlap if overlap is None else overlap
+        if self.chunk_strategy == "paragraph":
+            return self.chunk_paragraphs(text, chunk_size)
+        return self.chunk_fixed(text, chunk_size, overlap)
+    
+    def chunk_fixed(self, text: str, chunk_size: int = 1000, overlap: int = 200) -> List[str]:
+        """Split text into overlapping fixed-size character chunks"""
+        if chunk_size < 1:
+            raise ValueError(f"Invalid chunk size: {chunk_size}")
         chunks = []
         start = 0
         text_length = len(text)
+        # An overlap of chunk_size or more would never advance
+        step = max(1, chunk_size - overlap)
         
         while start < text_length:
             end = start + chunk_size
             chunk = text[start:end]
             chunks.append(chunk)
-            start += chunk_size - overlap
+            start += step
         
         return chunks
     
+    def chunk_paragraphs(self, text: str, chunk_size: int = 1000) -> List[str]:
+        """
+        Pack whole paragraphs into chunks of at most chunk_size characters
+        
+        Paragraphs longer than chunk_size are split on sentence boundaries,
+        and a single sentence longer than that falls back to fixed-size chunks.
+        """
+        pieces: List[str] = []
+        for paragraph in re.split(r"\n\s*\n", text):
+            paragraph = paragraph.strip()
+            if not paragraph:
+                continue
+            if len(paragraph) <= chunk_size:
+                pieces.append(paragraph)
+                continue
+            for sentence in re.split(r"(?<=[.!?])\s+", paragraph):
+                if len(sentence) <= chunk_size:
+                    pieces.append(sentence)
+                else:
+                    pieces.extend(self.chunk_fixed(sentence, chunk_size, 0))
+        
+        chunks: List[str] = []
+        current = ""
+        for piece in pieces:
+            if current and len(current) + 2 + len(piece) > chunk_size:
+                chunks.append(current)
+                current = piece
+            else:
+                current = f"{current}\n\n{piece}" if current else piece
+        if current:
+            chunks.append(current)
+        return chunks
+    
     def add_document(self, collection_name: str, content: str, metadata: Dict = None) -> str:
         """
         Add a document to the collection with chunking
@@ -75,10 +322,11 @@ class KnowledgeManager:
             Document ID
         """
         try:
-            collection = self.chroma_client.get_collection(name=collection_name)
+            collection, where = self.scoped_collection(collection_name)
             
             # Chunk the document
-            chunks = self.chunk_text(content)
+            with tracing.span("chunk"):
+                chunks = self.chunk_text(content)
             doc_id = str(uuid.uuid4())
             
             # Add each chunk to the collection
@@ -87,31 +335,272 @@ class KnowledgeManager:
             metadatas = []
             
             for i, chunk in enumerate(chunks):
-                chunk_id = f"{doc_id}_chunk_{i}"
-                ids.append(chunk_id)
+                ids.append(f"{doc_id}_chunk_{i}")
                 documents.append(chunk)
-                
-                chunk_metadata = metadata.copy() if metadata else {}
-                chunk_metadata.update({
-                    "doc_id": doc_id,
-                    "chunk_index": i,
-                    "total_chunks": len(chunks)
-                })
-                metadatas.append(chunk_metadata)
-            
-            collection.add(
-                ids=ids,
-                documents=documents,
-                metadatas=metadatas
-            )
+                metadatas.append(
+                    self._chunk_metadata(metadata or {}, where, doc_id, i, len(chunks), chunk)
+                )
+            
+            embeddings = self.embed(documents, operation="document")
+            with tracing.span("vector_write", chunks=len(ids)):
+                collection.add(
+                    ids=ids,
+                    embeddings=embeddings,
+                    documents=documents,
+                    metadatas=metadatas
+                )
             
             logger.info(f"Added document {doc_id} with {len(chunks)} chunks to {collection_name}")
             return doc_id
             
         except Exception as e:
             logger.error(f"Error adding document to {collection_name}: {e}")
+            self.invalidate_collection(self.physical_name(collection_name))
+            raise
+    
+    @staticmethod
+    def content_hash(text: str) -> str:
+        """Stable hash of a chunk's text"""
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()[:32]
+    
+    def _chunk_metadata(
+        self,
+        metadata: Dict[str, Any],
+        where: Optional[Dict[str, str]],
+        doc_id: str,
+        index: int,
+        total: int,
+        chunk: str
+    ) -> Dict[str, Any]:
+        chunk_metadata = dict(metadata)
+        chunk_metadata.update({
+            "doc_id": doc_id,
+            "chunk_index": index,
+            "total_chunks": total,
+            "content_hash": self.content_hash(chunk)
+        })
+        if where:
+            chunk_metadata.update(where)
+        return chunk_metadata
+    
+    @staticmethod
+    def _document_filter(where: Optional[Dict[str, str]], doc_id: str) -> Dict[str, Any]:
+        if where:
+            return {"$and": [where, {"doc_id": doc_id}]}
+        return {"doc_id": doc_id}
+    
+    def update_document(
+        self,
+        collection_name: str,
+        doc_id: str,
+        content: str,
+        metadata: Optional[Dict] = None
+    ) -> Dict[str, int]:
+        """
+        Replace a document's content, re-embedding only changed chunks
+        
+        Chunks are matched by content hash: unchanged chunks keep their
+        vectors (only their position metadata is rewritten when it moved),
+        new chunks are embedded and chunks that disappeared are deleted.
+        Boundary-stable chunking (KNOWLEDGE_CHUNK_STRATEGY=paragraph) keeps
+        an edit local; with fixed-size chunks every chunk after a length
+        change shifts and is re-embedded.
+        
+        Args:
+            collection_name: Name of the collection
+            doc_id: Document to replace
+            content: New document content
+            metadata: New document metadata (default: keep the current one)
+            
+        Returns:
+            {"chunks", "embedded", "reused", "deleted"}
+        """
+        try:
+            collection, where = self.scoped_collection(collection_name)
+            existing = collection.get(
+                where=self._document_filter(where, doc_id),
+                include=["documents", "metadatas"]
+            )
+            
+            previous: Dict[str, List[Tuple[str, Dict[str, Any]]]] = {}
+            for chunk_id, document, chunk_metadata in zip(
+                existing["ids"], existing["documents"], existing["metadatas"]
+            ):
+                chunk_hash = chunk_metadata.get("content_hash") or self.content_hash(document)
+                previous.setdefault(chunk_hash, []).append((chunk_id, chunk_metadata))
+            if metadata is None:
+                first = existing["metadatas"][0] if existing["metadatas"] else {}
+                metadata = {k: v for k, v in first.items() if k not in CHUNK_KEYS}
+            
+            with tracing.span("chunk"):
+                chunks = self.chunk_text(content)
+            
+            new_ids, new_documents, new_metadatas = [], [], []
+            moved_ids, moved_metadatas = [], []
+            for i, chunk in enumerate(chunks):
+                chunk_metadata = self._chunk_metadata(metadata, where, doc_id, i, len(chunks), chunk)
+                candidates = previous.get(chunk_metadata["content_hash"])
+                if candidates:
+                    chunk_id, old_metadata = candidates.pop()
+                    if old_metadata != chunk_metadata:
+                        moved_ids.append(chunk_id)
+                        moved_metadatas.append(chunk_metadata)
+                    continue
+                new_ids.append(f"{doc_id}_chunk_{uuid.uuid4().hex[:12]}")
+                new_documents.append(chunk)
+                new_metadatas.append(chunk_metadata)
+            stale_ids = [chunk_id for entries in previous.values() for chunk_id, _ in entries]
+            
+            # Write before deleting so concurrent searches never see an empty document
+            if new_ids:
+                embeddings = self.embed(new_documents, operation="document")
+                with tracing.span("vector_write", chunks=len(new_ids)):
+                    collection.add(
+                        ids=new_ids,
+                        embeddings=embeddings,
+                        documents=new_documents,
+                        metadatas=new_metadatas
+                    )
+            if moved_ids:
+                collection.update(ids=moved_ids, metadatas=moved_metadatas)
+            if stale_ids:
+                collection.delete(ids=stale_ids)
+            
+            stats = {
+                "chunks": len(chunks),
+                "embedded": len(new_ids),
+                "reused": len(chunks) - len(new_ids),
+                "deleted": len(stale_ids)
+            }
+            logger.info(f"Updated document {doc_id} in {collection_name}: {stats}")
+            return stats
+            
+        except Exception as e:
+            logger.error(f"Error updating document {doc_id} in {collection_name}: {e}")
+            self.invalidate_collection(self.physical_name(collection_name))
             raise
     
+    def delete_document(self, collection_name: str, doc_id: str) -> int:
+        """
+        Delete all chunks of one document
+        
+        Returns:
+            Number of deleted chunks
+        """
+        try:
+            collection, where = self.scoped_collection(collection_name)
+            ids = collection.get(where=self._document_filter(where, doc_id), include=[])["ids"]
+            if ids:
+                collection.delete(ids=ids)
+            logger.info(f"Deleted document {doc_id} ({len(ids)} chunks) from {collection_name}")
+            return len(ids)
+            
+        except Exception as e:
+            logger.error(f"Error deleting document {doc_id} from {collection_name}: {e}")
+            self.invalidate_collection(self.physical_name(collection_name))
+            raise
+    
+    @property
+    def embedding_model(self) -> str:
+        """Name of the embedding model, recorded in exported bundles"""
+        return getattr(self.embedding_function, "MODEL_NAME", type(self.embedding_function).__name__)
+    
+    def export_collection(
+        self,
+        collection_name: str,
+        path: str,
+        batch_size: int = 5000,
+        manifest: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """
+        Write all chunks of a collection, with their embeddings, to a bundle
+        
+        Args:
+            collection_name: Name of the collection
+            path: Bundle directory
+            batch_size: Chunks read from Chroma per call
+            manifest: Extra manifest fields (e.g. the agent record)
+            
+        Returns:
+            Written manifest
+        """
+        collection, where = self.scoped_collection(collection_name)
+        ids = collection.get(where=where, include=[])["ids"]
+        writer = BundleWriter(path, len(ids), {
+            **(manifest or {}),
+            "collection": collection_name,
+            "embedding_model": self.embedding_model
+        })
+        with tracing.span("bundle_export", chunks=len(ids)):
+            for start in range(0, len(ids), batch_size):
+                batch = collection.get(
+                    ids=ids[start:start + batch_size],
+                    include=["embeddings", "documents", "metadatas"]
+                )
+                writer.write(batch["ids"], batch["documents"], batch["metadatas"], batch["embeddings"])
+            written = writer.close()
+        logger.info(f"Exported {len(ids)} chunks of {collection_name} to {path}")
+        return written
+    
+    def import_collection(
+        self,
+        collection_name: str,
+        path: str,
+        batch_size: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Bulk-insert a bundle's precomputed embeddings into a collection
+        
+        Nothing is re-embedded. Chunk metadata is re-scoped to the target
+        agent; when the bundle came from another collection, chunk ids get
+        a "~<agent>" suffix so clones can share a shard with their source.
+        Importing the same bundle twice upserts instead of duplicating.
+        
+        Args:
+            collection_name: Target collection
+            path: Bundle directory
+            batch_size: Chunks per write (default: 5000, capped by Chroma)
+            
+        Returns:
+            {"chunks", "seconds"}
+            
+        Raises:
+            BundleError: Malformed bundle or different embedding model
+        """
+        bundle = KnowledgeBundle(path)
+        if bundle.manifest.get("embedding_model") not in (None, self.embedding_model):
+            raise BundleError(
+                f"Bundle was embedded with {bundle.manifest['embedding_model']}, "
+                f"this instance uses {self.embedding_model}"
+            )
+        
+        self.create_collection(collection_name)
+        collection, where = self.scoped_collection(collection_name)
+        tenant = collection_name.removeprefix(AGENT_PREFIX)
+        rename = bundle.manifest.get("collection") != collection_name
+        empty = not collection.get(where=where, limit=1, include=[])["ids"]
+        write = collection.add if empty else collection.upsert
+        batch_size = batch_size or min(5000, getattr(self.chroma_client, "max_batch_size", 5000))
+        
+        started = time.perf_counter()
+        with tracing.span("bundle_import", chunks=len(bundle)):
+            for ids, documents, metadatas, embeddings in bundle.batches(batch_size):
+                if rename:
+                    ids = [f"{chunk_id}~{tenant}" for chunk_id in ids]
+                for chunk_metadata in metadatas:
+                    if TENANT_KEY in chunk_metadata or where:
+                        chunk_metadata[TENANT_KEY] = tenant
+                write(
+                    ids=ids,
+                    embeddings=embeddings.tolist(),
+                    documents=documents,
+                    metadatas=metadatas
+                )
+        
+        stats = {"chunks": len(bundle), "seconds": round(time.perf_counter() - started, 3)}
+        logger.info(f"Imported {stats['chunks']} chunks into {collection_name} in {stats['seconds']}s")
+        return stats
+    
     def search(self, collection_name: str, query: str, n_results: int = 3) -> str:
         """
         Search for relevant documents in the collection
@@ -125,25 +614,77 @@ class KnowledgeManager:
             Concatenated relevant context
         """
         try:
-            collection = self.chroma_client.get_collection(name=collection_name)
-            
-            results = collection.query(
-                query_texts=[query],
-                n_results=n_results
-            )
-            
-            if not results['documents'] or not results['documents'][0]:
-                return ""
-            
-            # Concatenate results
-            context = "\n\n".join(results['documents'][0])
-            logger.info(f"Found {len(results['documents'][0])} relevant chunks for query in {collection_name}")
+            hits = self.search_batch(collection_name, [query], n_results)[0]
+        except Exception:
+            return ""
+        if not hits:
+            return ""
+        
+        # Concatenate results
+        context = "\n\n".join(hit["document"] for hit in hits)
+        logger.info(f"Found {len(hits)} relevant chunks for query in {collection_name}")
+        
+        return context
+    
+    def search_batch(
+        self,
+        collection_name: str,
+        queries: List[str],
+        n_results: int = 3
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Search many queries against one collection
+        
+        All queries are embedded in one call and sent to the vector store as
+        one multi-vector query, so model and index overhead is paid once.
+        
+        Args:
+            collection_name: Name of the collection
+            queries: Search queries
+            n_results: Number of results per query
             
-            return context
+        Returns:
+            Per query, hits ordered by relevance:
+            {"id", "document", "metadata", "distance", "score"}; score is
+            1 / (1 + distance), higher is better
+        """
+        if not queries:
+            return []
+        try:
+            collection, where = self.scoped_collection(collection_name)
+            query_embeddings = self.embed(queries)
             
+            started_at = time.perf_counter()
+            with tracing.span("vector_query", n_results=n_results, queries=len(queries)):
+                results = collection.query(
+                    query_embeddings=query_embeddings,
+                    n_results=n_results,
+                    where=where,
+                    include=["documents", "metadatas", "distances"]
+                )
+            metrics.VECTOR_SEARCH_DURATION.labels(
+                metrics.agent_label(collection_name.removeprefix(AGENT_PREFIX))
+            ).observe(time.perf_counter() - started_at)
         except Exception as e:
             logger.error(f"Error searching in {collection_name}: {e}")
-            return ""
+            self.invalidate_collection(self.physical_name(collection_name))
+            raise
+        
+        return [
+            [
+                {
+                    "id": chunk_id,
+                    "document": document,
+                    "metadata": metadata or {},
+                    "distance": float(distance),
+                    "score": round(1.0 / (1.0 + max(float(distance), 0.0)), 6)
+                }
+                for chunk_id, document, metadata, distance in zip(ids, documents, metadatas, distances)
+            ]
+            for ids, documents, metadatas, distances in zip(
+                results["ids"], results["documents"], results["metadatas"], results["distances"]
+            )
+        ]
     
     async def get_product_knowledge(self, product_id: str) -> Optional[Dict[str, Any]]:
         """
@@ -157,8 +698,11 @@ class KnowledgeManager:
         """
         try:
             if product_id in self.knowledge_base:
+                metrics.record_cache("product_knowledge", True)
                 return self.knowledge_base[product_id]
             
+            metrics.record_cache("product_knowledge", False)
+            
             # Varsayılan bilgi tabanı yapısı
             default_knowledge = {
                 "product_id": product_id,
@@ -195,6 +739,7 @@ class KnowledgeManager:
         """
         try:
             self.knowledge_base[product_id] = knowledge_data
+            fast_path.invalidate(f"product:{product_id}")
             logger.info(f"Added knowledge for product: {product_id}")
             return True
             
@@ -220,6 +765,7 @@ class KnowledgeManager:
         try:
             if product_id in self.knowledge_base:
                 self.knowledge_base[product_id].update(updates)
+                fast_path.invalidate(f"product:{product_id}")
                 logger.info(f"Updated knowledge for product: {product_id}")
                 return True
             else:
@@ -0,0 +1,152 @@
+"""
+Layout migration - Agent koleksiyonlarını per_agent ve sharded düzenleri arasında taşır
+
+Kayıtlar embedding'leri ile birlikte kopyalanır (yeniden embed edilmez) ve
+upsert ile yazılır; yarıda kalan bir migration aynı komutla güvenle
+tekrar çalıştırılabilir. Kaynak kayıtlar ancak hedefe yazıldıktan sonra silinir.
+Shard sayısını değiştirmek için de kullanılır (sharded -> sharded).
+
+Kullanım:
+    python -m agent.knowledge_base.migrate_layout --to sharded --shards 16
+    python -m agent.knowledge_base.migrate_layout --to per_agent
+    python -m agent.knowledge_base.migrate_layout --to sharded --dry-run
+"""
+from typing import Dict, Any, List
+import argparse
+import re
+import time
+
+from core.config import settings
+from core.logging import logger
+from .knowledge_manager import (
+    KnowledgeManager, PER_AGENT, SHARDED, AGENT_PREFIX, SHARD_PREFIX, TENANT_KEY
+)
+
+
+_SHARD_RE = re.compile(rf"^{SHARD_PREFIX}\d+$")
+_INCLUDE = ["embeddings", "documents", "metadatas"]
+
+
+def _logical_name(source: str, metadata: Dict[str, Any]) -> str:
+    if source.startswith(AGENT_PREFIX):
+        return source
+    return f"{AGENT_PREFIX}{metadata[TENANT_KEY]}"
+
+
+def _copy_batch(
+    target: KnowledgeManager,
+    source: str,
+    batch: Dict[str, Any],
+    dry_run: bool
+) -> List[str]:
+    """Write the records of one page that are not already in place; returns moved ids"""
+    grouped: Dict[str, Dict[str, list]] = {}
+    for chunk_id, embedding, document, metadata in zip(
+        batch["ids"], batch["embeddings"], batch["documents"], batch["metadatas"]
+    ):
+        metadata = dict(metadata or {})
+        if TENANT_KEY not in metadata and not source.startswith(AGENT_PREFIX):
+            logger.warning(f"Skipping {chunk_id} in {source}: no {TENANT_KEY}")
+            continue
+        logical = _logical_name(source, metadata)
+        if target.physical_name(logical) == source:
+            continue
+        metadata[TENANT_KEY] = logical.removeprefix(AGENT_PREFIX)
+        records = grouped.setdefault(logical, {"ids": [], "embeddings": [], "documents": [], "metadatas": []})
+        records["ids"].append(chunk_id)
+        records["embeddings"].append(embedding)
+        records["documents"].append(document)
+        records["metadatas"].append(metadata)
+
+    moved = []
+    for logical, records in grouped.items():
+        if not dry_run:
+            target.create_collection(logical)
+            collection, _ = target.scoped_collection(logical)
+            collection.upsert(**records)
+        moved.extend(records["ids"])
+    return moved
+
+
+def migrate(
+    persist_directory: str,
+    layout: str,
+    shards: int,
+    batch_size: int = 500,
+    dry_run: bool = False
+) -> Dict[str, Any]:
+    """
+    Move every agent collection record into the target layout
+
+    Args:
+        persist_directory: Chroma data directory
+        layout: Target layout ("per_agent" or "sharded")
+        shards: Shard count of the target layout
+        batch_size: Records read per page
+        dry_run: Only count what would move
+
+    Returns:
+        Migration stats
+    """
+    target = KnowledgeManager(persist_directory=persist_directory, layout=layout, shards=shards)
+    client = target.chroma_client
+    started = time.perf_counter()
+    stats = {"collections": 0, "records": 0, "deleted_collections": 0}
+
+    sources = [
+        c.name for c in client.list_collections()
+        if c.name.startswith(AGENT_PREFIX) or _SHARD_RE.match(c.name)
+    ]
+    for source in sources:
+        if source.startswith(AGENT_PREFIX) and not target.is_sharded(source):
+            continue    # already a per-agent collection
+        collection = client.get_collection(name=source)
+        moved: List[str] = []
+        offset = 0
+        while True:
+            batch = collection.get(limit=batch_size, offset=offset, include=_INCLUDE)
+            if not batch["ids"]:
+                break
+            moved.extend(_copy_batch(target, source, batch, dry_run))
+            offset += len(batch["ids"])
+
+        stats["collections"] += 1
+        stats["records"] += len(moved)
+        if dry_run or not moved:
+            continue
+        if len(moved) == offset:
+            client.delete_collection(name=source)
+            target.invalidate_collection(source)
+            stats["deleted_collections"] += 1
+        else:
+            for start in range(0, len(moved), batch_size):
+                collection.delete(ids=moved[start:start + batch_size])
+        logger.info(f"Migrated {len(moved)} records out of {source}")
+
+    stats["seconds"] = round(time.perf_counter() - started, 2)
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Migrate agent collections between layouts")
+    parser.add_argument("--to", dest="layout", choices=[PER_AGENT, SHARDED], required=True)
+    parser.add_argument("--persist-directory", default="./data/chroma")
+    parser.add_argument("--shards", type=int, default=None, help="Default: KNOWLEDGE_SHARDS")
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+
+    stats = migrate(
+        args.persist_directory,
+        args.layout,
+        args.shards or settings.KNOWLEDGE_SHARDS,
+        args.batch_size,
+        args.dry_run
+    )
+    print(stats)
+    if not args.dry_run:
+        print(f"Set KNOWLEDGE_LAYOUT={args.layout} before restarting the API")
+
+
+if __name__ == "__main__":
+    main()
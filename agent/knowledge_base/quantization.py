@@ -0,0 +1,263 @@
+"""
+Quantization - mmap vektör store'u için sıkıştırılmış embedding kodları
+
+İki yöntem:
+    int8 - boyut başına min / ölçek ile 8-bit skaler kuantizasyon (4x küçük)
+    pq   - product quantization: vektör `subvector_dims` boyutluk parçalara
+           bölünür, her parça 256 merkezli bir codebook'ta tek byte ile
+           kodlanır (384 boyut / 4 ile 16x küçük)
+
+Kodlar yalnızca aday seçmek için taranır; en iyi `k * rescore_factor` aday
+diskteki tam hassasiyetli matristen okunup kesin mesafeyle yeniden sıralanır.
+"""
+from pathlib import Path
+from typing import Dict, Any
+import os
+
+import numpy as np
+
+
+NONE = "none"
+INT8 = "int8"
+PQ = "pq"
+MODES = (NONE, INT8, PQ)
+
+TRAIN_SAMPLE = 10000
+KMEANS_ITERATIONS = 8
+CENTROIDS = 256
+DECODE_CHUNK = 4096         # int8 code rows decoded to float32 at a time (~6 MB at 384 dims)
+
+
+def _kmeans(data: np.ndarray, k: int, rng: np.random.Generator) -> np.ndarray:
+    """Plain Lloyd iterations; empty clusters keep their previous centroid"""
+    k = min(k, len(data))
+    centroids = data[rng.choice(len(data), k, replace=False)].copy()
+    for _ in range(KMEANS_ITERATIONS):
+        # |x|^2 is constant per row and does not change the argmin
+        scores = data @ centroids.T
+        scores *= -2.0
+        scores += np.einsum("ij,ij->i", centroids, centroids)
+        assignment = scores.argmin(axis=1)
+        counts = np.bincount(assignment, minlength=k)
+        sums = np.stack(
+            [np.bincount(assignment, weights=data[:, d], minlength=k) for d in range(data.shape[1])], axis=1
+        )
+        filled = counts > 0
+        centroids[filled] = sums[filled] / counts[filled, None]
+    return centroids
+
+
+class ScalarQuantizer:
+    """
+    8-bit scalar quantizer
+    - x ~ low + scale * code, per dimension; values outside the trained range are clipped
+    """
+
+    mode = INT8
+
+    def __init__(self, low: np.ndarray, scale: np.ndarray, trained_rows: int = 0):
+        self.low = low.astype(np.float32)
+        self.scale = scale.astype(np.float32)
+        self.trained_rows = trained_rows
+
+    @classmethod
+    def fit(cls, vectors: np.ndarray, **_) -> "ScalarQuantizer":
+        low = vectors.min(axis=0)
+        scale = (vectors.max(axis=0) - low) / 255.0
+        scale[scale == 0] = 1.0
+        return cls(low, scale, len(vectors))
+
+    @property
+    def code_size(self) -> int:
+        return len(self.low)
+
+    def encode(self, vectors: np.ndarray) -> np.ndarray:
+        codes = np.rint((np.asarray(vectors, dtype=np.float32) - self.low) / self.scale)
+        return np.clip(codes, 0, 255).astype(np.uint8)
+
+    def decode(self, codes: np.ndarray) -> np.ndarray:
+        return self.low + self.scale * codes.astype(np.float32)
+
+    def distances(self, queries: np.ndarray, codes: np.ndarray) -> np.ndarray:
+        """
+        Approximate squared L2 between (b, d) queries and (n, code_size) codes
+
+        Codes are decoded DECODE_CHUNK rows at a time so a scan block never
+        has a full float32 copy.
+        """
+        shifted = queries - self.low
+        distances = np.empty((len(queries), len(codes)), dtype=np.float32)
+        distances[:] = np.einsum("ij,ij->i", shifted, shifted)[:, None]
+        for start in range(0, len(codes), DECODE_CHUNK):
+            reconstructed = codes[start:start + DECODE_CHUNK].astype(np.float32)
+            reconstructed *= self.scale
+            block = distances[:, start:start + len(reconstructed)]
+            block -= 2.0 * (shifted @ reconstructed.T)
+            block += np.einsum("ij,ij->i", reconstructed, reconstructed)[None, :]
+        return distances
+
+    def arrays(self) -> Dict[str, np.ndarray]:
+        return {"low": self.low, "scale": self.scale}
+
+
+class ProductQuantizer:
+    """
+    Product quantizer with 256 centroids per subvector
+    - Distances use per-query lookup tables (asymmetric distance computation)
+    """
+
+    mode = PQ
+
+    def __init__(self, codebooks: np.ndarray, dimensions: int, trained_rows: int = 0):
+        self.codebooks = codebooks.astype(np.float32)      # (subvectors, 256, subvector_dims)
+        self.dimensions = dimensions
+        self.trained_rows = trained_rows
+        self._centroid_norms = np.einsum("scd,scd->sc", self.codebooks, self.codebooks)
+
+    @classmethod
+    def fit(cls, vectors: np.ndarray, subvector_dims: int = 4, seed: int = 0, **_) -> "ProductQuantizer":
+        rng = np.random.default_rng(seed)
+        dimensions = vectors.shape[1]
+        sample = vectors[rng.choice(len(vectors), min(len(vectors), TRAIN_SAMPLE), replace=False)]
+        sample = cls._pad(sample.astype(np.float32), subvector_dims)
+        subvectors = sample.shape[1] // subvector_dims
+        codebooks = np.zeros((subvectors, CENTROIDS, subvector_dims), dtype=np.float32)
+        for j in range(subvectors):
+            part = np.ascontiguousarray(sample[:, j * subvector_dims:(j + 1) * subvector_dims])
+            centroids = _kmeans(part, CENTROIDS, rng)
+            codebooks[j, :len(centroids)] = centroids
+            # Fewer rows than centroids: unused slots repeat a real centroid
+            codebooks[j, len(centroids):] = centroids[0]
+        return cls(codebooks, dimensions, len(vectors))
+
+    @staticmethod
+    def _pad(vectors: np.ndarray, subvector_dims: int) -> np.ndarray:
+        missing = -vectors.shape[1] % subvector_dims
+        return np.pad(vectors, ((0, 0), (0, missing))) if missing else vectors
+
+    @property
+    def subvector_dims(self) -> int:
+        return self.codebooks.shape[2]
+
+    @property
+    def code_size(self) -> int:
+        return self.codebooks.shape[0]
+
+    def _parts(self, vectors: np.ndarray) -> np.ndarray:
+        padded = self._pad(np.asarray(vectors, dtype=np.float32), self.subvector_dims)
+        return padded.reshape(len(padded), self.code_size, self.subvector_dims)
+
+    def _scores(self, parts: np.ndarray, j: int) -> np.ndarray:
+        """(n, 256) squared distances of subvector j to its centroids, minus the part norm"""
+        scores = np.ascontiguousarray(parts[:, j]) @ self.codebooks[j].T
+        scores *= -2.0
+        scores += self._centroid_norms[j]
+        return scores
+
+    def encode(self, vectors: np.ndarray) -> np.ndarray:
+        # One 2-D matmul per subvector; stacked matmuls with a tiny inner
+        # dimension are an order of magnitude slower in NumPy
+        codes = np.empty((len(vectors), self.code_size), dtype=np.uint8)
+        for start in range(0, len(vectors), 16384):
+            parts = self._parts(vectors[start:start + 16384])
+            for j in range(self.code_size):
+                codes[start:start + len(parts), j] = self._scores(parts, j).argmin(axis=1)
+        return codes
+
+    def decode(self, codes: np.ndarray) -> np.ndarray:
+        parts = self.codebooks[np.arange(self.code_size)[None, :], codes.astype(np.intp)]
+        return parts.reshape(len(codes), -1)[:, :self.dimensions]
+
+    def distances(self, queries: np.ndarray, codes: np.ndarray) -> np.ndarray:
+        """Approximate squared L2 between (b, d) queries and (n, code_size) codes"""
+        parts = self._parts(queries)
+        distances = np.repeat(np.einsum("nsd,nsd->n", parts, parts)[:, None], len(codes), axis=1)
+        for j in range(self.code_size):
+            distances += self._scores(parts, j)[:, codes[:, j]]
+        return distances
+
+    def arrays(self) -> Dict[str, np.ndarray]:
+        return {"codebooks": self.codebooks, "dimensions": np.asarray(self.dimensions)}
+
+
+def train(mode: str, vectors: np.ndarray, subvector_dims: int = 4):
+    """Fit a quantizer of the given mode on (n, d) float vectors"""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if mode == INT8:
+        return ScalarQuantizer.fit(vectors)
+    if mode == PQ:
+        return ProductQuantizer.fit(vectors, subvector_dims=subvector_dims)
+    raise ValueError(f"Unknown quantization: {mode}")
+
+
+def save(quantizer, path: Path):
+    tmp = path.with_name(f"{path.stem}.tmp.npz")
+    np.savez(tmp, mode=np.asarray(quantizer.mode), trained_rows=np.asarray(quantizer.trained_rows),
+             **quantizer.arrays())
+    os.replace(tmp, path)
+
+
+def load(path: Path):
+    """Stored quantizer, or None when the file does not exist"""
+    if not path.exists():
+        return None
+    with np.load(path) as data:
+        mode = str(data["mode"])
+        trained_rows = int(data["trained_rows"])
+        if mode == INT8:
+            return ScalarQuantizer(data["low"], data["scale"], trained_rows)
+        return ProductQuantizer(data["codebooks"], int(data["dimensions"]), trained_rows)
+
+
+def evaluate(
+    vectors: np.ndarray,
+    mode: str,
+    queries: int = 200,
+    k: int = 10,
+    rescore_factor: int = 10,
+    subvector_dims: int = 4,
+    seed: int = 0
+) -> Dict[str, Any]:
+    """
+    Memory / recall trade-off of one quantization mode on a set of vectors
+
+    Queries are stored vectors with a little noise; recall@k is measured
+    against exact search, with and without full-precision rescoring.
+
+    Returns:
+        {"mode", "bytes_per_vector", "compression", "recall@k", "recall@k_rescored"}
+    """
+    vectors = np.asarray(vectors, dtype=np.float32)
+    rng = np.random.default_rng(seed)
+    picked = vectors[rng.choice(len(vectors), min(queries, len(vectors)), replace=False)]
+    probes = picked + rng.normal(0.0, 0.1 * float(vectors.std() or 1.0), picked.shape).astype(np.float32)
+    k = min(k, len(vectors))
+    norms = np.einsum("ij,ij->i", vectors, vectors)[None, :]
+    exact = np.argsort(norms - 2.0 * probes @ vectors.T, axis=1)[:, :k]
+    full_bytes = vectors.shape[1] * 4
+
+    if mode == NONE:
+        return {"mode": mode, "bytes_per_vector": full_bytes, "compression": 1.0,
+                f"recall@{k}": 1.0, f"recall@{k}_rescored": 1.0}
+
+    quantizer = train(mode, vectors, subvector_dims)
+    approximate = quantizer.distances(probes, quantizer.encode(vectors))
+    candidates = min(len(vectors), k * rescore_factor)
+    top = np.argpartition(approximate, candidates - 1, axis=1)[:, :candidates]
+    ranked = np.take_along_axis(top, np.argsort(np.take_along_axis(approximate, top, axis=1), axis=1), axis=1)
+
+    rescored = []
+    for probe, rows in zip(probes, top):
+        distances = ((vectors[rows] - probe) ** 2).sum(axis=1)
+        rescored.append(rows[np.argsort(distances)[:k]])
+
+    def recall(found) -> float:
+        return round(float(np.mean([len(set(a) & set(b)) / k for a, b in zip(found, exact)])), 4)
+
+    return {
+        "mode": mode,
+        "bytes_per_vector": quantizer.code_size,
+        "compression": round(full_bytes / quantizer.code_size, 1),
+        f"recall@{k}": recall(ranked[:, :k]),
+        f"recall@{k}_rescored": recall(rescored)
+    }
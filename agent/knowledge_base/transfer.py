@@ -0,0 +1,142 @@
+"""
+Agent transfer - Bir agent'ın tüm bilgi tabanını bundle olarak dışa / içe aktarma
+
+Bundle, agent kaydını (persona, doküman listesi, endpoint'ler, hazır cevaplar)
+manifest içinde, chunk'ları ve embedding'leri binary dosyalarda taşır. İçe
+aktarma embedding hesaplamaz; staging'e veya başka bir bölgeye klonlama
+yalnızca dosya kopyalama ve toplu yazma maliyetindedir.
+
+Kullanım:
+    python -m agent.knowledge_base.transfer export <agent_id> ./bundles/support
+    python -m agent.knowledge_base.transfer import ./bundles/support
+    python -m agent.knowledge_base.transfer import ./bundles/support --name "Support (staging)"
+"""
+from pathlib import Path
+from typing import Dict, Any, Optional
+import argparse
+import json
+import tarfile
+
+from core.logging import logger
+from .bundle import FILES, BundleError, KnowledgeBundle
+from .knowledge_manager import KnowledgeManager, AGENT_PREFIX
+
+
+# Agent fields carried in the manifest
+AGENT_FIELDS = (
+    "name", "description", "persona_role", "persona_tone", "persona_instructions",
+    "persona_constraints", "canned_responses", "documents", "endpoints"
+)
+
+
+def export_agent(
+    knowledge_manager: KnowledgeManager,
+    agent: Dict[str, Any],
+    path: str
+) -> Dict[str, Any]:
+    """
+    Export an agent record and its collection into a bundle directory
+
+    Returns:
+        Written manifest
+    """
+    return knowledge_manager.export_collection(
+        f"{AGENT_PREFIX}{agent['id']}",
+        path,
+        manifest={
+            "agent_id": agent["id"],
+            "agent": {key: agent[key] for key in AGENT_FIELDS if key in agent}
+        }
+    )
+
+
+def import_agent(
+    knowledge_manager: KnowledgeManager,
+    agent_store,
+    path: str,
+    overrides: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """
+    Create a new agent from a bundle
+
+    Args:
+        knowledge_manager: Target knowledge manager
+        agent_store: Target agent store
+        path: Bundle directory
+        overrides: Agent fields to change (e.g. name)
+
+    Returns:
+        {"agent": created agent, "chunks": imported chunk count, "seconds": write time}
+    """
+    bundle = KnowledgeBundle(path)
+    record = {**bundle.manifest.get("agent", {}), **(overrides or {})}
+    if "name" not in record:
+        raise BundleError("Bundle has no agent record")
+    # Imported endpoints are read-only until the operator opts them in again
+    record["endpoints"] = [
+        {**endpoint, "allow_mutation": False} for endpoint in record.get("endpoints") or []
+    ]
+
+    agent = agent_store.create_agent(record)
+    try:
+        stats = knowledge_manager.import_collection(f"{AGENT_PREFIX}{agent['id']}", path)
+    except Exception:
+        agent_store.delete_agent(agent["id"])
+        knowledge_manager.delete_collection(f"{AGENT_PREFIX}{agent['id']}")
+        raise
+
+    logger.info(f"Imported agent {agent['id']} from bundle of {bundle.manifest.get('agent_id')}")
+    return {"agent": agent, **stats}
+
+
+def pack(path: str, archive: str):
+    """Write a bundle directory as one uncompressed tar (embeddings compress poorly)"""
+    with tarfile.open(archive, mode="w") as tar:
+        for name in FILES:
+            tar.add(Path(path) / name, arcname=name)
+
+
+def unpack(fileobj, path: str):
+    """Extract a packed bundle; only the known bundle files are accepted"""
+    target = Path(path)
+    target.mkdir(parents=True, exist_ok=True)
+    with tarfile.open(fileobj=fileobj, mode="r|") as tar:
+        for member in tar:
+            if member.name not in FILES or not member.isfile():
+                raise BundleError(f"Unexpected bundle member: {member.name}")
+            source = tar.extractfile(member)
+            with open(target / member.name, "wb") as out:
+                while chunk := source.read(1 << 20):
+                    out.write(chunk)
+
+
+def main():
+    from agent.storage.agent_store import agent_store
+
+    parser = argparse.ArgumentParser(description="Export / import an agent knowledge bundle")
+    commands = parser.add_subparsers(dest="command", required=True)
+    export_parser = commands.add_parser("export")
+    export_parser.add_argument("agent_id")
+    export_parser.add_argument("path")
+    import_parser = commands.add_parser("import")
+    import_parser.add_argument("path")
+    import_parser.add_argument("--name", default=None, help="Name of the created agent")
+    parser.add_argument("--persist-directory", default="./data/chroma")
+    args = parser.parse_args()
+
+    knowledge_manager = KnowledgeManager(persist_directory=args.persist_directory)
+    if args.command == "export":
+        agent = agent_store.get_agent(args.agent_id)
+        if agent is None:
+            parser.error(f"Agent not found: {args.agent_id}")
+        manifest = export_agent(knowledge_manager, agent, args.path)
+        print(json.dumps({k: manifest[k] for k in ("agent_id", "count", "dimensions", "files")}, indent=2))
+    else:
+        overrides = {"name": args.name} if args.name else None
+        result = import_agent(knowledge_manager, agent_store, args.path, overrides)
+        print(json.dumps({"agent_id": result["agent"]["id"], "chunks": result["chunks"],
+                          "seconds": result["seconds"]}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
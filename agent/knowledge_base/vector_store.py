@@ -0,0 +1,795 @@
+"""
+Vector Store - Memory-mapped, in-process vektör index'i (Chroma uyumlu alt küme)
+
+Her koleksiyon bir dizindir:
+    state.json      boyut, dtype, satır sayısı, generation, koleksiyon metadata'sı
+    vectors.bin     (satır, boyut) float32 / float16 matris, yalnızca sona eklenir
+    rows.db         SQLite: satır numarası, chunk id, doküman, metadata
+
+Sorgular matris üzerinde tek bir vektörize matris çarpımı ve argpartition ile
+cevaplanır; canlı satır sayısı ann_threshold'u geçen koleksiyonlarda süreç içi
+bir HNSW index'i (hnswlib) kullanılır. Matris salt-okunur mmap ile açıldığı
+için aynı koleksiyonu okuyan süreçler sayfaları OS page cache'inde paylaşır;
+başka bir sürecin yazdığı değişiklikler state.json'daki generation ile fark
+edilip yeniden yüklenir. Yazma işlemleri lock dosyasında exclusive, yeniden
+yüklemeler shared flock tutar; okuyucu yarım kalmış bir yazmayı görmez.
+
+Kuantizasyon açıkken (int8 / pq, bkz. quantization.py) taranan şey codes.bin
+içindeki sıkıştırılmış kodlardır; en iyi adaylar vectors.bin'den okunup kesin
+mesafeyle yeniden sıralanır. HNSW index'i tam float32 kopya tuttuğu için
+kuantize koleksiyonlarda kullanılmaz.
+"""
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Any, Optional, List, Iterator, Callable
+import json
+import os
+import re
+import shutil
+import sqlite3
+import threading
+
+import numpy as np
+
+from core.logging import logger
+from . import quantization
+from .quantization import NONE
+
+try:
+    import fcntl
+except ImportError:     # Windows: single writer process assumed
+    fcntl = None
+
+try:
+    import hnswlib
+except ImportError:
+    hnswlib = None
+
+
+STATE = "state.json"
+VECTORS = "vectors.bin"
+ROWS = "rows.db"
+LOCK = "lock"
+CODES = "codes.bin"
+QUANTIZER = "quantizer.npz"
+
+DTYPES = {"float32": np.float32, "float16": np.float16}
+SCAN_BLOCK = 65536          # rows per matrix-product block
+COMPACT_MIN_ROWS = 1024     # never compact tiny collections
+COMPACT_DEAD_RATIO = 0.5
+RESCORE_MIN_CANDIDATES = 100
+RETRAIN_GROWTH = 2          # retrain the quantizer when the collection doubled
+
+_NAME_RE = re.compile(r"^[a-zA-Z0-9][a-zA-Z0-9._-]{1,61}[a-zA-Z0-9]$")
+
+
+def _compare(op: str, value: Any, operand: Any) -> bool:
+    if op == "$eq":
+        return value == operand
+    if op == "$ne":
+        return value != operand
+    if op == "$in":
+        return value in operand
+    if op == "$nin":
+        return value not in operand
+    if value is None:
+        return False
+    if op == "$gt":
+        return value > operand
+    if op == "$gte":
+        return value >= operand
+    if op == "$lt":
+        return value < operand
+    if op == "$lte":
+        return value <= operand
+    raise ValueError(f"Unsupported where operator: {op}")
+
+
+def matches(metadata: Dict[str, Any], where: Dict[str, Any]) -> bool:
+    """Evaluate a Chroma-style where filter against one metadata dict"""
+    for key, condition in where.items():
+        if key == "$and":
+            if not all(matches(metadata, c) for c in condition):
+                return False
+        elif key == "$or":
+            if not any(matches(metadata, c) for c in condition):
+                return False
+        elif isinstance(condition, dict):
+            value = metadata.get(key)
+            if not all(_compare(op, value, operand) for op, operand in condition.items()):
+                return False
+        elif metadata.get(key) != condition:
+            return False
+    return True
+
+
+def _equalities(where: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Plain key == value terms of a filter, or None if it uses anything else"""
+    terms: Dict[str, Any] = {}
+    for key, condition in where.items():
+        if key == "$and":
+            for part in condition:
+                nested = _equalities(part)
+                if nested is None:
+                    return None
+                terms.update(nested)
+        elif key.startswith("$"):
+            return None
+        elif isinstance(condition, dict):
+            if set(condition) != {"$eq"}:
+                return None
+            terms[key] = condition["$eq"]
+        else:
+            terms[key] = condition
+    return terms
+
+
+class MmapCollection:
+    """
+    One memory-mapped collection with the subset of the Chroma Collection API
+    used by KnowledgeManager: add / upsert / update / get / query / delete / count
+    - Distances are squared L2, like Chroma's default space
+    - Deleted rows are tombstoned and compacted once half of the matrix is dead
+    - With quantization, codes are scanned and the best candidates rescored
+      against the full-precision rows
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        name: str,
+        dtype: str = "float32",
+        ann_threshold: int = 20000,
+        embedding_function: Optional[Callable] = None,
+        quantization_mode: str = NONE,
+        quantize_min_rows: int = 10000,
+        rescore_factor: int = 10,
+        subvector_dims: int = 4
+    ):
+        self.path = path
+        self.name = name
+        self.ann_threshold = ann_threshold
+        self.quantization = quantization_mode
+        self.quantize_min_rows = quantize_min_rows
+        self.rescore_factor = rescore_factor
+        self.subvector_dims = subvector_dims
+        self._embedding_function = embedding_function
+        self._default_dtype = dtype
+        self._lock = threading.RLock()
+        self._generation: Optional[int] = None
+        self._conn = sqlite3.connect(str(path / ROWS), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS rows (
+                row INTEGER PRIMARY KEY,
+                id TEXT NOT NULL UNIQUE,
+                document TEXT,
+                metadata TEXT NOT NULL
+            )
+        """)
+        self._conn.commit()
+        self._load_shared()
+
+    # -- state ---------------------------------------------------------------
+
+    @property
+    def metadata(self) -> Dict[str, Any]:
+        return self._state.get("metadata") or {}
+
+    def _read_state(self) -> Dict[str, Any]:
+        try:
+            return json.loads((self.path / STATE).read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            raise ValueError(f"Collection {self.name} does not exist.")
+
+    def _write_state(self):
+        self._state["generation"] = self._generation = self._state.get("generation", 0) + 1
+        tmp = self.path / f"{STATE}.tmp"
+        tmp.write_text(json.dumps(self._state), encoding="utf-8")
+        os.replace(tmp, self.path / STATE)
+
+    def _load(self):
+        """(Re)build the in-process view from disk"""
+        self._state = self._read_state()
+        self._generation = self._state.get("generation", 0)
+        self.dtype = DTYPES[self._state.get("dtype") or self._default_dtype]
+        self.dimensions: Optional[int] = self._state.get("dimensions")
+        size = self._state.get("size", 0)
+
+        self._ids: List[Optional[str]] = [None] * size
+        self._metadatas: List[Optional[Dict[str, Any]]] = [None] * size
+        self._row_of: Dict[str, int] = {}
+        # A writer commits rows before state.json; rows past `size` are not ours yet
+        rows = self._conn.execute("SELECT row, id, metadata FROM rows WHERE row >= 0 AND row < ?", (size,))
+        for row, chunk_id, metadata in rows:
+            self._ids[row] = chunk_id
+            self._metadatas[row] = json.loads(metadata)
+            self._row_of[chunk_id] = row
+        self._alive = np.zeros(size, dtype=bool)
+        if self._row_of:
+            self._alive[list(self._row_of.values())] = True
+
+        self._map(size)
+        # Computed on the first exact scan; quantized collections never touch every row
+        self._norms: Optional[np.ndarray] = None
+        self._postings: Dict[str, Dict[Any, List[int]]] = {}
+        self._ann = None
+
+        self._quantizer = quantization.load(self.path / QUANTIZER)
+        if self._quantizer is not None and self._quantizer.mode != self.quantization:
+            self._quantizer = None      # mode changed in settings; retrained on the next write
+        self._map_codes()
+
+    def _map(self, size: int):
+        if size and self.dimensions:
+            self._matrix = np.memmap(self.path / VECTORS, dtype=self.dtype, mode="r",
+                                     shape=(size, self.dimensions))
+        else:
+            self._matrix = np.empty((0, self.dimensions or 0), dtype=self.dtype)
+
+    def _map_codes(self):
+        size = self._state.get("size", 0)
+        if self._quantizer is None or not size:
+            self._codes = None
+            return
+        self._codes = np.memmap(self.path / CODES, dtype=np.uint8, mode="r",
+                                shape=(size, self._quantizer.code_size))
+
+    def _exact_norms(self) -> np.ndarray:
+        if self._norms is None:
+            size = len(self._ids)
+            self._norms = np.zeros(size, dtype=np.float32)
+            for start in range(0, size, SCAN_BLOCK):
+                block = np.asarray(self._matrix[start:start + SCAN_BLOCK], dtype=np.float32)
+                self._norms[start:start + len(block)] = np.einsum("ij,ij->i", block, block)
+        return self._norms
+
+    def _load_shared(self):
+        """
+        _load under a shared file lock
+
+        Writers hold the exclusive lock for a whole append / delete /
+        compaction, so the rows, matrix and state.json read here belong to
+        one generation.
+        """
+        if fcntl is None:
+            self._load()
+            return
+        with open(self.path / LOCK, "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_SH)
+            try:
+                self._load()
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _refresh(self, locked: bool = False):
+        """
+        Reload when another process wrote since our last look
+
+        Args:
+            locked: The caller holds the exclusive lock (taking the shared one
+                on another descriptor would wait for ourselves)
+        """
+        try:
+            generation = json.loads((self.path / STATE).read_text(encoding="utf-8")).get("generation", 0)
+        except FileNotFoundError:
+            raise ValueError(f"Collection {self.name} does not exist.")
+        if generation != self._generation:
+            if locked:
+                self._load()
+            else:
+                self._load_shared()
+
+    @contextmanager
+    def _writing(self) -> Iterator[None]:
+        """Thread lock plus an exclusive file lock across processes"""
+        with self._lock:
+            with open(self.path / LOCK, "a") as lock_file:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    self._refresh(locked=True)
+                    yield
+                finally:
+                    if fcntl is not None:
+                        fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    # -- writes --------------------------------------------------------------
+
+    def _vectors(self, embeddings, documents, count: int) -> np.ndarray:
+        if embeddings is None:
+            if documents is None or self._embedding_function is None:
+                raise ValueError("Embeddings or documents with an embedding function are required")
+            embeddings = self._embedding_function(documents)
+        vectors = np.asarray(embeddings, dtype=np.float32)
+        if vectors.ndim != 2 or len(vectors) != count:
+            raise ValueError("Expected one embedding per id")
+        if self.dimensions is None:
+            self.dimensions = self._state["dimensions"] = int(vectors.shape[1])
+            self._state.setdefault("dtype", self._default_dtype)
+        elif vectors.shape[1] != self.dimensions:
+            raise ValueError(
+                f"Embedding dimension {vectors.shape[1]} does not match collection dimensionality {self.dimensions}"
+            )
+        return vectors
+
+    def _append(self, ids: List[str], vectors: np.ndarray, documents: List[Optional[str]],
+                metadatas: List[Dict[str, Any]]):
+        start = self._state.get("size", 0)
+        rows = list(range(start, start + len(ids)))
+        with open(self.path / VECTORS, "r+b" if (self.path / VECTORS).exists() else "wb") as f:
+            f.seek(start * self.dimensions * np.dtype(self.dtype).itemsize)
+            f.write(vectors.astype(self.dtype).tobytes())
+        # Rows of a writer that died before updating state.json; the slots are ours now
+        self._conn.execute("DELETE FROM rows WHERE row >= ?", (start,))
+        self._conn.executemany(
+            "INSERT INTO rows (row, id, document, metadata) VALUES (?, ?, ?, ?)",
+            [(row, chunk_id, document, json.dumps(metadata or {}))
+             for row, chunk_id, document, metadata in zip(rows, ids, documents, metadatas)]
+        )
+        self._conn.commit()
+        stored = vectors.astype(self.dtype).astype(np.float32)
+        if self._quantizer is not None:
+            with open(self.path / CODES, "r+b") as f:
+                f.seek(start * self._quantizer.code_size)
+                f.write(self._quantizer.encode(stored).tobytes())
+        self._state["size"] = start + len(ids)
+        self._write_state()
+
+        self._map(self._state["size"])
+        self._map_codes()
+        self._ids.extend(ids)
+        self._metadatas.extend(dict(m or {}) for m in metadatas)
+        self._alive = np.concatenate([self._alive, np.ones(len(ids), dtype=bool)])
+        if self._norms is not None:
+            self._norms = np.concatenate([self._norms, np.einsum("ij,ij->i", stored, stored)])
+        for row, chunk_id in zip(rows, ids):
+            self._row_of[chunk_id] = row
+        for key, postings in self._postings.items():
+            for row, metadata in zip(rows, metadatas):
+                postings.setdefault((metadata or {}).get(key), []).append(row)
+        if self._ann is not None:
+            if self._ann.get_max_elements() < self._state["size"]:
+                self._ann.resize_index(max(self._state["size"], 2 * self._ann.get_max_elements()))
+            self._ann.add_items(stored, np.asarray(rows))
+        self._maybe_quantize()
+
+    def _remove(self, rows: List[int]):
+        if not rows:
+            return
+        self._conn.executemany("DELETE FROM rows WHERE row = ?", [(row,) for row in rows])
+        self._conn.commit()
+        for row in rows:
+            self._row_of.pop(self._ids[row], None)
+            self._ids[row] = None
+            self._metadatas[row] = None
+            self._alive[row] = False
+            if self._ann is not None:
+                self._ann.mark_deleted(row)
+        self._postings = {}
+
+    def _normalize(self, ids, documents, metadatas):
+        ids = [ids] if isinstance(ids, str) else list(ids)
+        documents = list(documents) if documents is not None else [None] * len(ids)
+        metadatas = list(metadatas) if metadatas is not None else [{}] * len(ids)
+        if len(set(ids)) != len(ids):
+            raise ValueError("Duplicate ids in one call")
+        return ids, documents, metadatas
+
+    def add(self, ids, embeddings=None, metadatas=None, documents=None):
+        ids, documents, metadatas = self._normalize(ids, documents, metadatas)
+        with self._writing():
+            vectors = self._vectors(embeddings, documents, len(ids))
+            new = [i for i, chunk_id in enumerate(ids) if chunk_id not in self._row_of]
+            if len(new) < len(ids):
+                logger.warning(f"Skipping {len(ids) - len(new)} existing ids in {self.name}")
+            if new:
+                self._append([ids[i] for i in new], vectors[new],
+                             [documents[i] for i in new], [metadatas[i] for i in new])
+            self._maybe_compact()
+
+    def upsert(self, ids, embeddings=None, metadatas=None, documents=None):
+        ids, documents, metadatas = self._normalize(ids, documents, metadatas)
+        with self._writing():
+            vectors = self._vectors(embeddings, documents, len(ids))
+            self._remove([self._row_of[chunk_id] for chunk_id in ids if chunk_id in self._row_of])
+            self._append(ids, vectors, documents, metadatas)
+            self._maybe_compact()
+
+    def update(self, ids, embeddings=None, metadatas=None, documents=None):
+        ids = [ids] if isinstance(ids, str) else list(ids)
+        with self._writing():
+            known = [chunk_id for chunk_id in ids if chunk_id in self._row_of]
+            if embeddings is None:
+                # Metadata / document only: rewrite the rows in place, vectors untouched
+                for position, chunk_id in enumerate(ids):
+                    row = self._row_of.get(chunk_id)
+                    if row is None:
+                        continue
+                    if metadatas is not None:
+                        self._metadatas[row] = dict(metadatas[position] or {})
+                        self._conn.execute("UPDATE rows SET metadata = ? WHERE row = ?",
+                                           (json.dumps(self._metadatas[row]), row))
+                    if documents is not None:
+                        self._conn.execute("UPDATE rows SET document = ? WHERE row = ?",
+                                           (documents[position], row))
+                self._conn.commit()
+                self._postings = {}
+                self._write_state()
+                return
+
+            current = self.get(ids=known, include=["documents", "metadatas"])
+            by_id = {chunk_id: i for i, chunk_id in enumerate(ids)}
+            merged_documents = [
+                documents[by_id[c]] if documents is not None else d
+                for c, d in zip(current["ids"], current["documents"])
+            ]
+            merged_metadatas = [
+                metadatas[by_id[c]] if metadatas is not None else m
+                for c, m in zip(current["ids"], current["metadatas"])
+            ]
+            vectors = self._vectors(embeddings, None, len(ids))[[by_id[c] for c in current["ids"]]]
+            self._remove([self._row_of[c] for c in current["ids"]])
+            self._append(current["ids"], vectors, merged_documents, merged_metadatas)
+
+    def delete(self, ids=None, where=None):
+        with self._writing():
+            if ids is not None:
+                rows = [self._row_of[i] for i in ([ids] if isinstance(ids, str) else ids) if i in self._row_of]
+                if where is not None:
+                    rows = [r for r in rows if matches(self._metadatas[r], where)]
+            elif where is not None:
+                rows = self._filter_rows(where).tolist()
+            else:
+                raise ValueError("delete() needs ids or where")
+            self._remove(rows)
+            self._write_state()
+            self._maybe_compact()
+
+    def _maybe_compact(self):
+        size = self._state.get("size", 0)
+        dead = size - len(self._row_of)
+        if size >= COMPACT_MIN_ROWS and dead > size * COMPACT_DEAD_RATIO:
+            self._compact()
+
+    def _compact(self):
+        """Rewrite the matrix with live rows only and renumber them"""
+        alive = np.flatnonzero(self._alive)
+        tmp = self.path / f"{VECTORS}.tmp"
+        with open(tmp, "wb") as f:
+            for start in range(0, len(alive), SCAN_BLOCK):
+                f.write(np.asarray(self._matrix[alive[start:start + SCAN_BLOCK]]).tobytes())
+        renumber = [(-(new + 1), int(old)) for new, old in enumerate(alive)]
+        with self._conn:
+            # Two passes so new numbers never collide with old ones
+            self._conn.executemany("UPDATE rows SET row = ? WHERE row = ?", renumber)
+            self._conn.execute("UPDATE rows SET row = -row - 1")
+        os.replace(tmp, self.path / VECTORS)
+        for stale in (CODES, QUANTIZER):
+            (self.path / stale).unlink(missing_ok=True)
+        self._state["size"] = len(alive)
+        self._write_state()
+        logger.info(f"Compacted {self.name}: {len(self._ids)} -> {len(alive)} rows")
+        self._load()
+        self._maybe_quantize()
+
+    # -- quantization --------------------------------------------------------
+
+    def _maybe_quantize(self):
+        if self.quantization == NONE or len(self._row_of) < self.quantize_min_rows:
+            return
+        if self._quantizer is None or len(self._ids) >= RETRAIN_GROWTH * self._quantizer.trained_rows:
+            self._train_quantizer()
+
+    def _train_quantizer(self):
+        """Fit on a sample of live rows and encode the whole matrix"""
+        alive = np.flatnonzero(self._alive)
+        rng = np.random.default_rng(len(self._ids))
+        sample = np.sort(rng.choice(alive, min(len(alive), quantization.TRAIN_SAMPLE), replace=False))
+        quantizer = quantization.train(
+            self.quantization, np.asarray(self._matrix[sample], dtype=np.float32), self.subvector_dims
+        )
+        quantizer.trained_rows = len(alive)
+
+        tmp = self.path / f"{CODES}.tmp"
+        with open(tmp, "wb") as f:
+            for start in range(0, len(self._ids), SCAN_BLOCK):
+                block = np.asarray(self._matrix[start:start + SCAN_BLOCK], dtype=np.float32)
+                f.write(quantizer.encode(block).tobytes())
+        os.replace(tmp, self.path / CODES)
+        quantization.save(quantizer, self.path / QUANTIZER)
+        self._write_state()
+        self._quantizer = quantizer
+        self._ann = None
+        self._map_codes()
+        logger.info(
+            f"Quantized {self.name} ({self.quantization}): {len(self._ids)} rows, "
+            f"{quantizer.code_size} bytes per vector"
+        )
+
+    def quantize(self):
+        """Train (or retrain) the quantizer now instead of waiting for quantize_min_rows"""
+        if self.quantization == NONE:
+            raise ValueError("Quantization is disabled for this collection")
+        with self._writing():
+            if self._row_of:
+                self._train_quantizer()
+
+    def memory_usage(self) -> Dict[str, Any]:
+        """Bytes of full-precision vectors vs. the codes that are actually scanned"""
+        with self._lock:
+            self._refresh()
+            size = len(self._ids)
+            vector_bytes = size * (self.dimensions or 0) * np.dtype(self.dtype).itemsize
+            code_bytes = size * self._quantizer.code_size if self._quantizer is not None else 0
+            return {
+                "rows": len(self._row_of),
+                "dimensions": self.dimensions,
+                "dtype": np.dtype(self.dtype).name,
+                "quantization": self._quantizer.mode if self._quantizer is not None else NONE,
+                "vector_bytes": vector_bytes,
+                "code_bytes": code_bytes,
+                "compression": round(vector_bytes / code_bytes, 1) if code_bytes else 1.0,
+                "ann_index": self._ann is not None
+            }
+
+    # -- reads ---------------------------------------------------------------
+
+    def count(self) -> int:
+        with self._lock:
+            self._refresh()
+            return len(self._row_of)
+
+    def _posting_rows(self, key: str, value: Any) -> np.ndarray:
+        postings = self._postings.get(key)
+        if postings is None:
+            postings = self._postings[key] = {}
+            for row, metadata in enumerate(self._metadatas):
+                if metadata is not None:
+                    postings.setdefault(metadata.get(key), []).append(row)
+        return np.asarray(postings.get(value, ()), dtype=np.int64)
+
+    def _filter_rows(self, where: Dict[str, Any]) -> np.ndarray:
+        """Sorted live rows matching a where filter"""
+        terms = _equalities(where)
+        if terms:
+            rows = None
+            for key, value in terms.items():
+                posting = self._posting_rows(key, value)
+                rows = posting if rows is None else np.intersect1d(rows, posting, assume_unique=True)
+            return rows[self._alive[rows]] if len(rows) else rows
+        return np.asarray(
+            [row for row, metadata in enumerate(self._metadatas)
+             if metadata is not None and matches(metadata, where)],
+            dtype=np.int64
+        )
+
+    def _documents(self, ids: List[str]) -> List[Optional[str]]:
+        found: Dict[str, Optional[str]] = {}
+        for start in range(0, len(ids), 500):
+            batch = ids[start:start + 500]
+            placeholders = ",".join("?" * len(batch))
+            found.update(self._conn.execute(
+                f"SELECT id, document FROM rows WHERE id IN ({placeholders})", batch
+            ).fetchall())
+        return [found.get(chunk_id) for chunk_id in ids]
+
+    def _result(self, rows: List[int], include: List[str]) -> Dict[str, Any]:
+        ids = [self._ids[row] for row in rows]
+        return {
+            "ids": ids,
+            "embeddings": (np.asarray(self._matrix[rows], dtype=np.float32).tolist()
+                           if "embeddings" in include and rows else ([] if "embeddings" in include else None)),
+            "documents": self._documents(ids) if "documents" in include else None,
+            "metadatas": [dict(self._metadatas[row]) for row in rows] if "metadatas" in include else None
+        }
+
+    def get(self, ids=None, where=None, limit=None, offset=None, where_document=None,
+            include=("metadatas", "documents")) -> Dict[str, Any]:
+        if where_document is not None:
+            raise ValueError("where_document is not supported by the mmap backend")
+        with self._lock:
+            self._refresh()
+            if ids is not None:
+                rows = [self._row_of[i] for i in ([ids] if isinstance(ids, str) else ids) if i in self._row_of]
+                if where:
+                    rows = [row for row in rows if matches(self._metadatas[row], where)]
+            elif where:
+                rows = self._filter_rows(where).tolist()
+            else:
+                rows = np.flatnonzero(self._alive).tolist()
+            start = offset or 0
+            rows = rows[start:start + limit] if limit is not None else rows[start:]
+            return self._result(rows, list(include))
+
+    def _ann_index(self):
+        if self._ann is None:
+            alive = np.flatnonzero(self._alive)
+            index = hnswlib.Index(space="l2", dim=self.dimensions)
+            index.init_index(max_elements=max(len(self._ids), 1), ef_construction=100, M=16)
+            for start in range(0, len(alive), SCAN_BLOCK):
+                rows = alive[start:start + SCAN_BLOCK]
+                index.add_items(np.asarray(self._matrix[rows], dtype=np.float32), rows)
+            self._ann = index
+            logger.info(f"Built HNSW index for {self.name} ({len(alive)} rows)")
+        return self._ann
+
+    def _scan(self, queries: np.ndarray, rows: Optional[np.ndarray], k: int, quantized: bool = False):
+        """
+        Top-k by squared L2 over all live rows or the given rows
+
+        Exact against the matrix, or approximate against the quantized codes.
+        """
+        if quantized:
+            source = self._codes
+            distance = self._quantizer.distances
+        else:
+            source = self._matrix
+            norms = self._exact_norms()
+            query_norms = np.einsum("ij,ij->i", queries, queries)[:, None]
+
+            def distance(q: np.ndarray, block: np.ndarray) -> np.ndarray:
+                return query_norms + norms[block_rows][None, :] - 2.0 * q @ block.astype(np.float32).T
+
+        best_rows = np.empty((len(queries), 0), dtype=np.int64)
+        best_distances = np.empty((len(queries), 0), dtype=np.float32)
+        total = len(rows) if rows is not None else len(self._ids)
+
+        for start in range(0, total, SCAN_BLOCK):
+            if rows is not None:
+                block_rows = rows[start:start + SCAN_BLOCK]
+                block = np.asarray(source[block_rows])
+            else:
+                block_rows = np.arange(start, min(start + SCAN_BLOCK, total))
+                block = np.asarray(source[start:start + SCAN_BLOCK])
+            distances = distance(queries, block)
+            if rows is None:
+                distances[:, ~self._alive[block_rows]] = np.inf
+            distances = np.concatenate([best_distances, distances], axis=1)
+            candidates = np.concatenate([np.broadcast_to(best_rows, (len(queries), best_rows.shape[1])),
+                                         np.broadcast_to(block_rows, (len(queries), len(block_rows)))], axis=1)
+            if distances.shape[1] > k:
+                top = np.argpartition(distances, k - 1, axis=1)[:, :k]
+                distances = np.take_along_axis(distances, top, axis=1)
+                candidates = np.take_along_axis(candidates, top, axis=1)
+            best_distances, best_rows = distances, candidates
+
+        order = np.argsort(best_distances, axis=1)
+        return np.take_along_axis(best_rows, order, axis=1), np.take_along_axis(best_distances, order, axis=1)
+
+    def _rescore(self, queries: np.ndarray, candidates: np.ndarray, k: int):
+        """Exact distances for the quantized candidates of each query, best k kept"""
+        labels = np.empty((len(queries), k), dtype=np.int64)
+        distances = np.empty((len(queries), k), dtype=np.float32)
+        for i, (query, rows) in enumerate(zip(queries, candidates)):
+            order = np.sort(rows)       # sequential page access
+            exact = ((np.asarray(self._matrix[order], dtype=np.float32) - query) ** 2).sum(axis=1)
+            best = np.argsort(exact)[:k]
+            labels[i], distances[i] = order[best], exact[best]
+        return labels, distances
+
+    def query(self, query_embeddings=None, n_results: int = 10, where=None, where_document=None,
+              include=("metadatas", "documents", "distances"), query_texts=None) -> Dict[str, Any]:
+        if where_document is not None:
+            raise ValueError("where_document is not supported by the mmap backend")
+        if query_embeddings is None:
+            query_embeddings = self._embedding_function(query_texts)
+        queries = np.asarray(query_embeddings, dtype=np.float32)
+        include = list(include)
+
+        with self._lock:
+            self._refresh()
+            rows = self._filter_rows(where) if where else None
+            available = len(rows) if rows is not None else len(self._row_of)
+            k = min(n_results, available)
+            if k == 0 or self.dimensions is None:
+                empty = [[] for _ in queries]
+                return {"ids": empty, "embeddings": None, "documents": empty if "documents" in include else None,
+                        "metadatas": empty if "metadatas" in include else None,
+                        "distances": empty if "distances" in include else None}
+
+            if self._codes is not None:
+                pool = min(available, max(k * self.rescore_factor, RESCORE_MIN_CANDIDATES))
+                candidates, _ = self._scan(queries, rows, pool, quantized=True)
+                labels, distances = self._rescore(queries, candidates, k)
+            elif hnswlib is not None and available >= self.ann_threshold:
+                index = self._ann_index()
+                index.set_ef(max(128, 4 * k))
+                if rows is None:
+                    labels, distances = index.knn_query(queries, k=k)
+                else:
+                    mask = np.zeros(len(self._ids), dtype=bool)
+                    mask[rows] = True
+                    labels, distances = index.knn_query(queries, k=k, filter=lambda label: bool(mask[label]))
+            else:
+                labels, distances = self._scan(queries, rows, k)
+
+            results = [self._result(list(map(int, query_rows)), include) for query_rows in labels]
+            return {
+                "ids": [r["ids"] for r in results],
+                "embeddings": [r["embeddings"] for r in results] if "embeddings" in include else None,
+                "documents": [r["documents"] for r in results] if "documents" in include else None,
+                "metadatas": [r["metadatas"] for r in results] if "metadatas" in include else None,
+                "distances": distances.tolist() if "distances" in include else None
+            }
+
+
+class MmapVectorClient:
+    """
+    Client with the Chroma client methods KnowledgeManager relies on
+    - Collections are directories under `path`; handles are cached per process
+    """
+
+    max_batch_size = 100000
+
+    def __init__(
+        self,
+        path: str,
+        dtype: str = "float32",
+        ann_threshold: int = 20000,
+        quantization_mode: str = NONE,
+        quantize_min_rows: int = 10000,
+        rescore_factor: int = 10,
+        subvector_dims: int = 4
+    ):
+        if dtype not in DTYPES:
+            raise ValueError(f"Unsupported vector dtype: {dtype}")
+        if quantization_mode not in quantization.MODES:
+            raise ValueError(f"Unknown quantization: {quantization_mode}")
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.dtype = dtype
+        self.ann_threshold = ann_threshold
+        self.options = {
+            "quantization_mode": quantization_mode,
+            "quantize_min_rows": quantize_min_rows,
+            "rescore_factor": rescore_factor,
+            "subvector_dims": subvector_dims
+        }
+        self._collections: Dict[str, MmapCollection] = {}
+        self._lock = threading.Lock()
+
+    def _open(self, name: str, embedding_function=None) -> MmapCollection:
+        collection = self._collections.get(name)
+        if collection is None or not (self.path / name / STATE).exists():
+            collection = MmapCollection(self.path / name, name, self.dtype, self.ann_threshold,
+                                        embedding_function, **self.options)
+            self._collections[name] = collection
+        return collection
+
+    def get_collection(self, name: str, embedding_function=None) -> MmapCollection:
+        with self._lock:
+            if not (self.path / name / STATE).exists():
+                self._collections.pop(name, None)
+                raise ValueError(f"Collection {name} does not exist.")
+            return self._open(name, embedding_function)
+
+    def get_or_create_collection(self, name: str, metadata: Optional[Dict[str, Any]] = None,
+                                 embedding_function=None) -> MmapCollection:
+        if not _NAME_RE.match(name):
+            raise ValueError(f"Invalid collection name: {name}")
+        with self._lock:
+            directory = self.path / name
+            if not (directory / STATE).exists():
+                directory.mkdir(parents=True, exist_ok=True)
+                state = {"dimensions": None, "dtype": self.dtype, "size": 0, "generation": 0,
+                         "metadata": metadata or {}}
+                (directory / STATE).write_text(json.dumps(state), encoding="utf-8")
+            return self._open(name, embedding_function)
+
+    def delete_collection(self, name: str):
+        with self._lock:
+            directory = self.path / name
+            if not (directory / STATE).exists():
+                raise ValueError(f"Collection {name} does not exist.")
+            collection = self._collections.pop(name, None)
+            if collection is not None:
+                collection._conn.close()
+            shutil.rmtree(directory)
+
+    def list_collections(self) -> List[MmapCollection]:
+        return [
+            self.get_collection(directory.name)
+            for directory in sorted(self.path.iterdir())
+            if (directory / STATE).exists()
+        ]
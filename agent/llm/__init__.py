@@ -0,0 +1,23 @@
+"""
+LLM module initialization
+"""
+from .providers import (
+    LLMProvider, LLMProviderError, Completion, Usage,
+    GroqProvider, OpenAICompatibleProvider, FakeProvider, create_provider
+)
+from .router import ModelRouter, ModelRoute, RoutingPolicy, model_router
+
+__all__ = [
+    "LLMProvider",
+    "LLMProviderError",
+    "Completion",
+    "Usage",
+    "GroqProvider",
+    "OpenAICompatibleProvider",
+    "FakeProvider",
+    "create_provider",
+    "ModelRouter",
+    "ModelRoute",
+    "RoutingPolicy",
+    "model_router"
+]
@@ -0,0 +1,207 @@
+"""
+LLM Providers - Groq, OpenAI uyumlu ve yerel fake backend'ler
+"""
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Dict, Optional, List
+import json
+import time
+import urllib.error
+import urllib.request
+
+from groq import Groq
+from core.config import settings
+
+
+class LLMProviderError(Exception):
+    """Upstream LLM call failed"""
+
+
+@dataclass
+class Usage:
+    """Token usage of one completion"""
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    completion_time: Optional[float] = None
+
+
+@dataclass
+class Completion:
+    """Provider independent chat completion result"""
+    text: str
+    finish_reason: Optional[str] = None
+    model: Optional[str] = None
+    provider: Optional[str] = None
+    usage: Optional[Usage] = None
+
+
+class LLMProvider(ABC):
+    """
+    Blocking chat-completions backend
+    - complete() runs inside the scheduler's worker thread
+    """
+
+    name = "base"
+
+    @abstractmethod
+    def complete(
+        self,
+        model: str,
+        messages: List[Dict[str, str]],
+        temperature: float = 0.7,
+        max_tokens: int = 1000
+    ) -> Completion:
+        """Run one chat completion"""
+
+
+class GroqProvider(LLMProvider):
+    """Groq SDK backend"""
+
+    name = "groq"
+
+    def __init__(self, api_key: str, base_url: Optional[str] = None):
+        self.client = Groq(api_key=api_key, base_url=base_url)
+
+    def complete(
+        self,
+        model: str,
+        messages: List[Dict[str, str]],
+        temperature: float = 0.7,
+        max_tokens: int = 1000
+    ) -> Completion:
+        response = self.client.chat.completions.create(
+            model=model,
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_tokens
+        )
+        choice = response.choices[0]
+        usage = getattr(response, "usage", None)
+        return Completion(
+            text=choice.message.content or "",
+            finish_reason=choice.finish_reason,
+            model=getattr(response, "model", model),
+            provider=self.name,
+            usage=Usage(
+                prompt_tokens=usage.prompt_tokens or 0,
+                completion_tokens=usage.completion_tokens or 0,
+                completion_time=getattr(usage, "completion_time", None)
+            ) if usage is not None else None
+        )
+
+
+class OpenAICompatibleProvider(LLMProvider):
+    """
+    Any server speaking the OpenAI /chat/completions API
+    (vLLM, llama.cpp server, Ollama, OpenAI itself)
+    """
+
+    name = "openai"
+
+    def __init__(self, base_url: str, api_key: str = "", timeout: float = 60.0):
+        self.url = base_url.rstrip("/") + "/chat/completions"
+        self.api_key = api_key
+        self.timeout = timeout
+
+    def complete(
+        self,
+        model: str,
+        messages: List[Dict[str, str]],
+        temperature: float = 0.7,
+        max_tokens: int = 1000
+    ) -> Completion:
+        headers = {"Content-Type": "application/json"}
+        if self.api_key:
+            headers["Authorization"] = f"Bearer {self.api_key}"
+        request = urllib.request.Request(
+            self.url,
+            data=json.dumps({
+                "model": model,
+                "messages": messages,
+                "temperature": temperature,
+                "max_tokens": max_tokens
+            }).encode("utf-8"),
+            headers=headers,
+            method="POST"
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                body = json.loads(response.read())
+        except urllib.error.HTTPError as e:
+            raise LLMProviderError(f"{self.url} returned {e.code}: {e.read()[:200]!r}") from e
+        except urllib.error.URLError as e:
+            raise LLMProviderError(f"{self.url} unreachable: {e.reason}") from e
+
+        choice = body["choices"][0]
+        usage = body.get("usage")
+        return Completion(
+            text=choice["message"].get("content") or "",
+            finish_reason=choice.get("finish_reason"),
+            model=body.get("model", model),
+            provider=self.name,
+            usage=Usage(
+                prompt_tokens=usage.get("prompt_tokens", 0),
+                completion_tokens=usage.get("completion_tokens", 0),
+                completion_time=usage.get("completion_time")
+            ) if usage else None
+        )
+
+
+class FakeProvider(LLMProvider):
+    """
+    Local deterministic backend for development and tests
+    - No network; answers echo the question after a configurable delay
+    """
+
+    name = "fake"
+
+    def __init__(self, latency: float = 0.0, tokens_per_second: float = 0.0):
+        self.latency = latency
+        self.tokens_per_second = tokens_per_second
+
+    def complete(
+        self,
+        model: str,
+        messages: List[Dict[str, str]],
+        temperature: float = 0.7,
+        max_tokens: int = 1000
+    ) -> Completion:
+        question = messages[-1]["content"] if messages else ""
+        words = f"[{model}] {question}".split()[:max_tokens]
+        generation = len(words) / self.tokens_per_second if self.tokens_per_second else 0.0
+        time.sleep(self.latency + generation)
+        return Completion(
+            text=" ".join(words),
+            finish_reason="stop",
+            model=model,
+            provider=self.name,
+            usage=Usage(
+                prompt_tokens=sum(len(m["content"]) for m in messages) // 4,
+                completion_tokens=len(words),
+                completion_time=generation
+            )
+        )
+
+
+def create_provider(name: str) -> LLMProvider:
+    """
+    Build a provider from settings
+
+    Args:
+        name: "groq", "openai" or "fake"
+
+    Returns:
+        Provider instance
+    """
+    name = name.lower()
+    if name == "groq":
+        return GroqProvider(settings.GROQ_API_KEY, settings.GROQ_BASE_URL)
+    if name == "openai":
+        return OpenAICompatibleProvider(
+            settings.OPENAI_COMPATIBLE_BASE_URL,
+            settings.OPENAI_COMPATIBLE_API_KEY,
+            settings.LLM_REQUEST_TIMEOUT
+        )
+    if name == "fake":
+        return FakeProvider(settings.FAKE_LLM_LATENCY)
+    raise ValueError(f"Unknown LLM provider: {name}")
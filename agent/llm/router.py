@@ -0,0 +1,221 @@
+"""
+Model Router - Soru karmaşıklığına ve agent politikasına göre model seçimi
+"""
+from dataclasses import dataclass, field, replace
+from typing import Dict, Any, Optional, List, Tuple
+import json
+import re
+
+from agent.scheduler import llm_scheduler, Priority
+from core import metrics
+from core.config import settings
+from core.logging import logger
+from .providers import Completion, LLMProvider, create_provider
+
+
+SMALL = "small"
+LARGE = "large"
+
+# Tasks that always need the large model
+LARGE_TASKS = {"analysis", "recommendation"}
+
+# Phrases that mark a question as multi-step or configuration heavy
+COMPLEX_HINTS = (
+    "configure", "configuration", "integrate", "integration", "compare", "migrate",
+    "step by step", "troubleshoot", "architecture", "why", "difference between",
+    "yapılandır", "entegrasyon", "karşılaştır", "adım adım", "neden", "kurulum", "hata"
+)
+_CODE_RE = re.compile(r"```|\{.*\}|<[a-z]+>", re.DOTALL)
+
+
+@dataclass
+class ModelRoute:
+    """Where and how one call is served"""
+    tier: str
+    provider: str
+    model: str
+    max_tokens: int
+
+
+@dataclass
+class RoutingPolicy:
+    """
+    Per-agent routing policy
+    - mode "auto" routes by question complexity, "small" / "large" pin a tier
+    - Unset models / providers fall back to the global settings
+    """
+    mode: str = "auto"
+    small_model: str = ""
+    large_model: str = ""
+    small_provider: str = ""
+    large_provider: str = ""
+    small_max_tokens: int = 256
+    short_query_chars: int = 160
+    complex_hints: Tuple[str, ...] = field(default=COMPLEX_HINTS)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], base: "RoutingPolicy") -> "RoutingPolicy":
+        known = {k: v for k, v in data.items() if k in cls.__dataclass_fields__}
+        if "complex_hints" in known:
+            known["complex_hints"] = tuple(known["complex_hints"])
+        return replace(base, **known)
+
+
+class ModelRouter:
+    """
+    Cost / latency aware model routing on top of the provider layer
+    - Short FAQ-like chat questions go to the small model with a tight max_tokens
+    - Long, multi-part, configuration or analysis requests keep the large model
+      and the caller's max_tokens
+    - Calls go through the shared LLM scheduler, billed by their max_tokens
+    """
+
+    def __init__(
+        self,
+        default_policy: RoutingPolicy,
+        agent_policies: Optional[Dict[str, RoutingPolicy]] = None,
+        providers: Optional[Dict[str, LLMProvider]] = None
+    ):
+        self.default_policy = default_policy
+        self.agent_policies: Dict[str, RoutingPolicy] = dict(agent_policies or {})
+        self._providers: Dict[str, LLMProvider] = dict(providers or {})
+
+    def policy_for(self, agent_id: Optional[str]) -> RoutingPolicy:
+        return self.agent_policies.get(agent_id or "", self.default_policy)
+
+    def set_policy(self, agent_id: str, policy: RoutingPolicy):
+        self.agent_policies[agent_id] = policy
+
+    def provider(self, name: str) -> LLMProvider:
+        """Provider by name, created on first use"""
+        provider = self._providers.get(name)
+        if provider is None:
+            provider = self._providers[name] = create_provider(name)
+        return provider
+
+    def set_provider(self, name: str, provider: LLMProvider):
+        self._providers[name] = provider
+
+    def classify(self, query: str, policy: RoutingPolicy) -> Tuple[str, str]:
+        """
+        Decide the tier of a chat question
+
+        Returns:
+            (tier, reason)
+        """
+        text = query.strip().lower()
+        if len(text) > policy.short_query_chars:
+            return LARGE, "long"
+        if text.count("?") > 1 or "\n" in text:
+            return LARGE, "multi_part"
+        if _CODE_RE.search(text):
+            return LARGE, "code"
+        if any(hint in text for hint in policy.complex_hints):
+            return LARGE, "complex"
+        return SMALL, "short"
+
+    def route(
+        self,
+        task: str,
+        query: str,
+        agent_id: Optional[str] = None,
+        max_tokens: int = 1000
+    ) -> ModelRoute:
+        """
+        Pick tier, provider, model and max_tokens for a call
+
+        Args:
+            task: "chat", "analysis" or "recommendation"
+            query: The user question the call answers
+            agent_id: Agent / product the call belongs to
+            max_tokens: Upper bound requested by the caller
+
+        Returns:
+            Resolved route
+        """
+        policy = self.policy_for(agent_id)
+        if task in LARGE_TASKS:
+            tier, reason = LARGE, task
+        elif policy.mode in (SMALL, LARGE):
+            tier, reason = policy.mode, "policy"
+        else:
+            tier, reason = self.classify(query, policy)
+
+        metrics.LLM_ROUTES.labels(tier, reason).inc()
+        if tier == SMALL:
+            return ModelRoute(
+                tier=SMALL,
+                provider=policy.small_provider or settings.LLM_PROVIDER,
+                model=policy.small_model or settings.LLM_SMALL_MODEL or settings.GROQ_MODEL,
+                max_tokens=min(max_tokens, policy.small_max_tokens)
+            )
+        return ModelRoute(
+            tier=LARGE,
+            provider=policy.large_provider or settings.LLM_PROVIDER,
+            model=policy.large_model or settings.LLM_LARGE_MODEL or settings.GROQ_MODEL,
+            max_tokens=max_tokens
+        )
+
+    async def complete(
+        self,
+        task: str,
+        messages: List[Dict[str, str]],
+        query: str,
+        agent_id: Optional[str] = None,
+        priority: Priority = Priority.INTERACTIVE,
+        temperature: float = 0.7,
+        max_tokens: int = 1000
+    ) -> Completion:
+        """
+        Route and run one completion through the scheduler
+
+        Args:
+            task: "chat", "analysis" or "recommendation"
+            messages: Chat messages
+            query: The user question, used for routing
+            agent_id: Agent / product the call belongs to
+            priority: Scheduler priority class
+            temperature: Sampling temperature
+            max_tokens: Upper bound for the large tier
+
+        Returns:
+            Completion from the selected provider
+        """
+        route = self.route(task, query, agent_id, max_tokens)
+        return await llm_scheduler.run(
+            self.provider(route.provider).complete,
+            agent_id=agent_id,
+            priority=priority,
+            cost=route.max_tokens,
+            model=route.model,
+            messages=messages,
+            temperature=temperature,
+            max_tokens=route.max_tokens
+        )
+
+
+def _parse_policies(raw: str, base: RoutingPolicy) -> Dict[str, RoutingPolicy]:
+    """Parse LLM_AGENT_POLICIES: JSON object of agent_id -> policy fields"""
+    if not raw.strip():
+        return {}
+    try:
+        return {
+            agent_id: RoutingPolicy.from_dict(data, base)
+            for agent_id, data in json.loads(raw).items()
+        }
+    except (ValueError, TypeError, AttributeError) as e:
+        logger.warning(f"Ignoring invalid LLM_AGENT_POLICIES: {e}")
+        return {}
+
+
+_default_policy = RoutingPolicy(
+    mode=settings.LLM_ROUTING_MODE,
+    small_max_tokens=settings.LLM_SMALL_MAX_TOKENS,
+    short_query_chars=settings.LLM_SHORT_QUERY_CHARS
+)
+
+# Global instance
+model_router = ModelRouter(
+    _default_policy,
+    _parse_policies(settings.LLM_AGENT_POLICIES, _default_policy)
+)
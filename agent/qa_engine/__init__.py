@@ -2,5 +2,6 @@
 QA Engine module initialization
 """
 from .qa_processor import QAProcessor
+from .fast_path import FastPathAnswer, FastPathResponder, fast_path
 
-__all__ = ["QAProcessor"]
+__all__ = ["QAProcessor", "FastPathAnswer", "FastPathResponder", "fast_path"]
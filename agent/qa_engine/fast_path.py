@@ -0,0 +1,190 @@
+"""
+Fast Path - LLM'e gitmeden yerel cevap katmanı
+"""
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Any, Optional, List, Tuple
+import math
+
+from agent.analytics.heavy_hitters import normalize_question
+from core.config import settings
+
+
+FAQ = "faq"
+CANNED = "canned"
+GREETING = "greeting"
+THANKS = "thanks"
+
+_GREETING_WORDS = {
+    "hi", "hello", "hey", "hiya", "morning", "evening", "afternoon", "good", "there",
+    "merhaba", "merhabalar", "selam", "selamlar", "günaydın", "iyi", "akşamlar",
+    "günler", "hayırlı", "sabahlar"
+}
+_GREETING_OPENERS = {
+    "hi", "hello", "hey", "hiya", "good", "merhaba", "merhabalar", "selam", "selamlar",
+    "günaydın", "iyi", "hayırlı"
+}
+_THANKS_WORDS = {
+    "thanks", "thank", "you", "thx", "ty", "so", "much", "a", "lot", "many", "great",
+    "ok", "okay", "teşekkürler", "teşekkür", "ederim", "ederiz", "sağol", "sağolun",
+    "sağ", "ol", "olun", "çok", "tamam", "harika", "eyvallah"
+}
+_THANKS_OPENERS = {"thanks", "thank", "thx", "ty", "teşekkürler", "teşekkür", "sağol", "sağolun", "sağ", "eyvallah"}
+_TURKISH_HINTS = set("çğıöşü") | {"merhaba", "selam", "tamam", "iyi", "sağ", "ol"}
+
+_REPLIES = {
+    (GREETING, "tr"): "Merhaba! Size nasıl yardımcı olabilirim?",
+    (GREETING, "en"): "Hello! How can I help you today?",
+    (THANKS, "tr"): "Rica ederim! Başka bir sorunuz olursa yardımcı olmaktan memnuniyet duyarım.",
+    (THANKS, "en"): "You're welcome! Let me know if there is anything else I can help with."
+}
+_SMALL_TALK_MAX_WORDS = 5
+
+
+@dataclass
+class FastPathAnswer:
+    """A locally produced answer"""
+    answer: str
+    kind: str
+    score: float
+    matched: Optional[str] = None
+
+
+def _trigrams(text: str) -> Dict[str, int]:
+    padded = f"  {text} "
+    grams: Dict[str, int] = {}
+    for i in range(len(padded) - 2):
+        gram = padded[i:i + 3]
+        grams[gram] = grams.get(gram, 0) + 1
+    return grams
+
+
+class _QuestionIndex:
+    """
+    Character-trigram cosine index over the questions of one owner
+    - Inverted postings: only entries sharing a trigram with the query are scored
+    - Tolerates casing, punctuation and small typos, not paraphrases
+    """
+
+    def __init__(self, entries: List[Dict[str, Any]]):
+        self.entries: List[Tuple[str, str]] = []
+        self.norms: List[float] = []
+        self.postings: Dict[str, List[Tuple[int, int]]] = {}
+
+        for entry in entries:
+            question = normalize_question(str(entry.get("question") or ""))
+            answer = entry.get("answer")
+            if not question or not answer:
+                continue
+            index = len(self.entries)
+            grams = _trigrams(question)
+            self.entries.append((str(entry["question"]), str(answer)))
+            self.norms.append(math.sqrt(sum(c * c for c in grams.values())))
+            for gram, count in grams.items():
+                self.postings.setdefault(gram, []).append((index, count))
+
+    def best(self, normalized: str) -> Optional[Tuple[int, float]]:
+        if not self.entries:
+            return None
+        grams = _trigrams(normalized)
+        query_norm = math.sqrt(sum(c * c for c in grams.values()))
+        dots: Dict[int, int] = {}
+        for gram, count in grams.items():
+            for index, entry_count in self.postings.get(gram, ()):
+                dots[index] = dots.get(index, 0) + count * entry_count
+        if not dots:
+            return None
+        # Rank by cosine, not raw overlap: long entries repeating the query's
+        # trigrams would otherwise outrank an exact match
+        index = max(dots, key=lambda i: dots[i] / self.norms[i])
+        return index, dots[index] / (query_norm * self.norms[index])
+
+
+class FastPathResponder:
+    """
+    LLM öncesi yerel cevap katmanı
+    - Agent'ın tanımladığı hazır cevaplar (canned_responses) ve ürün FAQ'ları
+      eşik üzerindeki benzerlikte doğrudan döner
+    - Selamlaşma ve teşekkür mesajlarına kalıp cevap verir (TR / EN)
+    - Index'ler owner başına ilk kullanımda kurulur; içerik değişince
+      version veya invalidate() ile yenilenir
+    - En fazla max_indexes index tutulur; en uzun süre kullanılmayan atılır (LRU)
+    """
+
+    def __init__(self, threshold: float = 0.9, enabled: bool = True, max_indexes: int = 1024):
+        self.threshold = threshold
+        self.enabled = enabled
+        self.max_indexes = max(1, max_indexes)
+        self._indexes: "OrderedDict[str, Tuple[Any, _QuestionIndex]]" = OrderedDict()
+
+    def invalidate(self, owner: str):
+        """Drop the index of one owner, rebuilt on the next lookup"""
+        self._indexes.pop(owner, None)
+
+    def _index(self, owner: str, entries: List[Dict[str, Any]], version: Any) -> _QuestionIndex:
+        cached = self._indexes.get(owner)
+        if cached is None or cached[0] != version:
+            cached = (version, _QuestionIndex(entries))
+            self._indexes[owner] = cached
+        self._indexes.move_to_end(owner)
+        while len(self._indexes) > self.max_indexes:
+            self._indexes.popitem(last=False)
+        return cached[1]
+
+    def match(
+        self,
+        owner: str,
+        message: str,
+        entries: Optional[List[Dict[str, Any]]] = None,
+        kind: str = FAQ,
+        version: Any = None
+    ) -> Optional[FastPathAnswer]:
+        """
+        Mesajı yerel olarak cevaplamayı dene
+
+        Args:
+            owner: Index anahtarı ("agent:<id>" / "product:<id>")
+            message: Kullanıcı mesajı
+            entries: {"question", "answer"} listesi (FAQ veya hazır cevaplar)
+            kind: Eşleşen entry'lerin türü (faq / canned)
+            version: Entry'lerin sürümü; değişirse index yeniden kurulur
+
+        Returns:
+            Cevap veya LLM'e gidilmesi gerekiyorsa None
+        """
+        if not self.enabled:
+            return None
+        normalized = normalize_question(message)
+        if not normalized:
+            return None
+
+        if entries:
+            question_index = self._index(owner, entries, version)
+            best = question_index.best(normalized)
+            if best is not None and best[1] >= self.threshold:
+                index, score = best
+                question, answer = question_index.entries[index]
+                return FastPathAnswer(answer=answer, kind=kind, score=round(score, 4), matched=question)
+
+        return self._small_talk(normalized)
+
+    def _small_talk(self, normalized: str) -> Optional[FastPathAnswer]:
+        words = normalized.split()
+        if len(words) > _SMALL_TALK_MAX_WORDS:
+            return None
+        if words[0] in _GREETING_OPENERS and all(w in _GREETING_WORDS for w in words):
+            kind = GREETING
+        elif words[0] in _THANKS_OPENERS and all(w in _THANKS_WORDS for w in words):
+            kind = THANKS
+        else:
+            return None
+        language = "tr" if any(w in _TURKISH_HINTS or set(w) & _TURKISH_HINTS for w in words) else "en"
+        return FastPathAnswer(answer=_REPLIES[(kind, language)], kind=kind, score=1.0)
+
+
+# Global instance
+fast_path = FastPathResponder(
+    threshold=settings.FAST_PATH_THRESHOLD,
+    enabled=settings.FAST_PATH_ENABLED,
+    max_indexes=settings.FAST_PATH_INDEX_CACHE_SIZE
+)
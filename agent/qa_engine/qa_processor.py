@@ -2,29 +2,35 @@
 QA Processor - Soru-cevap işleme motoru
 """
 from typing import Dict, Any, Optional, List
-from groq import Groq
+from core import tracing
 from core.config import settings
 from core.logging import logger
+from agent.actions import ActionResult, action_executor, build_actions_prompt, format_results, parse_actions, strip_actions
+from agent.analytics import record_confidence, record_error
+from agent.llm import Completion, ModelRouter, model_router
+from agent.scheduler import Priority
 
 
 class QAProcessor:
     """
     Kullanıcı sorularını işler ve cevaplayıcı
-    - Groq/LLM ile entegrasyon
+    - LLM çağrıları model router üzerinden (küçük / büyük model)
     - Context-aware yanıtlar
     - Güven skoru hesaplama
     """
     
-    def __init__(self):
-        self.client = Groq(api_key=settings.GROQ_API_KEY)
+    def __init__(self, router: Optional[ModelRouter] = None):
+        self.router = router or model_router
         self.conversation_history: Dict[str, List[Dict]] = {}
-        logger.info("QAProcessor initialized with Groq")
+        logger.info("QAProcessor initialized with model router")
     
-    def process_query(
+    async def process_query(
         self,
         query: str,
         context: Optional[str] = None,
-        system_prompt: Optional[str] = None
+        system_prompt: Optional[str] = None,
+        agent_id: Optional[str] = None,
+        priority: Priority = Priority.INTERACTIVE
     ) -> str:
         """
         Process a query with optional context and system prompt
@@ -33,6 +39,8 @@ class QAProcessor:
             query: User's question
             context: Relevant context from documents
             system_prompt: Custom system prompt for the agent
+            agent_id: Agent the upstream call is scheduled for
+            priority: Scheduler priority class
             
         Returns:
             Generated response
@@ -51,26 +59,126 @@ class QAProcessor:
             
             messages.append({"role": "user", "content": user_message})
             
-            # Call Groq API
-            response = self.client.chat.completions.create(
-                model=settings.GROQ_MODEL,
-                messages=messages,
+            # Routed to the small or large model through the shared scheduler
+            completion = await self.router.complete(
+                "chat",
+                messages,
+                query=query,
+                agent_id=agent_id,
+                priority=priority,
                 temperature=0.7,
                 max_tokens=1000
             )
             
-            return response.choices[0].message.content
+            record_confidence(self._calculate_confidence(completion))
+            
+            return completion.text
             
         except Exception as e:
             logger.error(f"Error processing query: {str(e)}")
+            record_error()
             return "I apologize, but I encountered an error processing your request. Please try again."
     
+    async def process_with_actions(
+        self,
+        query: str,
+        endpoints: List[Dict[str, Any]],
+        context: Optional[str] = None,
+        system_prompt: Optional[str] = None,
+        agent_id: Optional[str] = None,
+        priority: Priority = Priority.INTERACTIVE
+    ) -> Dict[str, Any]:
+        """
+        Process a query with the agent's endpoints available as actions
+        
+        The first completion may request endpoint calls; they run in parallel
+        through the shared action executor and their results go to a second
+        completion that writes the answer. Without calls, the first completion
+        is the answer.
+        
+        Args:
+            query: User's question
+            endpoints: Endpoints registered on the agent
+            context: Relevant context from documents
+            system_prompt: Custom system prompt for the agent
+            agent_id: Agent the upstream calls are scheduled for
+            priority: Scheduler priority class
+            
+        Returns:
+            {"response": answer text, "actions": call summaries}
+        """
+        try:
+            max_calls = settings.ACTIONS_MAX_CALLS_PER_TURN
+            prompt = (system_prompt or "") + build_actions_prompt(
+                endpoints, max_calls, settings.ACTIONS_EXAMPLE_CHARS
+            )
+            user_message = query
+            if context:
+                # Retrieved documents are untrusted: they must not carry action calls
+                user_message = f"Context:\n{strip_actions(context)}\n\nQuestion: {query}"
+            messages = [
+                {"role": "system", "content": prompt},
+                {"role": "user", "content": user_message}
+            ]
+            
+            completion = await self.router.complete(
+                "chat", messages, query=query, agent_id=agent_id, priority=priority,
+                temperature=0.7, max_tokens=1000
+            )
+            requested = parse_actions(completion.text)[:max_calls]
+            if not requested:
+                record_confidence(self._calculate_confidence(completion))
+                return {"response": completion.text, "actions": []}
+            
+            by_name = {str(endpoint.get("name", "")).strip().lower(): endpoint for endpoint in endpoints}
+            results: List[Optional[ActionResult]] = []
+            calls = []
+            for request in requested:
+                endpoint = by_name.get(request.name.lower())
+                if endpoint is None or request.error:
+                    # Not called, but reported back so the model can correct itself
+                    results.append(ActionResult(
+                        request.name, "", "", error=request.error or "Unknown endpoint"
+                    ))
+                else:
+                    results.append(None)
+                    calls.append((endpoint, request.params))
+            with tracing.span("actions", calls=len(calls)):
+                executed = iter(await action_executor.execute_many(calls))
+            results = [result or next(executed) for result in results]
+            
+            messages.append({"role": "assistant", "content": completion.text})
+            messages.append({
+                "role": "user",
+                "content": format_results(results, settings.ACTIONS_RESULT_CHARS)
+                + f"\n\nUsing these results, answer the original question: {query}"
+            })
+            completion = await self.router.complete(
+                "chat", messages, query=query, agent_id=agent_id, priority=priority,
+                temperature=0.7, max_tokens=1000
+            )
+            record_confidence(self._calculate_confidence(completion))
+            
+            return {
+                "response": strip_actions(completion.text),
+                "actions": [result.summary() for result in results]
+            }
+            
+        except Exception as e:
+            logger.error(f"Error processing query with actions: {str(e)}")
+            record_error()
+            return {
+                "response": "I apologize, but I encountered an error processing your request. Please try again.",
+                "actions": []
+            }
+    
     async def process_question(
         self,
         question: str,
         product_knowledge: Dict[str, Any],
         context: Optional[Dict[str, Any]] = None,
-        session_id: Optional[str] = None
+        session_id: Optional[str] = None,
+        priority: Priority = Priority.INTERACTIVE
     ) -> Dict[str, Any]:
         """
         Soruyu işle ve cevap üret
@@ -80,30 +188,36 @@ class QAProcessor:
             product_knowledge: Ürün bilgi tabanı
             context: Ek bağlam bilgisi
             session_id: Oturum ID'si
+            priority: Scheduler öncelik sınıfı
             
         Returns:
             Cevap ve metadata
         """
         try:
             # Prepare context for LLM
-            system_prompt = self._build_system_prompt(product_knowledge)
-            user_context = self._prepare_context(question, context, session_id)
+            with tracing.span("prompt_build"):
+                system_prompt = self._build_system_prompt(product_knowledge)
+                user_context = self._prepare_context(question, context, session_id)
             
-            # Call Groq API
-            response = self.client.chat.completions.create(
-                model=settings.GROQ_MODEL,
-                messages=[
+            # Routed to the small or large model through the shared scheduler
+            completion = await self.router.complete(
+                "chat",
+                [
                     {"role": "system", "content": system_prompt},
                     {"role": "user", "content": user_context}
                 ],
+                query=question,
+                agent_id=product_knowledge.get("product_id"),
+                priority=priority,
                 temperature=0.7,
                 max_tokens=500
             )
             
-            answer = response.choices[0].message.content
+            answer = completion.text
             
             # Calculate confidence score
-            confidence = self._calculate_confidence(response)
+            confidence = self._calculate_confidence(completion)
+            record_confidence(confidence)
             
             # Generate suggestions
             suggestions = self._generate_suggestions(question, product_knowledge)
@@ -121,6 +235,7 @@ class QAProcessor:
             
         except Exception as e:
             logger.error(f"Error processing question: {str(e)}")
+            record_error()
             return {
                 "answer": "Üzgünüm, şu anda bu soruyu cevaplayamıyorum. Lütfen daha sonra tekrar deneyin.",
                 "confidence": 0.0,
@@ -128,6 +243,37 @@ class QAProcessor:
                 "config_suggestion": None
             }
     
+    def local_answer(
+        self,
+        question: str,
+        answer: str,
+        confidence: float,
+        product_knowledge: Dict[str, Any],
+        session_id: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Fast path cevabını process_question ile aynı şekle getir
+        
+        Args:
+            question: Kullanıcı sorusu
+            answer: FAQ / kalıp cevap
+            confidence: Eşleşme skoru
+            product_knowledge: Ürün bilgi tabanı
+            session_id: Oturum ID'si
+            
+        Returns:
+            Cevap ve metadata
+        """
+        if session_id:
+            self._update_history(session_id, question, answer)
+        
+        return {
+            "answer": answer,
+            "confidence": confidence,
+            "suggestions": self._generate_suggestions(question, product_knowledge),
+            "config_suggestion": None
+        }
+    
     def _build_system_prompt(self, product_knowledge: Dict[str, Any]) -> str:
         """System prompt oluştur"""
         product_name = product_knowledge.get("name", "Ürün")
@@ -178,18 +324,13 @@ Kurallar:
         
         return "\n".join(context_parts)
     
-    def _calculate_confidence(self, response: Any) -> float:
+    def _calculate_confidence(self, completion: Completion) -> float:
         """Cevap güven skorunu hesapla"""
         # Simple confidence calculation based on response
         # In production, implement more sophisticated scoring
-        try:
-            # Check if response has finish_reason
-            if hasattr(response.choices[0], 'finish_reason'):
-                if response.choices[0].finish_reason == 'stop':
-                    return 0.85
-            return 0.70
-        except:
-            return 0.50
+        if completion.finish_reason == 'stop':
+            return 0.85
+        return 0.70
     
     def _generate_suggestions(
         self,
@@ -0,0 +1,14 @@
+"""
+Scheduler module initialization
+"""
+from .llm_scheduler import LLMScheduler, Priority, llm_scheduler
+from .admission import AdmissionController, AdmissionDecision, admission_controller
+
+__all__ = [
+    "LLMScheduler",
+    "Priority",
+    "llm_scheduler",
+    "AdmissionController",
+    "AdmissionDecision",
+    "admission_controller"
+]
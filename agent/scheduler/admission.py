@@ -0,0 +1,84 @@
+"""
+Admission Control - LLM kuyruğu dolduğunda hızlı reddetme
+"""
+from dataclasses import dataclass
+import math
+
+from core.config import settings
+from .llm_scheduler import LLMScheduler, Priority, llm_scheduler
+
+
+@dataclass
+class AdmissionDecision:
+    """Result of an admission check"""
+    admitted: bool
+    retry_after: int = 0
+    reason: str = ""
+
+
+class AdmissionController:
+    """
+    Decides whether a new LLM-bound request may enter the scheduler queue
+    - Sheds lower priority classes first as the queue grows
+    - Rejects when the expected queue wait exceeds what a client will tolerate
+    - Suggests a Retry-After based on recent upstream latency
+    """
+
+    # Share of the queue depth budget each class may use before it is shed
+    SHED_THRESHOLDS = {
+        Priority.INTERACTIVE: 1.0,
+        Priority.ANALYSIS: 0.75,
+        Priority.BATCH: 0.5
+    }
+
+    def __init__(
+        self,
+        scheduler: LLMScheduler,
+        max_queue_depth: int = 64,
+        max_queue_wait: float = 10.0
+    ):
+        self.scheduler = scheduler
+        self.max_queue_depth = max(1, max_queue_depth)
+        self.max_queue_wait = max_queue_wait
+
+    def check(self, priority: Priority = Priority.INTERACTIVE) -> AdmissionDecision:
+        """
+        Check whether a request of the given class should be admitted
+
+        Args:
+            priority: Scheduler priority class of the request
+
+        Returns:
+            Admission decision with a Retry-After hint when rejected
+        """
+        depth = self.scheduler.queue_depth()
+        limit = self.max_queue_depth * self.SHED_THRESHOLDS[priority]
+        estimated_wait = self.scheduler.estimated_wait(priority)
+
+        if depth >= limit:
+            return AdmissionDecision(
+                admitted=False,
+                retry_after=self._retry_after(estimated_wait),
+                reason=f"LLM queue is full ({depth} waiting)"
+            )
+
+        if estimated_wait > self.max_queue_wait:
+            return AdmissionDecision(
+                admitted=False,
+                retry_after=self._retry_after(estimated_wait),
+                reason=f"Upstream is slow (estimated wait {estimated_wait:.1f}s)"
+            )
+
+        return AdmissionDecision(admitted=True)
+
+    def _retry_after(self, estimated_wait: float) -> int:
+        """Whole seconds a client should wait before retrying"""
+        return max(1, min(math.ceil(estimated_wait), 60))
+
+
+# Global instance
+admission_controller = AdmissionController(
+    llm_scheduler,
+    max_queue_depth=settings.ADMISSION_MAX_QUEUE_DEPTH,
+    max_queue_wait=settings.ADMISSION_MAX_QUEUE_WAIT
+)
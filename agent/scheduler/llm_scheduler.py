@@ -0,0 +1,302 @@
+"""
+LLM Scheduler - Upstream LLM çağrıları için ağırlıklı adil kuyruk
+"""
+from typing import Dict, Any, Optional, List, Callable, Deque
+from collections import deque
+from dataclasses import dataclass, field
+from enum import IntEnum
+import asyncio
+import heapq
+import itertools
+import time
+
+from agent.analytics import record_usage
+from core import metrics, tracing
+from core.config import settings
+from core.logging import logger
+from core.stats import percentile
+
+
+class Priority(IntEnum):
+    """Priority classes, lower value is served first"""
+    INTERACTIVE = 0
+    ANALYSIS = 1
+    BATCH = 2
+
+    @classmethod
+    def from_header(cls, value: Optional[str], default: "Priority") -> "Priority":
+        """
+        Resolve a client supplied priority hint
+
+        Clients may only lower their priority (e.g. a bulk job marking its
+        chat calls as batch), never raise it above the endpoint default.
+        """
+        if not value:
+            return default
+        try:
+            requested = cls[value.strip().upper()]
+        except KeyError:
+            return default
+        return max(default, requested)
+
+
+@dataclass(order=True)
+class _Entry:
+    """Queued request waiting for an upstream slot"""
+    start_tag: float
+    seq: int
+    agent_id: str = field(compare=False)
+    priority: Priority = field(compare=False)
+    future: asyncio.Future = field(compare=False)
+    enqueued_at: float = field(compare=False)
+    cancelled: bool = field(default=False, compare=False)
+
+
+class LLMScheduler:
+    """
+    Shared in-process scheduler for upstream LLM completions
+    - Strict priority between classes (interactive > analysis > batch)
+    - Start-time fair queuing between agents inside a class, weighted per agent
+    - Global concurrency cap with slots reserved for interactive traffic
+    - Queue wait statistics per priority class
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 8,
+        reserved_interactive_slots: int = 0,
+        agent_weights: Optional[Dict[str, float]] = None,
+        wait_sample_size: int = 2048,
+        latency_smoothing: float = 0.2
+    ):
+        self.max_concurrency = max(1, max_concurrency)
+        self.reserved_interactive_slots = min(
+            max(0, reserved_interactive_slots),
+            self.max_concurrency - 1
+        )
+        self.agent_weights: Dict[str, float] = dict(agent_weights or {})
+
+        self._queues: Dict[Priority, List[_Entry]] = {p: [] for p in Priority}
+        self._virtual_time: Dict[Priority, float] = {p: 0.0 for p in Priority}
+        self._last_finish: Dict[Priority, Dict[str, float]] = {p: {} for p in Priority}
+        self._seq = itertools.count()
+        self._in_flight = 0
+        self._wait_samples: Dict[Priority, Deque[float]] = {
+            p: deque(maxlen=wait_sample_size) for p in Priority
+        }
+        self._dispatched: Dict[Priority, int] = {p: 0 for p in Priority}
+        self._latency_smoothing = latency_smoothing
+        self._upstream_latency = 0.0
+
+    def set_weight(self, agent_id: str, weight: float):
+        """Set the fair-share weight of an agent (default 1.0)"""
+        if weight <= 0:
+            raise ValueError("Agent weight must be positive")
+        self.agent_weights[agent_id] = weight
+
+    async def run(
+        self,
+        func: Callable[..., Any],
+        *args: Any,
+        agent_id: Optional[str] = None,
+        priority: Priority = Priority.INTERACTIVE,
+        cost: float = 1.0,
+        **kwargs: Any
+    ) -> Any:
+        """
+        Wait for an upstream slot and run a blocking completion call in a worker thread
+
+        Args:
+            func: Blocking callable (e.g. client.chat.completions.create)
+            agent_id: Tenant the call is billed to for fair queuing
+            priority: Priority class of the call
+            cost: Expected cost of the call (e.g. max_tokens)
+
+        Returns:
+            Return value of func
+        """
+        priority = Priority(priority)
+        enqueued_at = time.monotonic()
+        with tracing.span("llm_queue", priority=priority.name.lower()):
+            await self._acquire(agent_id or "default", priority, cost)
+        waited = time.monotonic() - enqueued_at
+        self._wait_samples[priority].append(waited)
+        metrics.LLM_QUEUE_WAIT.labels(priority.name.lower()).observe(waited)
+
+        started_at = time.monotonic()
+        try:
+            with tracing.span("llm", model=kwargs.get("model", "")):
+                result = await asyncio.to_thread(func, *args, **kwargs)
+        finally:
+            elapsed = time.monotonic() - started_at
+            self._record_latency(elapsed)
+            self._release()
+
+        metrics.observe_llm_completion(
+            agent_id, kwargs.get("model"), priority.name.lower(), elapsed, result
+        )
+        record_usage(result)
+        return result
+
+    def _record_latency(self, elapsed: float):
+        """Update the moving average of upstream call duration"""
+        if self._upstream_latency == 0.0:
+            self._upstream_latency = elapsed
+        else:
+            alpha = self._latency_smoothing
+            self._upstream_latency = alpha * elapsed + (1 - alpha) * self._upstream_latency
+
+    async def _acquire(self, agent_id: str, priority: Priority, cost: float):
+        """Enqueue the caller and wait until the dispatcher grants a slot"""
+        loop = asyncio.get_running_loop()
+        weight = self.agent_weights.get(agent_id, 1.0)
+        last_finish = self._last_finish[priority]
+
+        start_tag = max(self._virtual_time[priority], last_finish.get(agent_id, 0.0))
+        last_finish[agent_id] = start_tag + max(cost, 0.0) / weight
+
+        entry = _Entry(
+            start_tag=start_tag,
+            seq=next(self._seq),
+            agent_id=agent_id,
+            priority=priority,
+            future=loop.create_future(),
+            enqueued_at=time.monotonic()
+        )
+        heapq.heappush(self._queues[priority], entry)
+        self._dispatch()
+
+        try:
+            await entry.future
+        except asyncio.CancelledError:
+            if entry.future.done() and not entry.future.cancelled():
+                # Slot was granted while the caller was being cancelled
+                self._release()
+            else:
+                entry.cancelled = True
+            raise
+
+    def _release(self):
+        """Return a slot and hand it to the next waiting request"""
+        self._in_flight -= 1
+        self._dispatch()
+
+    def _dispatch(self):
+        """Grant free slots to queued requests in priority / fair-share order"""
+        while self._in_flight < self.max_concurrency:
+            entry = self._next_entry()
+            if entry is None:
+                return
+
+            self._in_flight += 1
+            self._dispatched[entry.priority] += 1
+            self._virtual_time[entry.priority] = entry.start_tag
+            entry.future.set_result(None)
+
+    def _next_entry(self) -> Optional[_Entry]:
+        """Pop the next runnable entry, skipping cancelled waiters"""
+        for priority in Priority:
+            queue = self._queues[priority]
+            while queue and (queue[0].cancelled or queue[0].future.done()):
+                heapq.heappop(queue)
+
+            if not queue:
+                self._prune_finish_tags(priority)
+                continue
+
+            limit = self.max_concurrency
+            if priority != Priority.INTERACTIVE:
+                limit -= self.reserved_interactive_slots
+
+            # Lower classes have tighter limits, so nothing below can run either
+            if self._in_flight >= limit:
+                return None
+
+            return heapq.heappop(queue)
+
+        return None
+
+    def _prune_finish_tags(self, priority: Priority):
+        """Forget finish tags that no longer affect ordering"""
+        last_finish = self._last_finish[priority]
+        if len(last_finish) < 1024:
+            return
+        virtual_time = self._virtual_time[priority]
+        for agent_id in [a for a, f in last_finish.items() if f <= virtual_time]:
+            del last_finish[agent_id]
+
+    def queue_depth(self, priority: Optional[Priority] = None) -> int:
+        """Number of requests waiting for a slot"""
+        priorities = [priority] if priority is not None else list(Priority)
+        return sum(
+            1 for p in priorities for e in self._queues[p] if not e.cancelled
+        )
+
+    @property
+    def in_flight(self) -> int:
+        """Number of upstream calls currently running"""
+        return self._in_flight
+
+    @property
+    def upstream_latency(self) -> float:
+        """Exponential moving average of upstream call duration in seconds"""
+        return self._upstream_latency
+
+    def estimated_wait(self, priority: Priority = Priority.INTERACTIVE) -> float:
+        """
+        Rough queue wait for a new request of the given class
+
+        Everything queued at the same or a higher priority is served first,
+        draining at max_concurrency calls per upstream_latency seconds.
+        """
+        ahead = sum(self.queue_depth(p) for p in Priority if p <= priority)
+        return (ahead + 1) * self._upstream_latency / self.max_concurrency
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth, in-flight count and queue wait percentiles per class"""
+        classes = {}
+        for priority in Priority:
+            samples = sorted(self._wait_samples[priority])
+            classes[priority.name.lower()] = {
+                "queue_depth": self.queue_depth(priority),
+                "dispatched": self._dispatched[priority],
+                "wait_p50": _percentile(samples, 0.50),
+                "wait_p95": _percentile(samples, 0.95),
+                "wait_p99": _percentile(samples, 0.99)
+            }
+
+        return {
+            "max_concurrency": self.max_concurrency,
+            "reserved_interactive_slots": self.reserved_interactive_slots,
+            "in_flight": self._in_flight,
+            "upstream_latency": round(self._upstream_latency, 4),
+            "classes": classes
+        }
+
+
+def _percentile(samples: List[float], q: float) -> float:
+    """Nearest-rank percentile of sorted samples"""
+    return round(percentile(samples, q), 4)
+
+
+def _parse_weights(raw: str) -> Dict[str, float]:
+    """Parse "agent_id:weight,agent_id:weight" into a dict"""
+    weights = {}
+    for item in raw.split(","):
+        if ":" not in item:
+            continue
+        agent_id, _, weight = item.strip().rpartition(":")
+        try:
+            weights[agent_id] = float(weight)
+        except ValueError:
+            logger.warning(f"Ignoring invalid LLM agent weight: {item}")
+    return weights
+
+
+# Global instance
+llm_scheduler = LLMScheduler(
+    max_concurrency=settings.LLM_MAX_CONCURRENCY,
+    reserved_interactive_slots=settings.LLM_RESERVED_INTERACTIVE_SLOTS,
+    agent_weights=_parse_weights(settings.LLM_AGENT_WEIGHTS)
+)
+metrics.track_scheduler(llm_scheduler, Priority)
@@ -41,9 +41,10 @@ class AgentStore:
             "persona_tone": agent_data.get("persona_tone", "professional"),
             "persona_instructions": agent_data.get("persona_instructions", ""),
             "persona_constraints": agent_data.get("persona_constraints", ""),
+            "canned_responses": agent_data.get("canned_responses", []),
             "status": "active",
-            "documents": [],
-            "endpoints": [],
+            "documents": list(agent_data.get("documents", [])),
+            "endpoints": list(agent_data.get("endpoints", [])),
             "created_at": now.isoformat(),
             "updated_at": now.isoformat()
         }
@@ -95,6 +96,35 @@ class AgentStore:
         self._save_agent(agent_id)
         return True
     
+    def get_document(self, agent_id: str, doc_id: str) -> Optional[dict]:
+        """Get one document of an agent"""
+        agent = self.agents.get(agent_id)
+        if not agent:
+            return None
+        return next((d for d in agent["documents"] if d["id"] == doc_id), None)
+    
+    def update_document(self, agent_id: str, doc_id: str, changes: dict) -> Optional[dict]:
+        """Update the metadata of one document"""
+        document = self.get_document(agent_id, doc_id)
+        if document is None:
+            return None
+        
+        document.update(changes)
+        self.agents[agent_id]["updated_at"] = datetime.now().isoformat()
+        self._save_agent(agent_id)
+        return document
+    
+    def remove_document(self, agent_id: str, doc_id: str) -> bool:
+        """Remove a document from an agent"""
+        document = self.get_document(agent_id, doc_id)
+        if document is None:
+            return False
+        
+        self.agents[agent_id]["documents"].remove(document)
+        self.agents[agent_id]["updated_at"] = datetime.now().isoformat()
+        self._save_agent(agent_id)
+        return True
+    
     def add_endpoint(self, agent_id: str, endpoint: dict) -> bool:
         """Add an endpoint to an agent"""
         if agent_id not in self.agents:
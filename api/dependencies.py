@@ -0,0 +1,79 @@
+"""
+Shared API dependencies
+"""
+from typing import Optional, Callable
+import hashlib
+
+from fastapi import Header, HTTPException, Request
+
+from agent.scheduler import Priority, admission_controller
+from core import metrics
+from core.config import settings
+
+
+def _digest(api_key: str) -> str:
+    return hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:32]
+
+
+# Digests of the configured API keys; raw keys are never used as identities
+_API_KEY_DIGESTS = frozenset(_digest(key.strip()) for key in settings.API_KEYS.split(",") if key.strip())
+
+
+def client_key(request: Request) -> str:
+    """
+    Caller identity for rate limiting and distinct-user analytics
+
+    A configured API key (API_KEYS) identifies the caller; unknown keys are
+    ignored, otherwise every request with a fresh X-API-Key would get its
+    own bucket. Without a known key the client address is used.
+    """
+    api_key = request.headers.get("x-api-key")
+    if api_key:
+        digest = _digest(api_key)
+        if digest in _API_KEY_DIGESTS:
+            return f"key:{digest}"
+    return f"ip:{request.client.host if request.client else 'unknown'}"
+
+
+def admit(priority: Priority):
+    """
+    Admit or shed one LLM-bound request
+
+    Raises 503 + Retry-After when the LLM queue is backed up.
+    """
+    decision = admission_controller.check(priority)
+    if not decision.admitted:
+        metrics.REJECTED_REQUESTS.labels("admission").inc()
+        raise HTTPException(
+            status_code=503,
+            detail=decision.reason,
+            headers={"Retry-After": str(decision.retry_after)}
+        )
+
+
+def llm_priority(default: Priority) -> Callable:
+    """
+    Dependency factory that only resolves the request's scheduler priority
+
+    For handlers that may answer without the LLM and call admit() themselves
+    once they know an upstream call is needed.
+    """
+    async def dependency(x_request_priority: Optional[str] = Header(None)) -> Priority:
+        return Priority.from_header(x_request_priority, default)
+
+    return dependency
+
+
+def llm_admission(default: Priority) -> Callable:
+    """
+    Dependency factory that admits or sheds LLM-bound requests
+
+    Resolves the request's scheduler priority (X-Request-Priority may only
+    lower it) and rejects with 503 + Retry-After when the LLM queue is backed up.
+    """
+    async def dependency(x_request_priority: Optional[str] = Header(None)) -> Priority:
+        priority = Priority.from_header(x_request_priority, default)
+        admit(priority)
+        return priority
+
+    return dependency
@@ -0,0 +1,115 @@
+"""
+ASGI middleware
+"""
+import logging
+import random
+import time
+
+from core import metrics, tracing
+from core.config import settings
+from core.logging import access_logger
+
+
+class AccessLogMiddleware:
+    """
+    One structured access-log line and latency observation per request
+    - Plain ASGI, no per-request task or body wrapping
+    - 2xx/3xx responses are sampled with ACCESS_LOG_SAMPLE_RATE
+    - Errors (4xx/5xx) and requests slower than ACCESS_LOG_SLOW_MS are always logged
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.sample_rate = settings.ACCESS_LOG_SAMPLE_RATE
+        self.slow_threshold = settings.ACCESS_LOG_SLOW_MS / 1000.0
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start_time = time.perf_counter()
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            self._record(scope, status_code, time.perf_counter() - start_time)
+
+    def _record(self, scope, status_code: int, elapsed: float):
+        """Observe latency and emit the access-log entry if selected"""
+        # Label by route template, never the raw path, to bound cardinality
+        route = scope.get("route")
+        route_path = route.path if route is not None else "unmatched"
+        metrics.HTTP_REQUEST_DURATION.labels(
+            scope["method"], route_path, status_code
+        ).observe(elapsed)
+
+        slow = elapsed >= self.slow_threshold
+        if status_code < 400 and not slow and random.random() >= self.sample_rate:
+            return
+
+        if status_code >= 500:
+            level = logging.ERROR
+        elif status_code >= 400 or slow:
+            level = logging.WARNING
+        else:
+            level = logging.INFO
+
+        client = scope.get("client")
+        access_logger.log(level, {
+            "method": scope["method"],
+            "path": scope["path"],
+            "route": route_path,
+            "status": status_code,
+            "duration_ms": round(elapsed * 1000, 2),
+            "client": client[0] if client else None,
+            "slow": slow
+        })
+
+
+class ServerTimingMiddleware:
+    """
+    Per-request stage timing
+    - Starts a trace in a contextvar that route code adds spans to
+    - Returns the stage breakdown as a Server-Timing response header
+    - Hands finished traces to the span exporter when TRACE_EXPORT is set
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        trace = tracing.start_trace(
+            f"{scope['method']} {scope['path']}",
+            **{"http.method": scope["method"], "http.target": scope["path"]}
+        )
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                header = tracing.server_timing_header(trace, time.perf_counter_ns())
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"server-timing", header.encode("latin-1"))
+                ]
+                trace.attributes["http.status_code"] = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            if tracing.span_exporter is not None:
+                route = scope.get("route")
+                if route is not None:
+                    trace.name = f"{scope['method']} {route.path}"
+                    trace.attributes["http.route"] = route.path
+                tracing.span_exporter.export(trace, time.perf_counter_ns())
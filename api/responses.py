@@ -0,0 +1,159 @@
+"""
+API responses - hızlı JSON serileştirme ve koşullu GET (ETag / Last-Modified)
+"""
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Dict, Any, Callable, Iterable, Optional
+import gzip
+import hashlib
+
+import orjson
+from fastapi import Request
+from fastapi.responses import Response
+
+from core.config import settings
+
+
+# Clients must revalidate, which costs a 304 when nothing changed
+CACHE_CONTROL = "private, no-cache"
+
+
+def agent_payload(agent: Dict[str, Any]) -> Dict[str, Any]:
+    """Stored agent record in the AgentResponse shape, without model validation"""
+    return {
+        "id": agent['id'],
+        "name": agent['name'],
+        "description": agent['description'],
+        "persona_role": agent.get('persona_role', ''),
+        "persona_tone": agent.get('persona_tone', 'professional'),
+        "persona_instructions": agent.get('persona_instructions', ''),
+        "persona_constraints": agent.get('persona_constraints', ''),
+        "status": agent.get('status', 'active'),
+        "document_count": len(agent.get('documents', [])),
+        "endpoint_count": len(agent.get('endpoints', [])),
+        "canned_responses": agent.get('canned_responses', []),
+        "created_at": agent['created_at'],
+        "updated_at": agent['updated_at']
+    }
+
+
+def _version(agent: Dict[str, Any]) -> str:
+    # Counts are included so the tag also moves if a writer forgets updated_at
+    return f"{agent['id']}:{agent['updated_at']}:{len(agent.get('documents', []))}:{len(agent.get('endpoints', []))}"
+
+
+def agents_etag(agents: Iterable[Dict[str, Any]]) -> str:
+    """Weak ETag of one or more agent records (body may be gzip encoded)"""
+    digest = hashlib.sha1()
+    for agent in agents:
+        digest.update(_version(agent).encode("utf-8"))
+        digest.update(b"\n")
+    return f'W/"{digest.hexdigest()[:32]}"'
+
+
+def _timestamp(value: Any) -> Optional[datetime]:
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value)
+        except ValueError:
+            return None
+    if not isinstance(value, datetime):
+        return None
+    # Stored timestamps are naive local time; HTTP dates are UTC, whole seconds
+    return value.astimezone(timezone.utc).replace(microsecond=0)
+
+
+def last_modified(agents: Iterable[Dict[str, Any]]) -> Optional[datetime]:
+    """Latest updated_at of the records"""
+    stamps = [stamp for stamp in (_timestamp(agent.get('updated_at')) for agent in agents) if stamp]
+    return max(stamps) if stamps else None
+
+
+def not_modified(request: Request, etag: str, modified: Optional[datetime]) -> bool:
+    """
+    Conditional GET check
+
+    If-None-Match wins when present (RFC 9110); If-Modified-Since is only
+    consulted without it.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if if_none_match.strip() == "*":
+            return True
+        # Weak comparison: W/ prefixes are ignored
+        candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return etag.removeprefix("W/") in candidates
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        return modified <= since
+    return False
+
+
+def _accepts_gzip(request: Optional[Request]) -> bool:
+    if request is None:
+        return False
+    return any(
+        coding.split(";")[0].strip() == "gzip"
+        for coding in request.headers.get("accept-encoding", "").split(",")
+    )
+
+
+def json_response(
+    payload: Any,
+    status_code: int = 200,
+    headers: Optional[Dict[str, str]] = None,
+    request: Optional[Request] = None
+) -> Response:
+    """
+    orjson-encoded response; bypasses response_model validation
+
+    Bodies of at least GZIP_MIN_SIZE bytes are gzip encoded when the request
+    accepts it. Applied here rather than as middleware so binary downloads
+    (bundle export) are not recompressed.
+    """
+    body = orjson.dumps(payload, option=orjson.OPT_NON_STR_KEYS)
+    headers = dict(headers or {})
+    if settings.GZIP_MIN_SIZE and len(body) >= settings.GZIP_MIN_SIZE:
+        headers["Vary"] = "Accept-Encoding"
+        if _accepts_gzip(request):
+            body = gzip.compress(body, compresslevel=settings.GZIP_LEVEL)
+            headers["Content-Encoding"] = "gzip"
+    return Response(body, status_code=status_code, headers=headers, media_type="application/json")
+
+
+def cached_json(
+    request: Request,
+    agents: Iterable[Dict[str, Any]],
+    build: Callable[[], Any],
+    dated: bool = True
+) -> Response:
+    """
+    JSON response with validators, or 304 when the client copy is current
+
+    Args:
+        request: Incoming request (conditional headers)
+        agents: Agent records the body is derived from
+        build: Produces the payload; not called for 304
+        dated: Send / honour Last-Modified. Off for listings: a deleted
+            agent does not move the newest updated_at, only the ETag
+
+    Returns:
+        304 without body, or 200 with ETag (and Last-Modified)
+    """
+    agents = list(agents)
+    etag = agents_etag(agents)
+    modified = last_modified(agents) if dated else None
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    if modified is not None:
+        headers["Last-Modified"] = format_datetime(modified, usegmt=True)
+
+    if not_modified(request, etag, modified):
+        return Response(status_code=304, headers=headers)
+    return json_response(build(), headers=headers, request=request)
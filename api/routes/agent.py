@@ -2,12 +2,23 @@
 Agent API endpoints
 """
 from fastapi import APIRouter, HTTPException, Depends
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Iterator
+import json
+
+import numpy as np
 
 from agent.knowledge_base.knowledge_manager import KnowledgeManager
 from agent.qa_engine.qa_processor import QAProcessor
+from agent.qa_engine.fast_path import FAQ, fast_path
 from agent.config_manager.config_handler import ConfigHandler
+from agent.config_manager.pricing import pricing_catalog
+from agent.scheduler import Priority
+from agent.analytics import track_interaction, record_cache_hit, record_confidence
+from api.dependencies import admit, client_key, llm_admission, llm_priority
+from core import metrics, tracing
+from core.config import settings
 from core.logging import logger
 
 router = APIRouter()
@@ -32,6 +43,7 @@ class ChatResponse(BaseModel):
     confidence: float
     suggestions: Optional[List[str]] = None
     product_config: Optional[Dict[str, Any]] = None
+    source: str = "llm"
 
 
 class ConfigRequest(BaseModel):
@@ -49,67 +61,130 @@ class ConfigResponse(BaseModel):
     setup_steps: List[str]
 
 
+class QuoteConfiguration(BaseModel):
+    """One configuration to price"""
+    scale: str = "standard"
+    features: List[str] = []
+    api_integrations: List[str] = []
+
+
+class QuoteRequest(BaseModel):
+    """
+    Bulk pricing request model
+    
+    Either explicit configurations or a grid: every combination of
+    scales x feature_sets x integration_sets.
+    """
+    product_id: str
+    configurations: Optional[List[QuoteConfiguration]] = None
+    scales: Optional[List[str]] = None
+    feature_sets: Optional[List[List[str]]] = None
+    integration_sets: Optional[List[List[str]]] = None
+
+
 @router.post("/chat", response_model=ChatResponse)
-async def chat_with_agent(request: ChatRequest):
+async def chat_with_agent(
+    request: ChatRequest,
+    priority: Priority = Depends(llm_priority(Priority.INTERACTIVE)),
+    user_id: str = Depends(client_key)
+):
     """
     Agent ile sohbet et - Ürün soruları, bilgi talebi
     """
-    try:
-        logger.info(f"Chat request for product: {request.product_id}")
+    with track_interaction(
+        "chat", request.product_id, request.session_id, request.message, user_id
+    ):
+        try:
+            logger.info(f"Chat request for product: {request.product_id}")
         
-        # Get product knowledge
-        product_knowledge = await knowledge_manager.get_product_knowledge(
-            request.product_id
-        )
+            # Get product knowledge
+            with tracing.span("product_lookup"):
+                product_knowledge = await knowledge_manager.get_product_knowledge(
+                    request.product_id
+                )
         
-        if not product_knowledge:
-            raise HTTPException(status_code=404, detail="Product not found")
+            if not product_knowledge:
+                raise HTTPException(status_code=404, detail="Product not found")
         
-        # Process question with QA engine
-        response = await qa_processor.process_question(
-            question=request.message,
-            product_knowledge=product_knowledge,
-            context=request.context,
-            session_id=request.session_id
-        )
+            # FAQ hits, greetings and thanks are answered without the LLM
+            with tracing.span("fast_path"):
+                local = fast_path.match(
+                    f"product:{request.product_id}",
+                    request.message,
+                    product_knowledge.get("faq"),
+                    kind=FAQ
+                )
+            metrics.record_cache("fast_path", local is not None)
+            if local is not None:
+                record_cache_hit()
+                record_confidence(local.score)
+                response = qa_processor.local_answer(
+                    request.message, local.answer, local.score,
+                    product_knowledge, request.session_id
+                )
+                return ChatResponse(
+                    response=response["answer"],
+                    confidence=response["confidence"],
+                    suggestions=response.get("suggestions"),
+                    product_config=response.get("config_suggestion"),
+                    source="fast_path"
+                )
         
-        return ChatResponse(
-            response=response["answer"],
-            confidence=response["confidence"],
-            suggestions=response.get("suggestions"),
-            product_config=response.get("config_suggestion")
-        )
+            admit(priority)
         
-    except Exception as e:
-        logger.error(f"Error in chat endpoint: {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e))
+            # Process question with QA engine
+            response = await qa_processor.process_question(
+                question=request.message,
+                product_knowledge=product_knowledge,
+                context=request.context,
+                session_id=request.session_id,
+                priority=priority
+            )
+        
+            return ChatResponse(
+                response=response["answer"],
+                confidence=response["confidence"],
+                suggestions=response.get("suggestions"),
+                product_config=response.get("config_suggestion")
+            )
+        
+        except HTTPException:
+            raise
+        except Exception as e:
+            logger.error(f"Error in chat endpoint: {str(e)}")
+            raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.post("/configure", response_model=ConfigResponse)
-async def configure_product(request: ConfigRequest):
+async def configure_product(
+    request: ConfigRequest,
+    priority: Priority = Depends(llm_admission(Priority.ANALYSIS))
+):
     """
     Ürünü kullanıcı girdilerine göre yapılandır
     """
-    try:
-        logger.info(f"Configuration request for product: {request.product_id}")
+    with track_interaction("configure", request.product_id):
+        try:
+            logger.info(f"Configuration request for product: {request.product_id}")
         
-        # Generate configuration
-        config = await config_handler.generate_configuration(
-            product_id=request.product_id,
-            user_inputs=request.user_inputs,
-            requirements=request.requirements
-        )
+            # Generate configuration
+            config = await config_handler.generate_configuration(
+                product_id=request.product_id,
+                user_inputs=request.user_inputs,
+                requirements=request.requirements,
+                priority=priority
+            )
         
-        return ConfigResponse(
-            product_id=request.product_id,
-            configuration=config["settings"],
-            estimated_price=config.get("pricing"),
-            setup_steps=config["setup_steps"]
-        )
+            return ConfigResponse(
+                product_id=request.product_id,
+                configuration=config["settings"],
+                estimated_price=config.get("pricing"),
+                setup_steps=config["setup_steps"]
+            )
         
-    except Exception as e:
-        logger.error(f"Error in configure endpoint: {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e))
+        except Exception as e:
+            logger.error(f"Error in configure endpoint: {str(e)}")
+            raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.get("/product/{product_id}/capabilities")
@@ -131,7 +206,8 @@ async def get_product_capabilities(product_id: str):
 @router.post("/analyze-requirements")
 async def analyze_requirements(
     product_id: str,
-    requirements: List[str]
+    requirements: List[str],
+    priority: Priority = Depends(llm_admission(Priority.ANALYSIS))
 ):
     """
     Müşteri gereksinimlerini analiz et ve uygun yapılandırma öner
@@ -139,7 +215,8 @@ async def analyze_requirements(
     try:
         analysis = await config_handler.analyze_requirements(
             product_id=product_id,
-            requirements=requirements
+            requirements=requirements,
+            priority=priority
         )
         
         return {
@@ -152,3 +229,77 @@ async def analyze_requirements(
     except Exception as e:
         logger.error(f"Error analyzing requirements: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
+
+
+def _quote_lines(prices: np.ndarray, scales: Optional[List[str]], chunk: int) -> Iterator[bytes]:
+    """NDJSON rows, encoded a chunk at a time; grid rows when scales are given"""
+    flat = prices.reshape(-1).tolist()
+    if scales is None:
+        for start in range(0, len(flat), chunk):
+            yield "".join(
+                f'{{"index":{i},"price":{flat[i]}}}\n' for i in range(start, min(start + chunk, len(flat)))
+            ).encode("utf-8")
+        return
+    
+    names = [json.dumps(scale, ensure_ascii=False) for scale in scales]
+    _, features, integrations = prices.shape
+    per_scale = features * integrations
+    for start in range(0, len(flat), chunk):
+        yield "".join(
+            f'{{"scale":{names[i // per_scale]},"feature_set":{i % per_scale // integrations},'
+            f'"integration_set":{i % integrations},"price":{flat[i]}}}\n'
+            for i in range(start, min(start + chunk, len(flat)))
+        ).encode("utf-8")
+
+
+@router.post("/pricing/quotes")
+async def bulk_quote(request: QuoteRequest):
+    """
+    Çok sayıda yapılandırmayı tek seferde fiyatla (NDJSON stream)
+    
+    Satırlar: {"index", "price"} (configurations) veya
+    {"scale", "feature_set", "integration_set", "price"} (grid, C sırası).
+    """
+    table = pricing_catalog.table(request.product_id)
+    configurations = request.configurations
+    scales = request.scales or ["standard"]
+    feature_sets = request.feature_sets or [[]]
+    integration_sets = request.integration_sets or [[]]
+    
+    if configurations is not None:
+        count = len(configurations)
+    else:
+        count = len(scales) * len(feature_sets) * len(integration_sets)
+    if count > settings.PRICING_QUOTE_MAX:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Too many configurations: {count} > {settings.PRICING_QUOTE_MAX}"
+        )
+    
+    with tracing.span("pricing", configurations=count):
+        if configurations is not None:
+            prices = table.price_many(
+                [c.scale for c in configurations],
+                [c.features for c in configurations],
+                [c.api_integrations for c in configurations]
+            )
+        else:
+            prices = table.price_grid(scales, feature_sets, integration_sets)
+    
+    return StreamingResponse(
+        _quote_lines(prices, None if configurations is not None else scales, settings.PRICING_STREAM_CHUNK),
+        media_type="application/x-ndjson",
+        headers={
+            "X-Quote-Count": str(count),
+            "X-Pricing-Version": pricing_catalog.version,
+            "X-Currency": table.currency
+        }
+    )
+
+
+@router.get("/pricing/{product_id}")
+async def get_pricing(product_id: str):
+    """
+    Ürünün geçerli fiyat tablosunu getir
+    """
+    return {"product_id": product_id, **pricing_catalog.describe(product_id)}
@@ -1,13 +1,29 @@
-from fastapi import APIRouter, HTTPException, UploadFile, File, Form
-from typing import List
+from fastapi import APIRouter, HTTPException, UploadFile, File, Form, Depends, Request
+from fastapi.responses import FileResponse
+from starlette.background import BackgroundTask
+from pathlib import Path
+from typing import List, Optional
+import asyncio
 import logging
+import shutil
+import tarfile
+import tempfile
 from api.schemas.agent import (
     AgentCreate, AgentUpdate, AgentResponse, 
-    EndpointCreate, ChatRequest
+    EndpointCreate, ChatRequest, SearchRequest, SearchResponse
 )
 from agent.storage.agent_store import agent_store
 from agent.knowledge_base.knowledge_manager import KnowledgeManager
+from agent.knowledge_base.bundle import BundleError
+from agent.knowledge_base import transfer
 from agent.qa_engine.qa_processor import QAProcessor
+from agent.actions import EndpointSelector, method_allowed
+from agent.qa_engine.fast_path import CANNED, fast_path
+from agent.scheduler import Priority
+from agent.analytics import track_interaction, record_cache_hit, record_confidence
+from api.dependencies import admit, client_key, llm_priority
+from api.responses import agent_payload, cached_json, json_response
+from core import metrics, tracing
 from core.config import settings
 
 logger = logging.getLogger(__name__)
@@ -16,6 +32,7 @@ router = APIRouter()
 # Initialize managers
 knowledge_manager = KnowledgeManager()
 qa_processor = QAProcessor()
+endpoint_selector = EndpointSelector(knowledge_manager.embed)
 
 @router.post("/agents", response_model=AgentResponse)
 async def create_agent(agent: AgentCreate):
@@ -30,71 +47,29 @@ async def create_agent(agent: AgentCreate):
         
         logger.info(f"Created agent: {created_agent['id']} - {created_agent['name']}")
         
-        return AgentResponse(
-            id=created_agent['id'],
-            name=created_agent['name'],
-            description=created_agent['description'],
-            persona_role=created_agent['persona_role'],
-            persona_tone=created_agent['persona_tone'],
-            persona_instructions=created_agent['persona_instructions'],
-            persona_constraints=created_agent['persona_constraints'],
-            status=created_agent['status'],
-            document_count=len(created_agent.get('documents', [])),
-            endpoint_count=len(created_agent.get('endpoints', [])),
-            created_at=created_agent['created_at'],
-            updated_at=created_agent['updated_at']
-        )
+        return json_response(agent_payload(created_agent))
     except Exception as e:
         logger.error(f"Error creating agent: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/agents", response_model=List[AgentResponse])
-async def list_agents():
-    """List all agents"""
+async def list_agents(request: Request):
+    """List all agents; 304 when the listing has not changed"""
     try:
         agents = agent_store.list_agents()
-        return [
-            AgentResponse(
-                id=agent['id'],
-                name=agent['name'],
-                description=agent['description'],
-                persona_role=agent.get('persona_role', ''),
-                persona_tone=agent.get('persona_tone', 'professional'),
-                persona_instructions=agent.get('persona_instructions', ''),
-                persona_constraints=agent.get('persona_constraints', ''),
-                status=agent.get('status', 'active'),
-                document_count=len(agent.get('documents', [])),
-                endpoint_count=len(agent.get('endpoints', [])),
-                created_at=agent['created_at'],
-                updated_at=agent['updated_at']
-            )
-            for agent in agents
-        ]
+        return cached_json(request, agents, lambda: [agent_payload(agent) for agent in agents], dated=False)
     except Exception as e:
         logger.error(f"Error listing agents: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/agents/{agent_id}", response_model=AgentResponse)
-async def get_agent(agent_id: str):
-    """Get a specific agent"""
+async def get_agent(agent_id: str, request: Request):
+    """Get a specific agent; 304 when the client copy is current"""
     agent = agent_store.get_agent(agent_id)
     if not agent:
         raise HTTPException(status_code=404, detail="Agent not found")
     
-    return AgentResponse(
-        id=agent['id'],
-        name=agent['name'],
-        description=agent['description'],
-        persona_role=agent.get('persona_role', ''),
-        persona_tone=agent.get('persona_tone', 'professional'),
-        persona_instructions=agent.get('persona_instructions', ''),
-        persona_constraints=agent.get('persona_constraints', ''),
-        status=agent.get('status', 'active'),
-        document_count=len(agent.get('documents', [])),
-        endpoint_count=len(agent.get('endpoints', [])),
-        created_at=agent['created_at'],
-        updated_at=agent['updated_at']
-    )
+    return cached_json(request, [agent], lambda: agent_payload(agent))
 
 @router.put("/agents/{agent_id}", response_model=AgentResponse)
 async def update_agent(agent_id: str, agent_update: AgentUpdate):
@@ -105,20 +80,7 @@ async def update_agent(agent_id: str, agent_update: AgentUpdate):
     if not updated_agent:
         raise HTTPException(status_code=404, detail="Agent not found")
     
-    return AgentResponse(
-        id=updated_agent['id'],
-        name=updated_agent['name'],
-        description=updated_agent['description'],
-        persona_role=updated_agent.get('persona_role', ''),
-        persona_tone=updated_agent.get('persona_tone', 'professional'),
-        persona_instructions=updated_agent.get('persona_instructions', ''),
-        persona_constraints=updated_agent.get('persona_constraints', ''),
-        status=updated_agent.get('status', 'active'),
-        document_count=len(updated_agent.get('documents', [])),
-        endpoint_count=len(updated_agent.get('endpoints', [])),
-        created_at=updated_agent['created_at'],
-        updated_at=updated_agent['updated_at']
-    )
+    return json_response(agent_payload(updated_agent))
 
 @router.delete("/agents/{agent_id}")
 async def delete_agent(agent_id: str):
@@ -126,6 +88,8 @@ async def delete_agent(agent_id: str):
     success = agent_store.delete_agent(agent_id)
     if not success:
         raise HTTPException(status_code=404, detail="Agent not found")
+    fast_path.invalidate(f"agent:{agent_id}")
+    endpoint_selector.invalidate(agent_id)
     
     # Delete ChromaDB collection
     try:
@@ -136,62 +100,201 @@ async def delete_agent(agent_id: str):
     
     return {"message": "Agent deleted successfully"}
 
+async def _read_text_file(file: UploadFile):
+    """Read an uploaded file; returns (raw bytes, UTF-8 text)"""
+    with tracing.span("read_file"):
+        content = await file.read()
+    
+    # Try to decode as UTF-8, if fails treat as binary
+    try:
+        return content, content.decode('utf-8')
+    except UnicodeDecodeError:
+        # For binary files like PDFs, we would need a PDF parser
+        # For now, just skip binary files
+        raise HTTPException(
+            status_code=400, 
+            detail="Only text files are supported (TXT, MD). PDF support coming soon."
+        )
+
 @router.post("/agents/{agent_id}/documents")
 async def upload_document(
     agent_id: str,
     file: UploadFile = File(...)
 ):
     """Upload and process a document for an agent"""
-    agent = agent_store.get_agent(agent_id)
+    with tracing.span("agent_lookup"):
+        agent = agent_store.get_agent(agent_id)
     if not agent:
         raise HTTPException(status_code=404, detail="Agent not found")
     
-    try:
-        # Read file content
-        content = await file.read()
-        
-        # Try to decode as UTF-8, if fails treat as binary
+    with track_interaction("upload", agent_id):
         try:
-            text_content = content.decode('utf-8')
-        except UnicodeDecodeError:
-            # For binary files like PDFs, we would need a PDF parser
-            # For now, just skip binary files
-            raise HTTPException(
-                status_code=400, 
-                detail="Only text files are supported (TXT, MD). PDF support coming soon."
+            content, text_content = await _read_text_file(file)
+        
+            # Process and add to ChromaDB
+            collection_name = f"agent_{agent_id}"
+            doc_id = knowledge_manager.add_document(
+                collection_name=collection_name,
+                content=text_content,
+                metadata={
+                    "filename": file.filename,
+                    "agent_id": agent_id
+                }
             )
         
-        # Process and add to ChromaDB
-        collection_name = f"agent_{agent_id}"
-        doc_id = knowledge_manager.add_document(
-            collection_name=collection_name,
-            content=text_content,
-            metadata={
-                "filename": file.filename,
-                "agent_id": agent_id
+            # Store document metadata
+            document = {
+                "id": doc_id,
+                "name": file.filename,
+                "size": len(content),
+                "type": file.content_type,
+                "status": "ready",
+                "uploaded_at": datetime.now().isoformat()
             }
-        )
         
-        # Store document metadata
-        document = {
-            "id": doc_id,
-            "name": file.filename,
-            "size": len(content),
-            "type": file.content_type,
-            "status": "ready",
-            "uploaded_at": datetime.now().isoformat()
-        }
+            with tracing.span("store_metadata"):
+                agent_store.add_document(agent_id, document)
+        
+            logger.info(f"Uploaded document {file.filename} for agent {agent_id}")
+            return {"message": "Document uploaded successfully", "document": document}
+        
+        except HTTPException:
+            raise
+        except Exception as e:
+            logger.error(f"Error uploading document: {e}", exc_info=True)
+            raise HTTPException(status_code=500, detail=f"Failed to upload document: {str(e)}")
+
+@router.put("/agents/{agent_id}/documents/{doc_id}")
+async def update_document(
+    agent_id: str,
+    doc_id: str,
+    file: UploadFile = File(...)
+):
+    """Replace a document, re-embedding only the chunks whose content changed"""
+    if not agent_store.get_document(agent_id, doc_id):
+        raise HTTPException(status_code=404, detail="Document not found")
+    
+    with track_interaction("upload", agent_id):
+        try:
+            content, text_content = await _read_text_file(file)
+        
+            stats = knowledge_manager.update_document(
+                collection_name=f"agent_{agent_id}",
+                doc_id=doc_id,
+                content=text_content,
+                metadata={
+                    "filename": file.filename,
+                    "agent_id": agent_id
+                }
+            )
         
-        agent_store.add_document(agent_id, document)
+            with tracing.span("store_metadata"):
+                document = agent_store.update_document(agent_id, doc_id, {
+                    "name": file.filename,
+                    "size": len(content),
+                    "type": file.content_type,
+                    "status": "ready",
+                    "updated_at": datetime.now().isoformat()
+                })
         
-        logger.info(f"Uploaded document {file.filename} for agent {agent_id}")
-        return {"message": "Document uploaded successfully", "document": document}
+            logger.info(f"Updated document {doc_id} for agent {agent_id}: {stats}")
+            return {"message": "Document updated successfully", "document": document, "chunks": stats}
         
-    except HTTPException:
-        raise
+        except HTTPException:
+            raise
+        except Exception as e:
+            logger.error(f"Error updating document: {e}", exc_info=True)
+            raise HTTPException(status_code=500, detail=f"Failed to update document: {str(e)}")
+
+@router.delete("/agents/{agent_id}/documents/{doc_id}")
+async def delete_document(agent_id: str, doc_id: str):
+    """Delete one document and its chunks"""
+    if not agent_store.get_document(agent_id, doc_id):
+        raise HTTPException(status_code=404, detail="Document not found")
+    
+    try:
+        deleted_chunks = knowledge_manager.delete_document(f"agent_{agent_id}", doc_id)
     except Exception as e:
-        logger.error(f"Error uploading document: {e}", exc_info=True)
-        raise HTTPException(status_code=500, detail=f"Failed to upload document: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to delete document: {str(e)}")
+    
+    agent_store.remove_document(agent_id, doc_id)
+    return {"message": "Document deleted successfully", "deleted_chunks": deleted_chunks}
+
+@router.get("/agents/{agent_id}/export")
+async def export_agent(agent_id: str):
+    """Download the agent and its knowledge base (chunks + embeddings) as a tar bundle"""
+    agent = agent_store.get_agent(agent_id)
+    if not agent:
+        raise HTTPException(status_code=404, detail="Agent not found")
+    
+    workdir = Path(tempfile.mkdtemp(prefix="compagent-export-"))
+    try:
+        await asyncio.to_thread(transfer.export_agent, knowledge_manager, agent, str(workdir / "bundle"))
+        await asyncio.to_thread(transfer.pack, str(workdir / "bundle"), str(workdir / "bundle.tar"))
+    except Exception as e:
+        shutil.rmtree(workdir, ignore_errors=True)
+        logger.error(f"Error exporting agent {agent_id}: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Failed to export agent: {str(e)}")
+    
+    return FileResponse(
+        workdir / "bundle.tar",
+        media_type="application/x-tar",
+        filename=f"agent_{agent_id}.tar",
+        background=BackgroundTask(shutil.rmtree, workdir, ignore_errors=True)
+    )
+
+@router.post("/agents/import", response_model=AgentResponse)
+async def import_agent(
+    file: UploadFile = File(...),
+    name: Optional[str] = Form(None)
+):
+    """Create a new agent from an exported bundle without re-embedding"""
+    workdir = tempfile.mkdtemp(prefix="compagent-import-")
+    try:
+        await asyncio.to_thread(transfer.unpack, file.file, workdir)
+        result = await asyncio.to_thread(
+            transfer.import_agent, knowledge_manager, agent_store, workdir,
+            {"name": name} if name else None
+        )
+    except (BundleError, tarfile.TarError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid bundle: {str(e)}")
+    except Exception as e:
+        logger.error(f"Error importing agent: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Failed to import agent: {str(e)}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    
+    agent = result["agent"]
+    logger.info(f"Imported agent {agent['id']} with {result['chunks']} chunks in {result['seconds']}s")
+    return json_response(agent_payload(agent))
+
+@router.post("/agents/{agent_id}/search", response_model=SearchResponse)
+async def search_agent(agent_id: str, search_request: SearchRequest):
+    """Retrieve chunks for many queries at once, with scores and metadata"""
+    with tracing.span("agent_lookup"):
+        agent = agent_store.get_agent(agent_id)
+    if not agent:
+        raise HTTPException(status_code=404, detail="Agent not found")
+    
+    try:
+        # One embedding call and one index pass for the whole batch
+        hits = await asyncio.to_thread(
+            knowledge_manager.search_batch,
+            f"agent_{agent_id}",
+            search_request.queries,
+            search_request.n_results
+        )
+    except Exception as e:
+        logger.error(f"Error in batch search: {e}")
+        raise HTTPException(status_code=500, detail=f"Search failed: {str(e)}")
+    
+    return {
+        "agent_id": agent_id,
+        "results": [
+            {"query": query, "results": results}
+            for query, results in zip(search_request.queries, hits)
+        ]
+    }
 
 @router.post("/agents/{agent_id}/endpoints")
 async def add_endpoint(agent_id: str, endpoint: EndpointCreate):
@@ -205,18 +308,17 @@ async def add_endpoint(agent_id: str, endpoint: EndpointCreate):
     
     agent_store.add_endpoint(agent_id, endpoint_data)
     
+    # Indexed now so chat turns only embed the message
+    try:
+        await asyncio.to_thread(endpoint_selector.index, agent_id, [endpoint_data])
+    except Exception as e:
+        logger.warning(f"Endpoint indexing deferred for agent {agent_id}: {e}")
+    
     return {"message": "Endpoint added successfully", "endpoint": endpoint_data}
 
-@router.post("/agents/{agent_id}/chat")
-async def chat_with_agent(agent_id: str, chat_request: ChatRequest):
-    """Chat with a specific agent"""
-    agent = agent_store.get_agent(agent_id)
-    if not agent:
-        raise HTTPException(status_code=404, detail="Agent not found")
-    
-    try:
-        # Build system prompt
-        system_prompt = f"""You are {agent['name']}. {agent['description']}
+def _system_prompt(agent: dict) -> str:
+    """Persona system prompt of an agent"""
+    return f"""You are {agent['name']}. {agent['description']}
 
 Role: {agent.get('persona_role', 'AI Assistant')}
 Tone: {agent.get('persona_tone', 'professional')}
@@ -227,31 +329,96 @@ Instructions:
 Constraints:
 {agent.get('persona_constraints', 'Be helpful and accurate.')}
 """
+
+@router.post("/agents/{agent_id}/chat")
+async def chat_with_agent(
+    agent_id: str,
+    chat_request: ChatRequest,
+    priority: Priority = Depends(llm_priority(Priority.INTERACTIVE)),
+    user_id: str = Depends(client_key)
+):
+    """Chat with a specific agent"""
+    with tracing.span("agent_lookup"):
+        agent = agent_store.get_agent(agent_id)
+    if not agent:
+        raise HTTPException(status_code=404, detail="Agent not found")
+    
+    with track_interaction(
+        "agent_chat", agent_id, chat_request.session_id, chat_request.message, user_id
+    ):
+        # Canned responses, greetings and thanks skip retrieval and the LLM
+        with tracing.span("fast_path"):
+            local = fast_path.match(
+                f"agent:{agent_id}",
+                chat_request.message,
+                agent.get('canned_responses'),
+                kind=CANNED,
+                version=agent.get('updated_at')
+            )
+        metrics.record_cache("fast_path", local is not None)
+        if local is not None:
+            record_cache_hit()
+            record_confidence(local.score)
+            return {
+                "response": local.answer,
+                "agent_id": agent_id,
+                "agent_name": agent['name'],
+                "source": "fast_path"
+            }
+
+        admit(priority)
+        try:
+            # Build system prompt
+            with tracing.span("prompt_build"):
+                system_prompt = _system_prompt(agent)
         
-        # Get relevant context from documents
-        collection_name = f"agent_{agent_id}"
-        context = knowledge_manager.search(
-            collection_name=collection_name,
-            query=chat_request.message,
-            n_results=3
-        )
+            # Get relevant context from documents
+            collection_name = f"agent_{agent_id}"
+            with tracing.span("retrieval"):
+                context = knowledge_manager.search(
+                    collection_name=collection_name,
+                    query=chat_request.message,
+                    n_results=3
+                )
         
-        # Generate response
-        response = qa_processor.process_query(
-            query=chat_request.message,
-            context=context,
-            system_prompt=system_prompt
-        )
+            # Generate response; the endpoints relevant to this message are offered as actions
+            endpoints = [e for e in agent.get('endpoints') or [] if method_allowed(e)]
+            if endpoints and settings.ACTIONS_ENABLED:
+                with tracing.span("endpoint_select", endpoints=len(endpoints)):
+                    # Embedding the message (and unindexed endpoints) is CPU bound
+                    endpoints = await asyncio.to_thread(
+                        endpoint_selector.select, agent_id, chat_request.message, endpoints
+                    )
+                answer = await qa_processor.process_with_actions(
+                    query=chat_request.message,
+                    endpoints=endpoints,
+                    context=context,
+                    system_prompt=system_prompt,
+                    agent_id=agent_id,
+                    priority=priority
+                )
+                response, actions = answer["response"], answer["actions"]
+            else:
+                response = await qa_processor.process_query(
+                    query=chat_request.message,
+                    context=context,
+                    system_prompt=system_prompt,
+                    agent_id=agent_id,
+                    priority=priority
+                )
+                actions = []
         
-        return {
-            "response": response,
-            "agent_id": agent_id,
-            "agent_name": agent['name']
-        }
+            return {
+                "response": response,
+                "agent_id": agent_id,
+                "agent_name": agent['name'],
+                "source": "llm",
+                "actions": actions
+            }
         
-    except Exception as e:
-        logger.error(f"Error in chat: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+        except Exception as e:
+            logger.error(f"Error in chat: {e}")
+            raise HTTPException(status_code=500, detail=str(e))
 
 from datetime import datetime
 import uuid
@@ -1,7 +1,11 @@
 from pydantic import BaseModel, Field
-from typing import Optional, List
+from typing import Optional, List, Dict, Any
 from datetime import datetime
 
+class CannedResponse(BaseModel):
+    question: str = Field(..., min_length=1)
+    answer: str = Field(..., min_length=1)
+
 class AgentCreate(BaseModel):
     name: str = Field(..., min_length=1, max_length=200)
     description: str = Field(..., max_length=1000)
@@ -9,6 +13,7 @@ class AgentCreate(BaseModel):
     persona_tone: str = Field(default="professional")
     persona_instructions: str = Field(default="")
     persona_constraints: str = Field(default="")
+    canned_responses: List[CannedResponse] = Field(default_factory=list)
 
 class AgentUpdate(BaseModel):
     name: Optional[str] = Field(None, min_length=1, max_length=200)
@@ -17,6 +22,7 @@ class AgentUpdate(BaseModel):
     persona_tone: Optional[str] = None
     persona_instructions: Optional[str] = None
     persona_constraints: Optional[str] = None
+    canned_responses: Optional[List[CannedResponse]] = None
     status: Optional[str] = None
 
 class AgentResponse(BaseModel):
@@ -30,6 +36,7 @@ class AgentResponse(BaseModel):
     status: str
     document_count: int
     endpoint_count: int
+    canned_responses: List[CannedResponse] = []
     created_at: datetime
     updated_at: datetime
 
@@ -40,7 +47,27 @@ class EndpointCreate(BaseModel):
     description: str = ""
     request_example: str = ""
     response_example: str = ""
+    allow_mutation: bool = False
 
 class ChatRequest(BaseModel):
     message: str
     session_id: Optional[str] = None
+
+class SearchRequest(BaseModel):
+    queries: List[str] = Field(..., min_length=1, max_length=64)
+    n_results: int = Field(default=3, ge=1, le=50)
+
+class SearchHit(BaseModel):
+    id: str
+    document: str
+    metadata: Dict[str, Any]
+    distance: float
+    score: float
+
+class SearchResult(BaseModel):
+    query: str
+    results: List[SearchHit]
+
+class SearchResponse(BaseModel):
+    agent_id: str
+    results: List[SearchResult]
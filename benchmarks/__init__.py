@@ -0,0 +1,3 @@
+"""
+Benchmarks - Yük testi ve performans ölçüm araçları
+"""
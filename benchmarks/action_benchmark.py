@@ -0,0 +1,144 @@
+"""
+Action benchmark - agent endpoint çağrılarında bağlantı havuzu, paralellik ve önbellek etkisi
+
+Yerel fake API sunucusuna karşı bir turdaki `--calls` adet bağımsız endpoint
+çağrısı dört şekilde çalıştırılır:
+
+    naive       her çağrı için yeni HTTP client, sıralı (havuz yok)
+    sequential  paylaşımlı ActionExecutor, sıralı
+    parallel    paylaşımlı ActionExecutor, execute_many ile paralel
+    cached      parallel + GET önbelleği (turlar aynı parametreleri tekrarlar)
+
+Raporlanan değerler: tur gecikmesi yüzdelikleri, sunucunun gördüğü istek ve
+açılan TCP bağlantı sayısı, önbellekten dönen çağrı sayısı.
+
+Kullanım:
+    python -m benchmarks.action_benchmark --turns 50 --calls 4 --api-latency-ms 80
+"""
+from pathlib import Path
+from typing import Dict, Any, List
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+# Settings are required at import time but unused offline
+os.environ.setdefault("GROQ_API_KEY", "offline-benchmark")
+os.environ.setdefault("SECRET_KEY", "offline-benchmark")
+
+import httpx
+
+from agent.actions import ActionExecutor
+from agent.actions.executor import build_request
+from benchmarks.fake_api_server import FakeAPIServer, add_arguments, config_from_args
+from benchmarks.report import git_commit, percentile
+
+
+MODES = ("naive", "sequential", "parallel", "cached")
+
+
+def _endpoints(base_url: str, calls: int) -> List[Dict[str, Any]]:
+    return [
+        {"id": f"ep-{i}", "name": f"Lookup {i}", "method": "GET", "url": f"{base_url}/resources/{i}/{{item_id}}"}
+        for i in range(calls)
+    ]
+
+
+async def _naive(calls) -> int:
+    """Baseline: a fresh client (new TCP connection) per call, one after another"""
+    for endpoint, params in calls:
+        method, url, query, body = build_request(endpoint, params)
+        async with httpx.AsyncClient() as client:
+            (await client.request(method, url, params=query or None, json=body)).raise_for_status()
+    return 0
+
+
+async def _run_mode(mode: str, server: FakeAPIServer, args: argparse.Namespace) -> Dict[str, Any]:
+    endpoints = _endpoints(server.base_url, args.calls)
+    # The fake server listens on loopback
+    executor = ActionExecutor(cache_ttl=args.cache_ttl if mode == "cached" else 0, allow_private=True)
+    server.reset_stats()
+    latencies, cached = [], 0
+
+    for turn in range(args.turns):
+        # Cached turns cycle through a few parameter sets so repeats can hit
+        item = turn % args.distinct_params if mode == "cached" else turn
+        calls = [(endpoint, {"item_id": f"item-{item}"}) for endpoint in endpoints]
+        started = time.perf_counter()
+        if mode == "naive":
+            await _naive(calls)
+        elif mode == "sequential":
+            results = [await executor.execute(endpoint, params) for endpoint, params in calls]
+        else:
+            results = await executor.execute_many(calls)
+        latencies.append((time.perf_counter() - started) * 1000)
+        if mode != "naive":
+            failed = [r for r in results if not r.ok]
+            if failed:
+                raise RuntimeError(f"{mode}: {failed[0].error}")
+            cached += sum(r.cached for r in results)
+    await executor.close()
+
+    latencies.sort()
+    entry = {
+        "mode": mode,
+        "turns": args.turns,
+        "calls_per_turn": args.calls,
+        "server_requests": server.stats["requests"],
+        "connections": server.stats["connections"],
+        "cached_calls": cached,
+        "turn_latency_ms": {
+            "p50": percentile(latencies, 0.50),
+            "p95": percentile(latencies, 0.95),
+            "p99": percentile(latencies, 0.99),
+            "mean": round(sum(latencies) / len(latencies), 2)
+        }
+    }
+    print(
+        f"{mode:<10} p50={entry['turn_latency_ms']['p50']:>8}ms "
+        f"requests={entry['server_requests']:<5} connections={entry['connections']:<5} cached={cached}",
+        file=sys.stderr
+    )
+    return entry
+
+
+def run(args: argparse.Namespace) -> Dict[str, Any]:
+    server = FakeAPIServer(config_from_args(args)).start()
+    try:
+        results = [asyncio.run(_run_mode(mode.strip(), server, args)) for mode in args.modes.split(",")]
+    finally:
+        server.stop()
+    return {
+        "meta": {
+            "git_commit": git_commit(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "api_latency_ms": args.api_latency_ms,
+            "cache_ttl": args.cache_ttl,
+            "distinct_params": args.distinct_params
+        },
+        "results": results
+    }
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Connection pooling / parallelism / cache effect on agent actions")
+    parser.add_argument("--modes", default=",".join(MODES))
+    parser.add_argument("--turns", type=int, default=50)
+    parser.add_argument("--calls", type=int, default=4, help="Independent calls per turn")
+    parser.add_argument("--cache-ttl", type=float, default=30.0)
+    parser.add_argument("--distinct-params", type=int, default=5, help="Parameter sets cycled in cached mode")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=None)
+    add_arguments(parser)
+    return parser
+
+
+if __name__ == "__main__":
+    arguments = build_parser().parse_args()
+    report = run(arguments)
+    output = json.dumps(report, indent=2)
+    if arguments.output:
+        Path(arguments.output).write_text(output, encoding="utf-8")
+    print(output)
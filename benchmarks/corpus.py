@@ -0,0 +1,173 @@
+"""
+Synthetic corpus - Seed'li sahte agent, doküman ve soru üretimi
+
+Aynı seed her zaman aynı agent'ları, dokümanları ve soruları üretir,
+böylece farklı build'lerin benchmark sonuçları karşılaştırılabilir.
+"""
+from dataclasses import dataclass, field
+from typing import Dict, Any, List
+import random
+
+
+_PRODUCTS = [
+    "Analytics Pro", "CloudSync", "InvoiceHub", "TeamDesk", "DataVault",
+    "FormFlow", "ShipTrack", "MailPilot", "SecureAuth", "HelpBeacon"
+]
+_FEATURES = [
+    "single sign-on", "webhooks", "CSV export", "role based access", "audit log",
+    "REST API", "Slack integration", "custom dashboards", "SLA monitoring",
+    "data retention policies", "multi-region hosting", "usage based billing"
+]
+_PLANS = ["Basic", "Pro", "Business", "Enterprise"]
+_TOPICS = ["pricing", "integration", "security", "onboarding", "limits", "billing"]
+_QUESTION_TEMPLATES = [
+    "How does {feature} work in {product}?",
+    "Is {feature} included in the {plan} plan?",
+    "What does the {plan} plan cost?",
+    "Can I connect {product} to our existing tools?",
+    "What are the {topic} options for {product}?",
+    "How do I set up {feature}?"
+]
+
+
+@dataclass
+class SyntheticAgent:
+    """One agent with its documents and typical user questions"""
+    name: str
+    description: str
+    persona_role: str
+    documents: List[Dict[str, str]] = field(default_factory=list)
+    questions: List[str] = field(default_factory=list)
+
+    def create_payload(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "description": self.description,
+            "persona_role": self.persona_role,
+            "persona_tone": "professional",
+            "persona_instructions": "Answer using the product documentation.",
+            "persona_constraints": "Do not invent prices or features."
+        }
+
+
+def _paragraph(rng: random.Random, product: str, plan: str) -> str:
+    feature = rng.choice(_FEATURES)
+    topic = rng.choice(_TOPICS)
+    price = rng.choice([19, 49, 99, 199, 499, 999])
+    users = rng.choice([5, 25, 100, 500, 1000])
+    return (
+        f"{product} {plan} plan includes {feature} for up to {users} users at ${price} per month. "
+        f"Regarding {topic}, administrators can configure {rng.choice(_FEATURES)} from the settings page. "
+        f"The {feature} module exposes a REST endpoint and emits webhooks on every change. "
+        f"Customers on the {plan} plan receive {rng.choice(['email', 'chat', 'phone'])} support."
+    )
+
+
+def build_corpus(
+    seed: int = 42,
+    agents: int = 5,
+    documents_per_agent: int = 3,
+    paragraphs_per_document: int = 20,
+    questions_per_agent: int = 50
+) -> List[SyntheticAgent]:
+    """
+    Deterministic synthetic corpus
+
+    Args:
+        seed: Random seed
+        agents: Number of agents
+        documents_per_agent: Documents uploaded to each agent
+        paragraphs_per_document: Size of each document (~350 chars per paragraph)
+        questions_per_agent: Question pool size per agent
+
+    Returns:
+        Synthetic agents with documents and questions
+    """
+    rng = random.Random(seed)
+    corpus = []
+
+    for i in range(agents):
+        product = f"{_PRODUCTS[i % len(_PRODUCTS)]} {i // len(_PRODUCTS) + 1}"
+        agent = SyntheticAgent(
+            name=f"{product} Assistant",
+            description=f"Support and sales assistant for {product}",
+            persona_role="Product specialist"
+        )
+
+        for d in range(documents_per_agent):
+            text = "\n\n".join(
+                _paragraph(rng, product, rng.choice(_PLANS))
+                for _ in range(paragraphs_per_document)
+            )
+            agent.documents.append({"filename": f"{product.lower().replace(' ', '_')}_{d}.md", "content": text})
+
+        for _ in range(questions_per_agent):
+            agent.questions.append(rng.choice(_QUESTION_TEMPLATES).format(
+                feature=rng.choice(_FEATURES),
+                product=product,
+                plan=rng.choice(_PLANS),
+                topic=rng.choice(_TOPICS)
+            ))
+
+        corpus.append(agent)
+
+    return corpus
+
+
+# Retrieval evaluation: (fact statement, question) templates
+_FACT_TEMPLATES = [
+    ("{product} keeps exported reports for {n} days.",
+     "How long are exported reports kept in {product}?"),
+    ("The {product} API allows {n} requests per minute per token.",
+     "What is the API rate limit of {product}?"),
+    ("A single {product} workspace supports up to {n} seats.",
+     "How many users can one {product} workspace have?"),
+    ("Audit logs in {product} are retained for {n} months.",
+     "For how long does {product} retain audit logs?"),
+    ("{product} retries a failed webhook delivery {n} times.",
+     "How many times are webhooks retried by {product}?"),
+    ("The {product} mobile app synchronises every {n} minutes.",
+     "How often does the {product} mobile app sync data?"),
+    ("Setting up single sign-on for {product} takes about {n} minutes.",
+     "How long does SSO configuration take for {product}?"),
+    ("{product} file uploads are limited to {n} megabytes each.",
+     "What is the maximum upload size in {product}?")
+]
+
+
+def build_retrieval_corpus(
+    seed: int = 42,
+    products: int = 10,
+    filler_paragraphs: int = 12
+) -> Dict[str, Any]:
+    """
+    Deterministic labeled corpus for retrieval evaluation
+
+    Every product document states one value per fact template, surrounded
+    by filler paragraphs; other products state the same facts with different
+    values, so they act as hard negatives. A chunk is relevant to a query
+    when it contains the full fact statement.
+
+    Returns:
+        {"documents": [{"id", "text"}], "queries": [{"query", "relevant"}]}
+    """
+    rng = random.Random(seed)
+    documents = []
+    queries = []
+
+    for i in range(products):
+        product = f"{_PRODUCTS[i % len(_PRODUCTS)]} {i // len(_PRODUCTS) + 1}"
+        paragraphs = [
+            _paragraph(rng, product, rng.choice(_PLANS)) for _ in range(filler_paragraphs)
+        ]
+
+        for statement, question in _FACT_TEMPLATES:
+            fact = statement.format(product=product, n=rng.randint(2, 500))
+            position = rng.randrange(len(paragraphs))
+            paragraphs[position] = f"{paragraphs[position]} {fact}"
+            queries.append({"query": question.format(product=product), "relevant": [fact]})
+
+        documents.append({"id": f"doc_{i}", "text": "\n\n".join(paragraphs)})
+
+    rng.shuffle(queries)
+    return {"documents": documents, "queries": queries}
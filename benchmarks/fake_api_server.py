@@ -0,0 +1,175 @@
+"""
+Fake API server - agent endpoint'lerinin yerine geçen yerel HTTP sunucusu
+
+Action executor benchmark'larında gerçek müşteri API'leri yerine kullanılır.
+Her istek ayarlanabilir bir gecikmeyle JSON döner; açılan TCP bağlantıları
+ve istekler sayılır, böylece keep-alive ve önbellek etkisi ölçülebilir.
+
+Kullanım:
+    python -m benchmarks.fake_api_server --port 9200 --latency-ms 80
+"""
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Any, Optional
+from urllib.parse import parse_qsl, urlsplit
+import argparse
+import json
+import random
+import socket
+import threading
+import time
+
+
+@dataclass
+class FakeAPIConfig:
+    """Behaviour of the fake endpoint host"""
+    latency_ms: float = 80.0              # server-side time per request
+    jitter_ms: float = 20.0               # uniform +/- jitter on latency_ms
+    max_age: int = 0                      # Cache-Control max-age on GET responses, 0 = none
+    cache_control: str = ""               # raw Cache-Control on GET responses, overrides max_age
+    error_rate: float = 0.0               # fraction of 500 responses
+    seed: Optional[int] = None
+
+
+class FakeAPIServer:
+    """
+    ThreadingHTTPServer wrapper that can run in a background thread
+    - Any path answers; the response echoes method, path, query and body
+    - Counts requests and accepted connections for the benchmark report
+    """
+
+    def __init__(self, config: FakeAPIConfig, host: str = "127.0.0.1", port: int = 0):
+        self.config = config
+        self._random = random.Random(config.seed)
+        self._lock = threading.Lock()
+        self.stats = {"requests": 0, "connections": 0, "errors": 0}
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def setup(self):
+                super().setup()
+                # Headers and body are separate writes; without this, Nagle plus
+                # delayed ACK adds ~40 ms to every request on a reused connection
+                self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                with server._lock:
+                    server.stats["connections"] += 1
+
+            def do_GET(self):
+                server._handle(self)
+
+            do_POST = do_PUT = do_PATCH = do_DELETE = do_GET
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeAPIServer":
+        self._thread = threading.Thread(
+            target=self.httpd.serve_forever, name="fake-api", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def reset_stats(self):
+        with self._lock:
+            self.stats = {key: 0 for key in self.stats}
+
+    def _draw(self) -> float:
+        with self._lock:
+            return self._random.random()
+
+    def _handle(self, handler: BaseHTTPRequestHandler):
+        length = int(handler.headers.get("Content-Length") or 0)
+        raw = handler.rfile.read(length) if length else b""
+        with self._lock:
+            self.stats["requests"] += 1
+
+        jitter = (self._draw() * 2 - 1) * self.config.jitter_ms
+        time.sleep(max(0.0, self.config.latency_ms + jitter) / 1000)
+
+        if self._draw() < self.config.error_rate:
+            with self._lock:
+                self.stats["errors"] += 1
+            self._send(handler, 500, {"error": "Injected endpoint error"})
+            return
+
+        parts = urlsplit(handler.path)
+        payload = {
+            "method": handler.command,
+            "path": parts.path,
+            "query": dict(parse_qsl(parts.query)),
+            "body": json.loads(raw) if raw else None,
+            "served_at": round(time.time(), 3)
+        }
+        headers = {}
+        if handler.command == "GET" and self.config.cache_control:
+            headers["Cache-Control"] = self.config.cache_control
+        elif handler.command == "GET" and self.config.max_age:
+            headers["Cache-Control"] = f"max-age={self.config.max_age}"
+        self._send(handler, 200, payload, headers)
+
+    @staticmethod
+    def _send(
+        handler: BaseHTTPRequestHandler,
+        status: int,
+        payload: Dict[str, Any],
+        headers: Optional[Dict[str, str]] = None
+    ):
+        data = json.dumps(payload).encode("utf-8")
+        handler.send_response(status)
+        handler.send_header("Content-Type", "application/json")
+        handler.send_header("Content-Length", str(len(data)))
+        for key, value in (headers or {}).items():
+            handler.send_header(key, value)
+        handler.end_headers()
+        handler.wfile.write(data)
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    """Fake API options, shared with the action benchmark"""
+    defaults = FakeAPIConfig()
+    parser.add_argument("--api-latency-ms", type=float, default=defaults.latency_ms)
+    parser.add_argument("--api-jitter-ms", type=float, default=defaults.jitter_ms)
+    parser.add_argument("--api-max-age", type=int, default=defaults.max_age)
+    parser.add_argument("--api-error-rate", type=float, default=defaults.error_rate)
+
+
+def config_from_args(args: argparse.Namespace) -> FakeAPIConfig:
+    return FakeAPIConfig(
+        latency_ms=args.api_latency_ms,
+        jitter_ms=args.api_jitter_ms,
+        max_age=args.api_max_age,
+        error_rate=args.api_error_rate,
+        seed=args.seed
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fake endpoint host for action benchmarks")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9200)
+    parser.add_argument("--seed", type=int, default=None)
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    fake = FakeAPIServer(config_from_args(args), args.host, args.port)
+    print(f"Fake API server listening on {fake.base_url}")
+    try:
+        fake.httpd.serve_forever()
+    except KeyboardInterrupt:
+        fake.stop()
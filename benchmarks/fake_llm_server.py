@@ -0,0 +1,211 @@
+"""
+Fake LLM server - Groq / OpenAI uyumlu yerel chat completions sunucusu
+
+Benchmark'larda gerçek API yerine kullanılır. Gecikme, token hızı ve hata
+oranı ayarlanabilir; yanıtlar Groq'un `usage` alanlarını (completion_time vb.)
+içerir, böylece TTFT ve token metrikleri gerçekçi kalır.
+
+Kullanım:
+    python -m benchmarks.fake_llm_server --port 9100 --latency-ms 200 --tokens-per-second 500
+    GROQ_BASE_URL=http://127.0.0.1:9100 python main.py
+"""
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Any, Optional
+import argparse
+import json
+import random
+import threading
+import time
+import uuid
+
+
+# Groq client posts here; plain OpenAI clients use /v1/chat/completions
+COMPLETION_PATHS = {"/openai/v1/chat/completions", "/v1/chat/completions"}
+
+_WORDS = (
+    "the product supports integration with your existing tools and the "
+    "configuration can be adjusted per team plan pricing api webhook export "
+    "dashboard report user role permission setup guide feature"
+).split()
+
+
+@dataclass
+class FakeLLMConfig:
+    """Behaviour of the fake upstream"""
+    latency_ms: float = 150.0             # fixed time before the first token
+    jitter_ms: float = 50.0               # uniform +/- jitter on latency_ms
+    tokens_per_second: float = 400.0      # generation speed after the first token
+    completion_tokens: int = 120          # upper bound, also capped by max_tokens
+    error_rate: float = 0.0               # fraction of 500 responses
+    rate_limit_rate: float = 0.0          # fraction of 429 responses
+    seed: Optional[int] = None
+
+
+class FakeLLMServer:
+    """
+    ThreadingHTTPServer wrapper that can run in a background thread
+    - One thread per connection, so concurrent calls overlap like a real upstream
+    - Counts requests and injected errors for the benchmark report
+    """
+
+    def __init__(self, config: FakeLLMConfig, host: str = "127.0.0.1", port: int = 0):
+        self.config = config
+        self._random = random.Random(config.seed)
+        self._lock = threading.Lock()
+        self.stats = {"requests": 0, "errors": 0, "rate_limited": 0}
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                server._handle(self)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeLLMServer":
+        self._thread = threading.Thread(
+            target=self.httpd.serve_forever, name="fake-llm", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def _draw(self) -> float:
+        with self._lock:
+            return self._random.random()
+
+    def _handle(self, handler: BaseHTTPRequestHandler):
+        length = int(handler.headers.get("Content-Length") or 0)
+        body = json.loads(handler.rfile.read(length) or b"{}")
+
+        if handler.path not in COMPLETION_PATHS:
+            self._send(handler, 404, {"error": {"message": "not found"}})
+            return
+
+        with self._lock:
+            self.stats["requests"] += 1
+
+        roll = self._draw()
+        if roll < self.config.rate_limit_rate:
+            with self._lock:
+                self.stats["rate_limited"] += 1
+            self._send(
+                handler, 429,
+                {"error": {"message": "Rate limit reached", "type": "tokens"}},
+                {"retry-after": "1"}
+            )
+            return
+        if roll < self.config.rate_limit_rate + self.config.error_rate:
+            with self._lock:
+                self.stats["errors"] += 1
+            self._send(handler, 500, {"error": {"message": "Injected upstream error"}})
+            return
+
+        self._send(handler, 200, self._complete(body))
+
+    def _complete(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        """Sleep like a real model and build a chat.completion response"""
+        config = self.config
+        prompt_chars = sum(len(str(m.get("content", ""))) for m in body.get("messages", []))
+        prompt_tokens = max(1, prompt_chars // 4)
+        completion_tokens = min(config.completion_tokens, body.get("max_tokens") or 1024)
+
+        jitter = (self._draw() * 2 - 1) * config.jitter_ms
+        first_token = max(0.0, config.latency_ms + jitter) / 1000
+        generation = completion_tokens / config.tokens_per_second if config.tokens_per_second else 0.0
+        time.sleep(first_token + generation)
+
+        words = [_WORDS[(i * 7 + prompt_tokens) % len(_WORDS)] for i in range(completion_tokens)]
+        return {
+            "id": f"chatcmpl-{uuid.uuid4().hex}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "fake-model"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": " ".join(words)},
+                "finish_reason": "stop",
+                "logprobs": None
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+                "queue_time": 0.0,
+                "prompt_time": round(first_token, 6),
+                "completion_time": round(generation, 6),
+                "total_time": round(first_token + generation, 6)
+            },
+            "system_fingerprint": "fake"
+        }
+
+    @staticmethod
+    def _send(
+        handler: BaseHTTPRequestHandler,
+        status: int,
+        payload: Dict[str, Any],
+        headers: Optional[Dict[str, str]] = None
+    ):
+        data = json.dumps(payload).encode("utf-8")
+        handler.send_response(status)
+        handler.send_header("Content-Type", "application/json")
+        handler.send_header("Content-Length", str(len(data)))
+        for key, value in (headers or {}).items():
+            handler.send_header(key, value)
+        handler.end_headers()
+        handler.wfile.write(data)
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    """Fake LLM options, shared with the load driver"""
+    defaults = FakeLLMConfig()
+    parser.add_argument("--latency-ms", type=float, default=defaults.latency_ms)
+    parser.add_argument("--jitter-ms", type=float, default=defaults.jitter_ms)
+    parser.add_argument("--tokens-per-second", type=float, default=defaults.tokens_per_second)
+    parser.add_argument("--completion-tokens", type=int, default=defaults.completion_tokens)
+    parser.add_argument("--error-rate", type=float, default=defaults.error_rate)
+    parser.add_argument("--rate-limit-rate", type=float, default=defaults.rate_limit_rate)
+
+
+def config_from_args(args: argparse.Namespace) -> FakeLLMConfig:
+    return FakeLLMConfig(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        tokens_per_second=args.tokens_per_second,
+        completion_tokens=args.completion_tokens,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        seed=args.seed
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Groq / OpenAI compatible fake LLM server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--seed", type=int, default=None)
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    fake = FakeLLMServer(config_from_args(args), args.host, args.port)
+    print(f"Fake LLM server listening on {fake.base_url}")
+    try:
+        fake.httpd.serve_forever()
+    except KeyboardInterrupt:
+        fake.stop()
@@ -0,0 +1,227 @@
+"""
+Layout benchmark - per_agent ve sharded koleksiyon düzenlerinin karşılaştırması
+
+Her (layout, agent sayısı) için ayrı süreçlerde önce veri yüklenir (build),
+sonra yeni bir süreçte soğuk / ılık sorgular çalıştırılır (query); böylece
+bellek ölçümü sunucunun yeniden başladığı durumu yansıtır. Embedding modeli
+kullanılmaz, seed'li rastgele vektörler yazılır.
+
+Raporlanan değerler: build süresi, diskteki boyut, Chroma koleksiyon sayısı,
+RSS / peak RSS, açık dosya sayısı ve sorgu gecikmesi yüzdelikleri.
+
+Kullanım:
+    python -m benchmarks.layout_benchmark --agents 100,10000,100000 --output layout.json
+    python -m benchmarks.layout_benchmark --agents 100,1000 --layouts sharded --shards 32
+    python -m benchmarks.layout_benchmark --agents 100,10000 --backend mmap
+"""
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+import argparse
+import json
+import os
+import random
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+# Settings are required at import time but unused offline
+os.environ.setdefault("GROQ_API_KEY", "offline-benchmark")
+os.environ.setdefault("SECRET_KEY", "offline-benchmark")
+
+from agent.knowledge_base.knowledge_manager import (
+    KnowledgeManager, PER_AGENT, SHARDED, CHROMA, MMAP
+)
+from benchmarks.report import REPO_ROOT, git_commit, percentile
+
+
+DIMENSIONS = 384    # all-MiniLM-L6-v2
+
+
+def _vector(rng: random.Random) -> List[float]:
+    return [rng.uniform(-1.0, 1.0) for _ in range(DIMENSIONS)]
+
+
+def _memory() -> Dict[str, Optional[float]]:
+    """Current and peak RSS in MB, plus open file descriptors (Linux)"""
+    status = {}
+    try:
+        for line in Path("/proc/self/status").read_text().splitlines():
+            key, _, value = line.partition(":")
+            if key in ("VmRSS", "VmHWM"):
+                status[key] = int(value.split()[0]) / 1024
+    except OSError:
+        status["VmHWM"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    try:
+        open_files = len(os.listdir("/proc/self/fd"))
+    except OSError:
+        open_files = None
+    return {
+        "rss_mb": round(status["VmRSS"], 1) if "VmRSS" in status else None,
+        "peak_rss_mb": round(status["VmHWM"], 1) if "VmHWM" in status else None,
+        "open_files": open_files
+    }
+
+
+def _directory_size(path: Path) -> int:
+    return sum(f.stat().st_size for f in path.rglob("*") if f.is_file())
+
+
+def _manager(args: argparse.Namespace) -> KnowledgeManager:
+    return KnowledgeManager(persist_directory=args.workdir, layout=args.layout, shards=args.shards,
+                            backend=args.backend)
+
+
+def build(args: argparse.Namespace) -> Dict[str, Any]:
+    """Create `agents` agent collections with `chunks` chunks each"""
+    manager = _manager(args)
+    rng = random.Random(args.seed)
+    started = time.perf_counter()
+
+    for i in range(args.agents):
+        name = f"agent_bench{i}"
+        manager.create_collection(name)
+        collection, where = manager.scoped_collection(name)
+        collection.add(
+            ids=[f"bench{i}_chunk_{j}" for j in range(args.chunks)],
+            embeddings=[_vector(rng) for _ in range(args.chunks)],
+            documents=[f"Agent {i} chunk {j}" for j in range(args.chunks)],
+            metadatas=[{"chunk_index": j, **(where or {})} for j in range(args.chunks)]
+        )
+
+    return {
+        "build_seconds": round(time.perf_counter() - started, 2),
+        "collections": len(manager.chroma_client.list_collections()),
+        "memory": _memory()
+    }
+
+
+def query(args: argparse.Namespace) -> Dict[str, Any]:
+    """Query a sample of agents twice: cold (first touch) and warm"""
+    manager = _manager(args)
+    rng = random.Random(args.seed + 1)
+    sample = [f"agent_bench{rng.randrange(args.agents)}" for _ in range(args.queries)]
+    memory_before = _memory()
+
+    passes = {}
+    for name in ("cold", "warm"):
+        latencies = []
+        for collection_name in sample:
+            embedding = _vector(rng)
+            started = time.perf_counter()
+            collection, where = manager.scoped_collection(collection_name)
+            collection.query(query_embeddings=[embedding], n_results=3, where=where)
+            latencies.append((time.perf_counter() - started) * 1000)
+        latencies.sort()
+        passes[name] = {
+            "p50": percentile(latencies, 0.50),
+            "p95": percentile(latencies, 0.95),
+            "p99": percentile(latencies, 0.99),
+            "mean": round(sum(latencies) / len(latencies), 2)
+        }
+
+    return {
+        "latency_ms": passes,
+        "memory_before_queries": memory_before,
+        "memory": _memory()
+    }
+
+
+def _run_worker(phase: str, layout: str, agents: int, workdir: Path, args: argparse.Namespace) -> Dict[str, Any]:
+    command = [
+        sys.executable, "-m", "benchmarks.layout_benchmark", "--worker", phase,
+        "--layout", layout, "--agents", str(agents), "--workdir", str(workdir),
+        "--shards", str(args.shards), "--chunks", str(args.chunks), "--backend", args.backend,
+        "--queries", str(args.queries), "--seed", str(args.seed)
+    ]
+    env = {
+        **os.environ,
+        "LOG_LEVEL": "WARNING",     # one log line per created collection otherwise
+        "ANALYTICS_DB_PATH": str(workdir.with_name(f"{workdir.name}-events.db"))
+    }
+    output = subprocess.run(
+        command, cwd=REPO_ROOT, env=env, check=True, capture_output=True, text=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def run(args: argparse.Namespace) -> Dict[str, Any]:
+    layouts = [layout.strip() for layout in args.layouts.split(",")]
+    results = []
+
+    for agents in [int(n) for n in args.agents.split(",")]:
+        for layout in layouts:
+            workdir = Path(tempfile.mkdtemp(prefix="compagent-layout-"))
+            try:
+                built = _run_worker("build", layout, agents, workdir, args)
+                queried = _run_worker("query", layout, agents, workdir, args)
+                result = {
+                    "layout": layout,
+                    "agents": agents,
+                    "chunks": agents * args.chunks,
+                    "collections": built["collections"],
+                    "build_seconds": built["build_seconds"],
+                    "disk_bytes": _directory_size(workdir),
+                    "build_memory": built["memory"],
+                    "query_memory": queried["memory"],
+                    "latency_ms": queried["latency_ms"]
+                }
+                results.append(result)
+                print(
+                    f"{layout:<10} agents={agents:<7} build={result['build_seconds']}s "
+                    f"disk={result['disk_bytes'] // 1024}KB rss={queried['memory']['rss_mb']}MB "
+                    f"cold_p95={queried['latency_ms']['cold']['p95']}ms "
+                    f"warm_p95={queried['latency_ms']['warm']['p95']}ms",
+                    file=sys.stderr
+                )
+            finally:
+                shutil.rmtree(workdir, ignore_errors=True)
+                for leftover in workdir.parent.glob(f"{workdir.name}-events.db*"):
+                    leftover.unlink()
+
+    return {
+        "meta": {
+            "git_commit": git_commit(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "backend": args.backend,
+            "chunks_per_agent": args.chunks,
+            "shards": args.shards,
+            "queries": args.queries,
+            "dimensions": DIMENSIONS
+        },
+        "results": results
+    }
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Compare per_agent and sharded collection layouts")
+    parser.add_argument("--agents", default="100,10000,100000")
+    parser.add_argument("--layouts", default=f"{PER_AGENT},{SHARDED}")
+    parser.add_argument("--shards", type=int, default=16)
+    parser.add_argument("--chunks", type=int, default=5, help="Chunks per agent")
+    parser.add_argument("--backend", choices=[CHROMA, MMAP], default=CHROMA)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default=None)
+    # Internal: one phase of one configuration in a fresh process
+    parser.add_argument("--worker", choices=["build", "query"], default=None, help=argparse.SUPPRESS)
+    parser.add_argument("--layout", default=PER_AGENT, help=argparse.SUPPRESS)
+    parser.add_argument("--workdir", default=None, help=argparse.SUPPRESS)
+    return parser
+
+
+if __name__ == "__main__":
+    arguments = build_parser().parse_args()
+    if arguments.worker:
+        arguments.agents = int(arguments.agents)
+        phase = build if arguments.worker == "build" else query
+        print(json.dumps(phase(arguments)))
+        sys.exit(0)
+
+    report = run(arguments)
+    output = json.dumps(report, indent=2)
+    if arguments.output:
+        Path(arguments.output).write_text(output, encoding="utf-8")
+    print(output)
@@ -0,0 +1,352 @@
+"""
+Load test - Uçtan uca throughput ve tail latency ölçümü
+
+Yerel fake LLM sunucusunu ve API'yi (ayrı bir uvicorn süreci, geçici veri
+dizini) başlatır, seed'li corpus'u yükler ve her senaryoyu sabit eş zamanlılık
+seviyelerinde çalıştırır. Sonuçlar build'ler arası karşılaştırma için JSON
+olarak yazılır.
+
+Kullanım:
+    python -m benchmarks.load_test --concurrency 1,8,32 --duration 20 --output results.json
+    python -m benchmarks.load_test --target http://localhost:8000 --scenarios list_agents
+"""
+from dataclasses import dataclass, field, asdict
+from pathlib import Path
+from typing import Dict, Any, List, Callable, Awaitable, Tuple
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import re
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+# Settings are required at import time (shared helpers live in core) but unused here
+os.environ.setdefault("GROQ_API_KEY", "offline-benchmark")
+os.environ.setdefault("SECRET_KEY", "offline-benchmark")
+
+import httpx
+
+from benchmarks.corpus import SyntheticAgent, build_corpus
+from benchmarks.fake_llm_server import FakeLLMServer, add_arguments, config_from_args
+from benchmarks.report import REPO_ROOT, git_commit, percentile
+
+
+API_PREFIX = "/api/v1"
+SCENARIOS = ["agents_chat", "agent_chat", "upload", "list_agents"]
+
+_SERVER_TIMING_RE = re.compile(r"([\w.-]+);dur=([\d.]+)")
+
+
+@dataclass
+class BenchState:
+    """Seeded agents available to the scenarios"""
+    agents: List[SyntheticAgent]
+    agent_ids: List[str]
+
+
+@dataclass
+class ScenarioResult:
+    """Measurements of one scenario at one concurrency level"""
+    scenario: str
+    concurrency: int
+    duration_s: float
+    requests: int = 0
+    errors: int = 0
+    rps: float = 0.0
+    latency_ms: Dict[str, float] = field(default_factory=dict)
+    status_codes: Dict[str, int] = field(default_factory=dict)
+    server_timing_ms: Dict[str, float] = field(default_factory=dict)
+
+
+# Scenario request builders: (client, rng, state, worker) -> response
+
+async def _agents_chat(client: httpx.AsyncClient, rng: random.Random, state: BenchState, worker: int):
+    index = rng.randrange(len(state.agent_ids))
+    return await client.post(
+        f"{API_PREFIX}/agents/{state.agent_ids[index]}/chat",
+        json={
+            "message": rng.choice(state.agents[index].questions),
+            "session_id": f"bench-{worker}-{rng.randrange(20)}"
+        }
+    )
+
+
+async def _agent_chat(client: httpx.AsyncClient, rng: random.Random, state: BenchState, worker: int):
+    index = rng.randrange(len(state.agent_ids))
+    return await client.post(
+        f"{API_PREFIX}/agent/chat",
+        json={
+            "product_id": state.agent_ids[index],
+            "message": rng.choice(state.agents[index].questions),
+            "session_id": f"bench-{worker}-{rng.randrange(20)}"
+        }
+    )
+
+
+async def _upload(client: httpx.AsyncClient, rng: random.Random, state: BenchState, worker: int):
+    index = rng.randrange(len(state.agent_ids))
+    document = rng.choice(state.agents[index].documents)
+    return await client.post(
+        f"{API_PREFIX}/agents/{state.agent_ids[index]}/documents",
+        files={"file": (document["filename"], document["content"].encode("utf-8"), "text/markdown")}
+    )
+
+
+async def _list_agents(client: httpx.AsyncClient, rng: random.Random, state: BenchState, worker: int):
+    return await client.get(f"{API_PREFIX}/agents")
+
+
+SCENARIO_FUNCTIONS: Dict[str, Callable[..., Awaitable[httpx.Response]]] = {
+    "agents_chat": _agents_chat,
+    "agent_chat": _agent_chat,
+    "upload": _upload,
+    "list_agents": _list_agents
+}
+
+
+async def run_scenario(
+    client: httpx.AsyncClient,
+    state: BenchState,
+    scenario: str,
+    concurrency: int,
+    duration: float,
+    warmup: float,
+    seed: int
+) -> ScenarioResult:
+    """
+    Closed-loop load: `concurrency` workers each issue one request at a time
+
+    Requests started during the warmup window are not measured.
+    """
+    request = SCENARIO_FUNCTIONS[scenario]
+    latencies: List[float] = []
+    status_codes: Dict[str, int] = {}
+    stage_totals: Dict[str, float] = {}
+    errors = 0
+
+    started = time.perf_counter()
+    measure_start = started + warmup
+    deadline = measure_start + duration
+
+    async def worker(worker_id: int):
+        nonlocal errors
+        rng = random.Random(seed * 1000 + worker_id)
+        while True:
+            request_start = time.perf_counter()
+            if request_start >= deadline:
+                return
+            try:
+                response = await request(client, rng, state, worker_id)
+                status = str(response.status_code)
+                timing = response.headers.get("server-timing", "")
+            except httpx.HTTPError as e:
+                status = type(e).__name__
+                timing = ""
+            elapsed_ms = (time.perf_counter() - request_start) * 1000
+
+            if request_start < measure_start:
+                continue
+            latencies.append(elapsed_ms)
+            status_codes[status] = status_codes.get(status, 0) + 1
+            if not status.startswith("2"):
+                errors += 1
+            for name, value in _SERVER_TIMING_RE.findall(timing):
+                stage_totals[name] = stage_totals.get(name, 0.0) + float(value)
+
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    measured = max(time.perf_counter() - measure_start, 1e-9)
+
+    latencies.sort()
+    count = len(latencies)
+    return ScenarioResult(
+        scenario=scenario,
+        concurrency=concurrency,
+        duration_s=round(measured, 3),
+        requests=count,
+        errors=errors,
+        rps=round(count / measured, 2),
+        latency_ms={
+            "p50": percentile(latencies, 0.50),
+            "p95": percentile(latencies, 0.95),
+            "p99": percentile(latencies, 0.99),
+            "mean": round(sum(latencies) / count, 2) if count else 0.0,
+            "max": round(latencies[-1], 2) if count else 0.0
+        },
+        status_codes=status_codes,
+        server_timing_ms={
+            name: round(total / count, 2) for name, total in stage_totals.items()
+        } if count else {}
+    )
+
+
+async def seed_corpus(client: httpx.AsyncClient, corpus: List[SyntheticAgent]) -> BenchState:
+    """Create the synthetic agents and upload their documents"""
+    agent_ids = []
+    for agent in corpus:
+        response = await client.post(f"{API_PREFIX}/agents", json=agent.create_payload())
+        response.raise_for_status()
+        agent_id = response.json()["id"]
+        agent_ids.append(agent_id)
+        for document in agent.documents:
+            response = await client.post(
+                f"{API_PREFIX}/agents/{agent_id}/documents",
+                files={"file": (document["filename"], document["content"].encode("utf-8"), "text/markdown")}
+            )
+            response.raise_for_status()
+    return BenchState(agents=corpus, agent_ids=agent_ids)
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_api(fake_llm_url: str, workdir: Path, extra_env: Dict[str, str]) -> Tuple[subprocess.Popen, str]:
+    """Start the API in a subprocess with its data directory under `workdir`"""
+    port = _free_port()
+    env = dict(os.environ)
+    env.update({
+        "PYTHONPATH": os.pathsep.join(filter(None, [str(REPO_ROOT), env.get("PYTHONPATH")])),
+        "GROQ_API_KEY": env.get("GROQ_API_KEY", "bench-key"),
+        "SECRET_KEY": env.get("SECRET_KEY", "bench-secret"),
+        "GROQ_BASE_URL": fake_llm_url,
+        "RATE_LIMIT_BACKEND": "none",
+        "ACCESS_LOG_SAMPLE_RATE": "0",
+        "ANONYMIZED_TELEMETRY": "False"
+    })
+    env.update(extra_env)
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app",
+         "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        cwd=workdir,
+        env=env
+    )
+    return process, f"http://127.0.0.1:{port}"
+
+
+async def wait_healthy(base_url: str, timeout: float = 120.0):
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            try:
+                if (await client.get("/health")).status_code == 200:
+                    return
+            except httpx.HTTPError:
+                pass
+            await asyncio.sleep(0.5)
+    raise RuntimeError(f"API at {base_url} did not become healthy in {timeout}s")
+
+
+def _parse_env(pairs: List[str]) -> Dict[str, str]:
+    return dict(pair.split("=", 1) for pair in pairs)
+
+
+async def main(args: argparse.Namespace) -> Dict[str, Any]:
+    scenarios = [s.strip() for s in args.scenarios.split(",") if s.strip()]
+    unknown = set(scenarios) - set(SCENARIO_FUNCTIONS)
+    if unknown:
+        raise SystemExit(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+    levels = [int(c) for c in args.concurrency.split(",")]
+
+    fake_llm = None
+    process = None
+    workdir = None
+    base_url = args.target
+
+    try:
+        if base_url is None:
+            fake_llm = FakeLLMServer(config_from_args(args)).start()
+            workdir = Path(tempfile.mkdtemp(prefix="compagent-bench-"))
+            process, base_url = start_api(fake_llm.base_url, workdir, _parse_env(args.env))
+        await wait_healthy(base_url)
+
+        limits = httpx.Limits(max_connections=max(levels), max_keepalive_connections=max(levels))
+        async with httpx.AsyncClient(base_url=base_url, timeout=args.timeout, limits=limits) as client:
+            corpus = build_corpus(
+                seed=args.seed,
+                agents=args.agents,
+                documents_per_agent=args.documents_per_agent
+            )
+            seed_started = time.perf_counter()
+            state = await seed_corpus(client, corpus)
+            seed_seconds = time.perf_counter() - seed_started
+
+            results = []
+            for scenario in scenarios:
+                for concurrency in levels:
+                    result = await run_scenario(
+                        client, state, scenario, concurrency,
+                        args.duration, args.warmup, args.seed
+                    )
+                    results.append(asdict(result))
+                    print(
+                        f"{scenario:<12} c={concurrency:<4} rps={result.rps:<8} "
+                        f"p50={result.latency_ms['p50']}ms p95={result.latency_ms['p95']}ms "
+                        f"p99={result.latency_ms['p99']}ms errors={result.errors}",
+                        file=sys.stderr
+                    )
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait(timeout=30)
+        if fake_llm is not None:
+            fake_llm.stop()
+        if workdir is not None and not args.keep_workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    return {
+        "meta": {
+            "git_commit": git_commit(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "target": args.target or "local",
+            "seed": args.seed,
+            "corpus": {"agents": args.agents, "documents_per_agent": args.documents_per_agent},
+            "seed_seconds": round(seed_seconds, 3),
+            "duration_s": args.duration,
+            "warmup_s": args.warmup,
+            "fake_llm": asdict(fake_llm.config) if fake_llm else None,
+            "fake_llm_stats": fake_llm.stats if fake_llm else None
+        },
+        "results": results
+    }
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="CompAgent end-to-end load test")
+    parser.add_argument("--target", default=None,
+                        help="Benchmark an already running API instead of starting one")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS))
+    parser.add_argument("--concurrency", default="1,4,16",
+                        help="Comma separated concurrency levels")
+    parser.add_argument("--duration", type=float, default=15.0,
+                        help="Measured seconds per scenario and level")
+    parser.add_argument("--warmup", type=float, default=2.0)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--agents", type=int, default=5)
+    parser.add_argument("--documents-per-agent", type=int, default=3)
+    parser.add_argument("--env", action="append", default=[],
+                        help="Extra KEY=VALUE settings for the spawned API")
+    parser.add_argument("--keep-workdir", action="store_true")
+    parser.add_argument("--output", default=None, help="Write the JSON report to this file")
+    add_arguments(parser)
+    return parser
+
+
+if __name__ == "__main__":
+    arguments = build_parser().parse_args()
+    report = asyncio.run(main(arguments))
+    output = json.dumps(report, indent=2)
+    if arguments.output:
+        Path(arguments.output).write_text(output, encoding="utf-8")
+    print(output)
@@ -0,0 +1,153 @@
+"""
+Pricing benchmark - tekil ve vektörize fiyat hesaplamanın karşılaştırması
+
+Seed'li rastgele yapılandırmalar üzerinde:
+
+    scalar  PriceTable.price, yapılandırma başına bir çağrı (eski yol)
+    many    PriceTable.price_many, paralel diziler
+    grid    PriceTable.price_grid, scales x feature_sets x integration_sets
+
+Her boyut için süre ve saniyedeki yapılandırma sayısı raporlanır; scalar ve
+many sonuçlarının birebir aynı olduğu doğrulanır. Ayrıca seçilen katalog ve
+kuruşlu (yarım kuruşa düşen) fiyatlar içeren bir katalog üzerinde scalar,
+many ve grid sonuçları karşılaştırılır.
+
+Kullanım:
+    python -m benchmarks.pricing_benchmark --sizes 1000,100000,1000000
+    python -m benchmarks.pricing_benchmark --catalog pricing.json --product prod_123
+"""
+from pathlib import Path
+from typing import Dict, Any, Tuple
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+# Settings are required at import time but unused offline
+os.environ.setdefault("GROQ_API_KEY", "offline-benchmark")
+os.environ.setdefault("SECRET_KEY", "offline-benchmark")
+
+import numpy as np
+
+from agent.config_manager.pricing import PriceTable, PricingCatalog
+from benchmarks.report import git_commit
+
+
+SCALES = ["small", "standard", "large", "enterprise"]
+FEATURES = ["api", "analytics", "reporting", "sso", "audit", "export", "webhooks", "sandbox"]
+INTEGRATIONS = ["slack", "jira", "salesforce", "hubspot", "zendesk"]
+
+# Non-integer prices: base_price * multiplier lands on half cents (149.99 * 1.5)
+FRACTIONAL_CATALOG = {
+    "default": {
+        "base_price": 149.99,
+        "scale_multipliers": {"small": 0.55, "standard": 1.0, "large": 1.5, "enterprise": 4.75},
+        "feature_price": 9.99,
+        "feature_prices": {"sso": 24.95, "audit": 12.5},
+        "integration_price": 19.95,
+        "integration_prices": {"salesforce": 49.99}
+    }
+}
+
+
+def _timed(fn) -> Tuple[Any, float]:
+    started = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - started
+
+
+def _random_configurations(rng: random.Random, size: int):
+    scales = [rng.choice(SCALES) for _ in range(size)]
+    feature_sets = [rng.sample(FEATURES, rng.randint(0, 5)) for _ in range(size)]
+    integration_sets = [rng.sample(INTEGRATIONS, rng.randint(0, 3)) for _ in range(size)]
+    return scales, feature_sets, integration_sets
+
+
+def check_equivalence(table: PriceTable, rng: random.Random, size: int = 2000) -> bool:
+    """Scalar, many and grid prices of the same configurations are identical"""
+    scales, feature_sets, integration_sets = _random_configurations(rng, size)
+    scalar = [table.price(s, f, i) for s, f, i in zip(scales, feature_sets, integration_sets)]
+    if not np.array_equal(table.price_many(scales, feature_sets, integration_sets), np.asarray(scalar)):
+        return False
+
+    feature_sets, integration_sets = feature_sets[:25], integration_sets[:10]
+    grid = table.price_grid(SCALES, feature_sets, integration_sets)
+    expected = [
+        [[table.price(s, f, i) for i in integration_sets] for f in feature_sets] for s in SCALES
+    ]
+    return bool(np.array_equal(grid, np.asarray(expected)))
+
+
+def run(args: argparse.Namespace) -> Dict[str, Any]:
+    catalog = PricingCatalog.load(args.catalog or "")
+    table = catalog.table(args.product)
+    rng = random.Random(args.seed)
+    results = []
+
+    equivalence = {
+        "catalog": check_equivalence(table, rng),
+        "fractional": check_equivalence(PricingCatalog(FRACTIONAL_CATALOG).table(), rng)
+    }
+    print(f"identical scalar/many/grid: {equivalence}", file=sys.stderr)
+
+    for size in [int(s) for s in args.sizes.split(",")]:
+        scales, feature_sets, integration_sets = _random_configurations(rng, size)
+
+        entry = {"configurations": size}
+        if size <= args.scalar_max:
+            scalar, seconds = _timed(lambda: [
+                table.price(s, f, i) for s, f, i in zip(scales, feature_sets, integration_sets)
+            ])
+            entry["scalar_seconds"] = round(seconds, 4)
+        many, seconds = _timed(lambda: table.price_many(scales, feature_sets, integration_sets))
+        entry["many_seconds"] = round(seconds, 4)
+        if size <= args.scalar_max:
+            entry["identical"] = bool(np.array_equal(many, np.asarray(scalar)))
+
+        # Grid of about the same size: all scales x feature sets x integration sets
+        integrations = min(len(integration_sets), 20)
+        features = max(1, size // (len(SCALES) * integrations))
+        grid, seconds = _timed(lambda: table.price_grid(
+            SCALES, feature_sets[:features], integration_sets[:integrations]
+        ))
+        entry["grid_configurations"] = int(grid.size)
+        entry["grid_seconds"] = round(seconds, 4)
+        results.append(entry)
+        print(
+            f"{size:>9} scalar={entry.get('scalar_seconds', '-'):<8} many={entry['many_seconds']:<8} "
+            f"grid({entry['grid_configurations']})={entry['grid_seconds']}",
+            file=sys.stderr
+        )
+
+    return {
+        "meta": {
+            "git_commit": git_commit(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "catalog_version": catalog.version,
+            "product": args.product
+        },
+        "equivalence": equivalence,
+        "results": results
+    }
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Scalar vs vectorized pricing")
+    parser.add_argument("--sizes", default="1000,10000,100000,1000000")
+    parser.add_argument("--scalar-max", type=int, default=1000000, help="Skip the scalar loop above this size")
+    parser.add_argument("--catalog", default=None, help="Pricing catalog JSON; default: built-in prices")
+    parser.add_argument("--product", default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=None)
+    return parser
+
+
+if __name__ == "__main__":
+    arguments = build_parser().parse_args()
+    report = run(arguments)
+    output = json.dumps(report, indent=2)
+    if arguments.output:
+        Path(arguments.output).write_text(output, encoding="utf-8")
+    print(output)
@@ -0,0 +1,98 @@
+"""
+Quantization report - koleksiyon başına bellek / recall dengesi
+
+Mevcut bir veri dizinindeki (chroma veya mmap backend) her koleksiyondan
+embedding örneği alır ve her kuantizasyon modu için vektör başına byte,
+sıkıştırma oranı ile tam hassasiyetli yeniden sıralamalı ve sıralamasız
+recall@k değerlerini raporlar. Sorgular, saklanan vektörlere küçük gürültü
+eklenerek üretilir; referans kesin (brute-force) aramadır.
+
+Kullanım:
+    python -m benchmarks.quantization_report --persist-directory ./data/chroma
+    python -m benchmarks.quantization_report --backend mmap --collections agent_abc --modes int8
+"""
+from pathlib import Path
+from typing import Dict, Any
+import argparse
+import json
+import os
+import sys
+import time
+
+# Settings are required at import time but unused offline
+os.environ.setdefault("GROQ_API_KEY", "offline-benchmark")
+os.environ.setdefault("SECRET_KEY", "offline-benchmark")
+
+from agent.knowledge_base import quantization
+from agent.knowledge_base.knowledge_manager import KnowledgeManager, CHROMA, MMAP
+from benchmarks.report import git_commit
+
+
+def run(args: argparse.Namespace) -> Dict[str, Any]:
+    manager = KnowledgeManager(persist_directory=args.persist_directory, backend=args.backend)
+    client = manager.chroma_client
+    names = (
+        [name.strip() for name in args.collections.split(",")]
+        if args.collections else sorted(c.name for c in client.list_collections())
+    )
+    modes = [mode.strip() for mode in args.modes.split(",")]
+    results = []
+
+    for name in names:
+        collection = client.get_collection(name=name)
+        embeddings = collection.get(limit=args.sample, include=["embeddings"])["embeddings"]
+        if not embeddings:
+            continue
+        entry = {"collection": name, "rows": collection.count(), "sampled": len(embeddings), "modes": []}
+        for mode in modes:
+            started = time.perf_counter()
+            evaluated = quantization.evaluate(
+                embeddings, mode, args.queries, args.k, args.rescore_factor, args.subvector_dims
+            )
+            evaluated["bytes"] = evaluated["bytes_per_vector"] * entry["rows"]
+            evaluated["seconds"] = round(time.perf_counter() - started, 2)
+            entry["modes"].append(evaluated)
+            print(
+                f"{name:<40} {mode:<5} {evaluated['compression']:>5}x "
+                f"recall@{args.k}={evaluated[f'recall@{args.k}']:<7} "
+                f"rescored={evaluated[f'recall@{args.k}_rescored']}",
+                file=sys.stderr
+            )
+        results.append(entry)
+
+    return {
+        "meta": {
+            "git_commit": git_commit(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "backend": args.backend,
+            "k": args.k,
+            "queries": args.queries,
+            "rescore_factor": args.rescore_factor,
+            "subvector_dims": args.subvector_dims
+        },
+        "results": results
+    }
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Memory / recall trade-off of vector quantization")
+    parser.add_argument("--persist-directory", default="./data/chroma")
+    parser.add_argument("--backend", choices=[CHROMA, MMAP], default=CHROMA)
+    parser.add_argument("--collections", default=None, help="Comma separated; default: all")
+    parser.add_argument("--modes", default=f"{quantization.INT8},{quantization.PQ}")
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--sample", type=int, default=50000, help="Rows sampled per collection")
+    parser.add_argument("--rescore-factor", type=int, default=10)
+    parser.add_argument("--subvector-dims", type=int, default=4)
+    parser.add_argument("--output", default=None)
+    return parser
+
+
+if __name__ == "__main__":
+    arguments = build_parser().parse_args()
+    report = run(arguments)
+    output = json.dumps(report, indent=2)
+    if arguments.output:
+        Path(arguments.output).write_text(output, encoding="utf-8")
+    print(output)
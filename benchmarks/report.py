@@ -0,0 +1,26 @@
+"""
+Report helpers - Benchmark raporları için ortak yardımcılar
+"""
+from pathlib import Path
+from typing import List, Optional
+import subprocess
+
+from core import stats
+
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """Nearest-rank percentile of an already sorted list, rounded for reports"""
+    return round(stats.percentile(sorted_values, q), 2)
+
+
+def git_commit() -> Optional[str]:
+    """Short commit hash of the benchmarked tree"""
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT, stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
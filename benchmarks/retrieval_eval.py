@@ -0,0 +1,325 @@
+"""
+Retrieval evaluation - recall@k / MRR ile kalite ve gecikme karşılaştırması
+
+Etiketli bir corpus'u (sentetik veya fixture) her chunker için ayrı bir
+KnowledgeManager koleksiyonuna yükler, sorgu setini her retrieval modunda
+çalıştırır ve recall@k, MRR, sorgu gecikmesi yüzdelikleri ile index boyutunu
+raporlar. Tamamen offline çalışır (yerel embedding modeli).
+
+Modlar:
+    vector   - KnowledgeManager.search ile aynı yol (embed + collection.query)
+    hybrid   - vector + BM25 adayları, Reciprocal Rank Fusion ile birleştirilir
+    reranked - hybrid adayları, sorgu ile chunk cümleleri arasındaki en yüksek
+               cosine benzerliğine göre yeniden sıralanır
+
+Kullanım:
+    python -m benchmarks.retrieval_eval --output retrieval.json
+    python -m benchmarks.retrieval_eval --chunkers fixed:1000:200,paragraph:600 --modes vector,hybrid
+    python -m benchmarks.retrieval_eval --baseline retrieval.json --tolerance 0.02
+    python -m benchmarks.retrieval_eval --fixture my_corpus.json
+    python -m benchmarks.retrieval_eval --modes vector --quantization none,int8,pq
+
+`--quantization` ile none dışındaki değerler mmap backend'ini o kuantizasyonla
+kurar (corpus küçük olsa da quantizer hemen eğitilir); config adı
+`<chunker>/<mode>/<quantization>` olur ve index bilgisine vektör belleği eklenir.
+"""
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Any, List, Tuple, Callable
+import argparse
+import json
+import math
+import os
+import re
+import shutil
+import sys
+import tempfile
+import time
+
+# Settings are required at import time but unused offline
+os.environ.setdefault("GROQ_API_KEY", "offline-eval")
+os.environ.setdefault("SECRET_KEY", "offline-eval")
+
+from agent.knowledge_base.knowledge_manager import KnowledgeManager, MMAP
+from agent.knowledge_base.quantization import NONE, MODES as QUANTIZATIONS
+from benchmarks.corpus import build_retrieval_corpus
+from benchmarks.report import git_commit, percentile
+
+
+COLLECTION = "retrieval_eval"
+MODES = ("vector", "hybrid", "reranked")
+RECALL_KS = (1, 3, 5, 10)
+CANDIDATES = 20
+RRF_K = 60
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+")
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN_RE.findall(text.lower())
+
+
+class BM25:
+    """Okapi BM25 over the chunks of one collection"""
+
+    def __init__(self, documents: List[str], k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.lengths = []
+        self.postings: Dict[str, List[Tuple[int, int]]] = {}
+        for index, document in enumerate(documents):
+            tokens = tokenize(document)
+            self.lengths.append(len(tokens))
+            counts: Dict[str, int] = {}
+            for token in tokens:
+                counts[token] = counts.get(token, 0) + 1
+            for token, tf in counts.items():
+                self.postings.setdefault(token, []).append((index, tf))
+        self.avg_length = sum(self.lengths) / len(self.lengths) if self.lengths else 0.0
+
+    def search(self, query: str, n: int) -> List[int]:
+        total = len(self.lengths)
+        scores: Dict[int, float] = {}
+        for token in set(tokenize(query)):
+            postings = self.postings.get(token)
+            if not postings:
+                continue
+            idf = math.log(1 + (total - len(postings) + 0.5) / (len(postings) + 0.5))
+            for index, tf in postings:
+                norm = self.k1 * (1 - self.b + self.b * self.lengths[index] / self.avg_length)
+                scores[index] = scores.get(index, 0.0) + idf * tf * (self.k1 + 1) / (tf + norm)
+        return sorted(scores, key=scores.get, reverse=True)[:n]
+
+
+@dataclass
+class ChunkerSpec:
+    """Chunking configuration, parsed from "fixed:1000:200" or "paragraph:600" """
+    strategy: str
+    size: int
+    overlap: int = 0
+
+    @property
+    def name(self) -> str:
+        if self.strategy == "paragraph":
+            return f"paragraph_{self.size}"
+        return f"{self.strategy}_{self.size}_{self.overlap}"
+
+    @classmethod
+    def parse(cls, spec: str) -> "ChunkerSpec":
+        parts = spec.split(":")
+        if parts[0] not in ("fixed", "paragraph"):
+            raise ValueError(f"Unknown chunker: {spec}")
+        size = int(parts[1]) if len(parts) > 1 else 1000
+        overlap = int(parts[2]) if len(parts) > 2 else (min(200, size // 5) if parts[0] == "fixed" else 0)
+        return cls(parts[0], size, overlap)
+
+
+class IndexedCorpus:
+    """One chunker's collection plus the lexical index built from its chunks"""
+
+    def __init__(self, manager: KnowledgeManager, documents: List[Dict[str, str]]):
+        self.manager = manager
+        started = time.perf_counter()
+        manager.create_collection(COLLECTION)
+        for document in documents:
+            manager.add_document(COLLECTION, document["text"], {"source": document["id"]})
+        self.build_seconds = time.perf_counter() - started
+
+        self.collection = manager.get_collection(COLLECTION)
+        stored = self.collection.get(include=["documents"])
+        self.ids: List[str] = stored["ids"]
+        self.texts: List[str] = stored["documents"]
+        self.position = {chunk_id: i for i, chunk_id in enumerate(self.ids)}
+        self.bm25 = BM25(self.texts)
+
+    def vector(self, query: str, n: int) -> List[int]:
+        embedding = self.manager.embed([query])
+        results = self.collection.query(query_embeddings=embedding, n_results=min(n, len(self.ids)))
+        return [self.position[chunk_id] for chunk_id in results["ids"][0]]
+
+    def hybrid(self, query: str, n: int) -> List[int]:
+        fused: Dict[int, float] = {}
+        for ranking in (self.vector(query, CANDIDATES), self.bm25.search(query, CANDIDATES)):
+            for rank, index in enumerate(ranking):
+                fused[index] = fused.get(index, 0.0) + 1.0 / (RRF_K + rank + 1)
+        return sorted(fused, key=fused.get, reverse=True)[:n]
+
+    def reranked(self, query: str, n: int) -> List[int]:
+        candidates = self.hybrid(query, CANDIDATES)
+        sentences: List[str] = []
+        owners: List[int] = []
+        for index in candidates:
+            for sentence in _SENTENCE_RE.split(self.texts[index]):
+                if sentence.strip():
+                    sentences.append(sentence)
+                    owners.append(index)
+
+        vectors = self.manager.embed([query] + sentences, operation="rerank")
+        query_vector = vectors[0]
+        query_norm = math.sqrt(sum(x * x for x in query_vector)) or 1.0
+        best: Dict[int, float] = {}
+        for owner, vector in zip(owners, vectors[1:]):
+            norm = math.sqrt(sum(x * x for x in vector)) or 1.0
+            score = sum(a * b for a, b in zip(query_vector, vector)) / (query_norm * norm)
+            best[owner] = max(best.get(owner, -1.0), score)
+        return sorted(candidates, key=lambda i: best.get(i, -1.0), reverse=True)[:n]
+
+
+def _directory_size(path: Path) -> int:
+    return sum(f.stat().st_size for f in path.rglob("*") if f.is_file())
+
+
+def evaluate(
+    indexed: IndexedCorpus,
+    queries: List[Dict[str, Any]],
+    retrieve: Callable[[str, int], List[int]]
+) -> Dict[str, Any]:
+    """recall@k (any relevant chunk in the top k), MRR@10 and latency"""
+    max_k = max(RECALL_KS)
+    hits = {k: 0 for k in RECALL_KS}
+    reciprocal_ranks = 0.0
+    latencies = []
+
+    for item in queries:
+        started = time.perf_counter()
+        ranking = retrieve(item["query"], max_k)
+        latencies.append((time.perf_counter() - started) * 1000)
+
+        first_relevant = None
+        for rank, index in enumerate(ranking):
+            if any(marker in indexed.texts[index] for marker in item["relevant"]):
+                first_relevant = rank
+                break
+        if first_relevant is not None:
+            reciprocal_ranks += 1.0 / (first_relevant + 1)
+            for k in RECALL_KS:
+                if first_relevant < k:
+                    hits[k] += 1
+
+    latencies.sort()
+    count = len(queries)
+    return {
+        **{f"recall@{k}": round(hits[k] / count, 4) for k in RECALL_KS},
+        "mrr": round(reciprocal_ranks / count, 4),
+        "latency_ms": {
+            "p50": percentile(latencies, 0.50),
+            "p95": percentile(latencies, 0.95),
+            "p99": percentile(latencies, 0.99),
+            "mean": round(sum(latencies) / count, 2)
+        }
+    }
+
+
+def run(args: argparse.Namespace) -> Dict[str, Any]:
+    if args.fixture:
+        corpus = json.loads(Path(args.fixture).read_text(encoding="utf-8"))
+    else:
+        corpus = build_retrieval_corpus(seed=args.seed, products=args.products)
+    chunkers = [ChunkerSpec.parse(spec) for spec in args.chunkers.split(",")]
+    modes = [mode.strip() for mode in args.modes.split(",")]
+    unknown = set(modes) - set(MODES)
+    if unknown:
+        raise SystemExit(f"Unknown modes: {', '.join(sorted(unknown))}")
+    quantizations = [q.strip() for q in args.quantization.split(",")]
+    unknown = set(quantizations) - set(QUANTIZATIONS)
+    if unknown:
+        raise SystemExit(f"Unknown quantization: {', '.join(sorted(unknown))}")
+
+    workdir = Path(tempfile.mkdtemp(prefix="compagent-retrieval-"))
+    results = []
+    try:
+        for chunker in chunkers:
+            for quantization in quantizations:
+                suffix = "" if quantization == NONE else f"/{quantization}"
+                persist_directory = workdir / f"{chunker.name}{suffix.replace('/', '-')}"
+                manager = KnowledgeManager(
+                    persist_directory=str(persist_directory),
+                    chunk_strategy=chunker.strategy,
+                    chunk_size=chunker.size,
+                    chunk_overlap=chunker.overlap,
+                    **({} if quantization == NONE else {"backend": MMAP, "quantization": quantization})
+                )
+                indexed = IndexedCorpus(manager, corpus["documents"])
+                index = {
+                    "chunks": len(indexed.ids),
+                    "bytes": _directory_size(persist_directory),
+                    "build_seconds": round(indexed.build_seconds, 3)
+                }
+                if quantization != NONE:
+                    indexed.collection.quantize()
+                    index["vector_memory"] = indexed.collection.memory_usage()
+
+                for mode in modes:
+                    metrics = evaluate(indexed, corpus["queries"], getattr(indexed, mode))
+                    result = {"config": f"{chunker.name}/{mode}{suffix}", "chunker": chunker.name, "mode": mode,
+                              **metrics, "index": index}
+                    results.append(result)
+                    print(
+                        f"{result['config']:<28} recall@5={metrics['recall@5']:<7} "
+                        f"mrr={metrics['mrr']:<7} p95={metrics['latency_ms']['p95']}ms "
+                        f"chunks={index['chunks']}",
+                        file=sys.stderr
+                    )
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    return {
+        "meta": {
+            "git_commit": git_commit(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "corpus": args.fixture or f"synthetic(seed={args.seed}, products={args.products})",
+            "documents": len(corpus["documents"]),
+            "queries": len(corpus["queries"]),
+            "candidates": CANDIDATES
+        },
+        "results": results
+    }
+
+
+def find_regressions(report: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """Quality metrics that dropped more than `tolerance` against the baseline"""
+    previous = {r["config"]: r for r in baseline.get("results", [])}
+    regressions = []
+    for result in report["results"]:
+        before = previous.get(result["config"])
+        if before is None:
+            continue
+        for metric in [f"recall@{k}" for k in RECALL_KS] + ["mrr"]:
+            if result[metric] < before[metric] - tolerance:
+                regressions.append(
+                    f"{result['config']} {metric}: {before[metric]} -> {result[metric]}"
+                )
+    return regressions
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Offline retrieval quality / latency evaluation")
+    parser.add_argument("--fixture", default=None,
+                        help='JSON with {"documents": [{"id", "text"}], "queries": [{"query", "relevant"}]}')
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--products", type=int, default=10)
+    parser.add_argument("--chunkers", default="fixed:1000:200,fixed:500:100,paragraph:600")
+    parser.add_argument("--modes", default="vector,hybrid,reranked")
+    parser.add_argument("--quantization", default=NONE, help="Comma separated: none, int8, pq")
+    parser.add_argument("--baseline", default=None, help="Previous report to gate regressions against")
+    parser.add_argument("--tolerance", type=float, default=0.02)
+    parser.add_argument("--output", default=None)
+    return parser
+
+
+if __name__ == "__main__":
+    arguments = build_parser().parse_args()
+    report = run(arguments)
+    output = json.dumps(report, indent=2)
+    if arguments.output:
+        Path(arguments.output).write_text(output, encoding="utf-8")
+    print(output)
+
+    if arguments.baseline:
+        baseline = json.loads(Path(arguments.baseline).read_text(encoding="utf-8"))
+        regressions = find_regressions(report, baseline, arguments.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
@@ -1,34 +1,96 @@
 """
 Logging configuration
 """
+import atexit
+import json
 import logging
+import queue
 import sys
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+
 from core.config import settings
 
 
+_listener: Optional[QueueListener] = None
+
+
+class _DeferredQueueHandler(QueueHandler):
+    """
+    QueueHandler that leaves formatting to the listener thread
+
+    The stock handler formats every record on the calling thread; records
+    never leave the process here, so they can be enqueued as they are.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+class JsonFormatter(logging.Formatter):
+    """Render dict messages (access log entries) as one JSON line"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        if isinstance(record.msg, dict):
+            entry = {"ts": self.formatTime(record, self.datefmt), "level": record.levelname}
+            entry.update(record.msg)
+            return json.dumps(entry, ensure_ascii=False, default=str)
+        return super().format(record)
+
+
+def _start_listener(*handlers: logging.Handler) -> QueueHandler:
+    """Start a background listener that owns the blocking output handlers"""
+    global _listener
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    _listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    atexit.register(stop_logging)
+
+    return _DeferredQueueHandler(log_queue)
+
+
+def stop_logging():
+    """Flush queued records and stop the background listener"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
 def setup_logging():
     """Setup application logging"""
-    
+
     # Create logger
     logger = logging.getLogger("compagent")
+    if logger.handlers:
+        return logger
     logger.setLevel(getattr(logging, settings.LOG_LEVEL))
-    
+
     # Create console handler
     handler = logging.StreamHandler(sys.stdout)
     handler.setLevel(getattr(logging, settings.LOG_LEVEL))
-    
+
     # Create formatter
     formatter = logging.Formatter(
         '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
         datefmt='%Y-%m-%d %H:%M:%S'
     )
     handler.setFormatter(formatter)
-    
-    # Add handler to logger
-    logger.addHandler(handler)
-    
+
+    # Access log lines are JSON on the same stream
+    access_handler = logging.StreamHandler(sys.stdout)
+    access_handler.setFormatter(JsonFormatter(datefmt='%Y-%m-%dT%H:%M:%S'))
+    access_handler.addFilter(lambda record: record.name == "compagent.access")
+    handler.addFilter(lambda record: record.name != "compagent.access")
+
+    # Writes happen on a background thread, request handlers only enqueue
+    logger.addHandler(_start_listener(handler, access_handler))
+
     return logger
 
 
 # Create default logger instance
 logger = setup_logging()
+access_logger = logging.getLogger("compagent.access")
+access_logger.setLevel(logging.INFO)
@@ -0,0 +1,174 @@
+"""
+Prometheus metrics
+"""
+from typing import Any, Optional, Set
+import threading
+
+from prometheus_client import Counter, Gauge, Histogram, CONTENT_TYPE_LATEST, generate_latest
+
+from core.config import settings
+
+
+# Latency buckets tuned for sub-millisecond cache hits up to slow LLM completions
+LATENCY_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25,
+    0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0
+)
+TOKEN_BUCKETS = (16, 32, 64, 128, 256, 512, 1024, 2048, 4096, 8192)
+
+HTTP_REQUEST_DURATION = Histogram(
+    "compagent_http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ["method", "route", "status"],
+    buckets=LATENCY_BUCKETS
+)
+VECTOR_SEARCH_DURATION = Histogram(
+    "compagent_vector_search_duration_seconds",
+    "Vector store query latency, excluding embedding",
+    ["agent"],
+    buckets=LATENCY_BUCKETS
+)
+EMBEDDING_DURATION = Histogram(
+    "compagent_embedding_duration_seconds",
+    "Time spent embedding texts",
+    ["operation"],
+    buckets=LATENCY_BUCKETS
+)
+LLM_TIME_TO_FIRST_TOKEN = Histogram(
+    "compagent_llm_time_to_first_token_seconds",
+    "Time until the first completion token was produced",
+    ["agent", "model"],
+    buckets=LATENCY_BUCKETS
+)
+LLM_REQUEST_DURATION = Histogram(
+    "compagent_llm_request_duration_seconds",
+    "Total upstream LLM call duration, excluding queue wait",
+    ["agent", "model", "priority"],
+    buckets=LATENCY_BUCKETS
+)
+LLM_TOKENS = Histogram(
+    "compagent_llm_tokens",
+    "Tokens per completion from response.usage",
+    ["agent", "model", "kind"],
+    buckets=TOKEN_BUCKETS
+)
+LLM_QUEUE_WAIT = Histogram(
+    "compagent_llm_queue_wait_seconds",
+    "Time spent waiting for an upstream LLM slot",
+    ["priority"],
+    buckets=LATENCY_BUCKETS
+)
+LLM_QUEUE_DEPTH = Gauge(
+    "compagent_llm_queue_depth",
+    "Requests waiting for an upstream LLM slot",
+    ["priority"]
+)
+LLM_IN_FLIGHT = Gauge(
+    "compagent_llm_in_flight",
+    "Upstream LLM calls currently running"
+)
+LLM_ROUTES = Counter(
+    "compagent_llm_routes_total",
+    "Model routing decisions by tier and reason",
+    ["tier", "reason"]
+)
+CACHE_REQUESTS = Counter(
+    "compagent_cache_requests_total",
+    "Cache lookups by cache and result",
+    ["cache", "result"]
+)
+ACTION_REQUESTS = Counter(
+    "compagent_action_requests_total",
+    "Agent endpoint calls by outcome",
+    ["outcome"]
+)
+ACTION_DURATION = Histogram(
+    "compagent_action_duration_seconds",
+    "Agent endpoint call latency",
+    ["method"],
+    buckets=LATENCY_BUCKETS
+)
+REJECTED_REQUESTS = Counter(
+    "compagent_rejected_requests_total",
+    "Requests rejected by rate limiting or admission control",
+    ["reason"]
+)
+
+
+class AgentLabeler:
+    """
+    Keeps the agent label set bounded
+    - The first max_agents distinct agents get their own label value
+    - Every later agent is reported as "other"
+    """
+
+    def __init__(self, max_agents: int):
+        self.max_agents = max_agents
+        self._known: Set[str] = set()
+        self._lock = threading.Lock()
+
+    def __call__(self, agent_id: Optional[str]) -> str:
+        if not agent_id:
+            return "none"
+        if agent_id in self._known:
+            return agent_id
+        with self._lock:
+            if len(self._known) < self.max_agents:
+                self._known.add(agent_id)
+                return agent_id
+        return "other"
+
+
+agent_label = AgentLabeler(settings.METRICS_MAX_AGENT_LABELS)
+
+
+def observe_llm_completion(
+    agent_id: Optional[str],
+    model: Optional[str],
+    priority: str,
+    elapsed: float,
+    response: Any
+):
+    """
+    Record duration, time-to-first-token and token usage of a completion
+
+    For non-streaming calls the first token is only visible server-side, so
+    TTFT is derived from Groq's usage timings (elapsed minus completion_time).
+    """
+    agent = agent_label(agent_id)
+    model = model or "unknown"
+    LLM_REQUEST_DURATION.labels(agent, model, priority).observe(elapsed)
+
+    usage = getattr(response, "usage", None)
+    if usage is None:
+        return
+
+    completion_time = getattr(usage, "completion_time", None)
+    if completion_time is not None:
+        LLM_TIME_TO_FIRST_TOKEN.labels(agent, model).observe(max(0.0, elapsed - completion_time))
+
+    prompt_tokens = getattr(usage, "prompt_tokens", None)
+    completion_tokens = getattr(usage, "completion_tokens", None)
+    if prompt_tokens is not None:
+        LLM_TOKENS.labels(agent, model, "prompt").observe(prompt_tokens)
+    if completion_tokens is not None:
+        LLM_TOKENS.labels(agent, model, "completion").observe(completion_tokens)
+
+
+def record_cache(cache: str, hit: bool):
+    """Count a cache lookup"""
+    CACHE_REQUESTS.labels(cache, "hit" if hit else "miss").inc()
+
+
+def track_scheduler(scheduler: Any, priorities: Any):
+    """Export scheduler queue depth and in-flight count as scrape-time gauges"""
+    for priority in priorities:
+        LLM_QUEUE_DEPTH.labels(priority.name.lower()).set_function(
+            lambda p=priority: scheduler.queue_depth(p)
+        )
+    LLM_IN_FLIGHT.set_function(lambda: scheduler.in_flight)
+
+
+def render_latest() -> tuple:
+    """Serialize the default registry in Prometheus text format"""
+    return generate_latest(), CONTENT_TYPE_LATEST
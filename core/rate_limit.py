@@ -0,0 +1,153 @@
+"""
+Rate limiting - Per-client token bucket (in-memory, Redis optional)
+"""
+from collections import OrderedDict
+from typing import Tuple, Optional
+from dataclasses import dataclass
+import math
+import time
+
+from core.config import settings
+from core.logging import logger
+
+
+@dataclass
+class RateLimitResult:
+    """Outcome of a rate limit check"""
+    allowed: bool
+    remaining: int
+    retry_after: int = 0
+
+
+class TokenBucketLimiter:
+    """
+    In-process token bucket per client key
+    - Capacity RATE_LIMIT_REQUESTS, refilled over RATE_LIMIT_WINDOW seconds
+    - At most max_clients buckets; the least recently seen client is evicted (LRU)
+    """
+
+    def __init__(self, capacity: int, window: int, max_clients: int = 100_000):
+        self.capacity = float(max(1, capacity))
+        self.refill_rate = self.capacity / max(1, window)
+        self.max_clients = max(1, max_clients)
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+
+    async def acquire(self, key: str) -> RateLimitResult:
+        """Take one token for the client if available"""
+        return self.take(key)
+
+    def take(self, key: str) -> RateLimitResult:
+        """Synchronous token take used by the in-memory and fallback paths"""
+        now = time.monotonic()
+        tokens, updated_at = self._buckets.get(key, (self.capacity, now))
+        tokens = min(self.capacity, tokens + (now - updated_at) * self.refill_rate)
+
+        if tokens >= 1.0:
+            tokens -= 1.0
+            allowed = True
+        else:
+            allowed = False
+
+        self._buckets[key] = (tokens, now)
+        self._buckets.move_to_end(key)
+        while len(self._buckets) > self.max_clients:
+            self._buckets.popitem(last=False)
+
+        return RateLimitResult(
+            allowed=allowed,
+            remaining=int(tokens),
+            retry_after=0 if allowed else self._retry_after(tokens)
+        )
+
+    def _retry_after(self, tokens: float) -> int:
+        """Seconds until the next token is available"""
+        return max(1, math.ceil((1.0 - tokens) / self.refill_rate))
+
+
+class RedisTokenBucketLimiter:
+    """
+    Token bucket shared across workers through Redis
+    - Atomic refill-and-take in a Lua script
+    - Falls back to a local bucket when Redis is unreachable
+    """
+
+    SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local data = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(data[1]) or capacity
+local ts = tonumber(data[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local allowed = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+return {allowed, tostring(tokens)}
+"""
+
+    def __init__(
+        self,
+        redis_url: str,
+        capacity: int,
+        window: int,
+        prefix: str = "ratelimit:",
+        max_clients: int = 100_000
+    ):
+        import redis.asyncio as aioredis
+
+        self.client = aioredis.from_url(redis_url)
+        self.prefix = prefix
+        self.fallback = TokenBucketLimiter(capacity, window, max_clients)
+        self._script = self.client.register_script(self.SCRIPT)
+
+    async def acquire(self, key: str) -> RateLimitResult:
+        """Take one token for the client if available"""
+        fallback = self.fallback
+        try:
+            allowed, tokens = await self._script(
+                keys=[f"{self.prefix}{key}"],
+                args=[fallback.capacity, fallback.refill_rate, time.time()]
+            )
+        except Exception as e:
+            logger.warning(f"Redis rate limiter unavailable, using local bucket: {e}")
+            return fallback.take(key)
+
+        tokens = float(tokens)
+        return RateLimitResult(
+            allowed=bool(allowed),
+            remaining=int(tokens),
+            retry_after=0 if allowed else fallback._retry_after(tokens)
+        )
+
+
+def create_rate_limiter() -> Optional[object]:
+    """Build the limiter selected by RATE_LIMIT_BACKEND"""
+    backend = settings.RATE_LIMIT_BACKEND.lower()
+    if backend in ("", "none", "off"):
+        return None
+
+    if backend == "redis":
+        try:
+            limiter = RedisTokenBucketLimiter(
+                settings.REDIS_URL,
+                settings.RATE_LIMIT_REQUESTS,
+                settings.RATE_LIMIT_WINDOW,
+                max_clients=settings.RATE_LIMIT_MAX_CLIENTS
+            )
+            logger.info("Rate limiting enabled with Redis backend")
+            return limiter
+        except ImportError:
+            logger.warning("redis package not installed, falling back to in-memory rate limiting")
+
+    logger.info("Rate limiting enabled with in-memory backend")
+    return TokenBucketLimiter(
+        settings.RATE_LIMIT_REQUESTS, settings.RATE_LIMIT_WINDOW, settings.RATE_LIMIT_MAX_CLIENTS
+    )
+
+
+# Global instance
+rate_limiter = create_rate_limiter()
@@ -0,0 +1,19 @@
+"""
+Stats - Küçük istatistik yardımcıları
+"""
+from typing import Sequence
+import math
+
+
+def percentile(sorted_values: Sequence[float], q: float) -> float:
+    """
+    Nearest-rank percentile of an already sorted sequence
+
+    The smallest value with at least q * n values at or below it, i.e. the
+    value at rank ceil(q * n) (1-based). 0.0 for an empty sequence.
+    """
+    if not sorted_values:
+        return 0.0
+    # The epsilon keeps 0.07 * 100 = 7.000000000000001 at rank 7
+    rank = math.ceil(q * len(sorted_values) - 1e-9)
+    return sorted_values[max(0, min(len(sorted_values), rank) - 1)]
@@ -0,0 +1,239 @@
+"""
+Request tracing - Lightweight stage spans for Server-Timing and OTLP export
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional
+import json
+import os
+import queue
+import re
+import threading
+import time
+import urllib.request
+from pathlib import Path
+
+from core.config import settings
+from core.logging import logger
+
+
+@dataclass
+class Span:
+    """A timed stage inside a request"""
+    name: str
+    span_id: str
+    parent_id: Optional[str]
+    start_ns: int
+    end_ns: int = 0
+    attributes: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def duration_ms(self) -> float:
+        return (self.end_ns - self.start_ns) / 1_000_000
+
+
+@dataclass
+class Trace:
+    """All spans recorded for one request"""
+    trace_id: str
+    name: str
+    wall_start_ns: int
+    start_ns: int
+    spans: List[Span] = field(default_factory=list)
+    attributes: Dict[str, Any] = field(default_factory=dict)
+
+
+_current_trace: ContextVar[Optional[Trace]] = ContextVar("compagent_trace", default=None)
+_current_span_id: ContextVar[Optional[str]] = ContextVar("compagent_span_id", default=None)
+
+
+def _new_id(num_bytes: int) -> str:
+    return os.urandom(num_bytes).hex()
+
+
+def start_trace(name: str, **attributes: Any) -> Trace:
+    """Start a trace for the current request context"""
+    trace = Trace(
+        trace_id=_new_id(16),
+        name=name,
+        wall_start_ns=time.time_ns(),
+        start_ns=time.perf_counter_ns(),
+        attributes=attributes
+    )
+    _current_trace.set(trace)
+    _current_span_id.set(None)
+    return trace
+
+
+def current_trace() -> Optional[Trace]:
+    """Trace of the current request, if any"""
+    return _current_trace.get()
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Optional[Span]]:
+    """
+    Time a stage of the current request
+
+    A no-op outside a traced request. Context is copied into worker threads
+    (asyncio.to_thread), so spans opened there land in the same trace.
+    """
+    trace = _current_trace.get()
+    if trace is None:
+        yield None
+        return
+
+    current = Span(
+        name=name,
+        span_id=_new_id(8),
+        parent_id=_current_span_id.get(),
+        start_ns=time.perf_counter_ns(),
+        attributes=attributes
+    )
+    token = _current_span_id.set(current.span_id)
+    try:
+        yield current
+    finally:
+        current.end_ns = time.perf_counter_ns()
+        _current_span_id.reset(token)
+        trace.spans.append(current)
+
+
+_TOKEN_RE = re.compile(r"[^A-Za-z0-9_.-]")
+
+
+def server_timing_header(trace: Trace, total_ns: Optional[int] = None) -> str:
+    """
+    Build a Server-Timing header value from a trace
+
+    Repeated stages (e.g. two LLM calls) are summed under one metric name.
+    """
+    totals: Dict[str, float] = {}
+    for s in trace.spans:
+        key = _TOKEN_RE.sub("_", s.name)
+        totals[key] = totals.get(key, 0.0) + s.duration_ms
+
+    parts = [f"{name};dur={duration:.2f}" for name, duration in totals.items()]
+    if total_ns is not None:
+        parts.append(f"total;dur={(total_ns - trace.start_ns) / 1_000_000:.2f}")
+    return ", ".join(parts)
+
+
+class SpanExporter:
+    """
+    Ships finished traces as OTLP/JSON from a background thread
+    - "file": one ExportTraceServiceRequest JSON document per line
+    - "otlp": batched POSTs to an OTLP/HTTP collector (/v1/traces)
+    """
+
+    def __init__(self, mode: str, path: str, endpoint: str, service_name: str = "compagent-api"):
+        self.mode = mode
+        self.path = Path(path)
+        self.endpoint = endpoint
+        self.service_name = service_name
+        self._queue: "queue.Queue[Optional[Trace]]" = queue.Queue(maxsize=10_000)
+        self._thread = threading.Thread(target=self._run, name="span-exporter", daemon=True)
+
+        if self.mode == "file":
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._thread.start()
+
+    def export(self, trace: Trace, end_ns: int):
+        """Queue a finished trace; dropped if the exporter is behind"""
+        trace.attributes["end_ns"] = end_ns
+        try:
+            self._queue.put_nowait(trace)
+        except queue.Full:
+            pass
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < 256:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self._write(batch)
+            except Exception as e:
+                logger.warning(f"Span export failed: {e}")
+
+    def _write(self, traces: List[Trace]):
+        if self.mode == "file":
+            with open(self.path, "a", encoding="utf-8") as f:
+                for trace in traces:
+                    f.write(json.dumps(self._to_otlp([trace])) + "\n")
+        else:
+            request = urllib.request.Request(
+                self.endpoint,
+                data=json.dumps(self._to_otlp(traces)).encode("utf-8"),
+                headers={"Content-Type": "application/json"},
+                method="POST"
+            )
+            urllib.request.urlopen(request, timeout=5).close()
+
+    def _to_otlp(self, traces: List[Trace]) -> Dict[str, Any]:
+        """Convert traces to the OTLP/JSON ExportTraceServiceRequest shape"""
+        spans = []
+        for trace in traces:
+            def unix_ns(mono_ns: int) -> str:
+                return str(trace.wall_start_ns + (mono_ns - trace.start_ns))
+
+            root_id = _new_id(8)
+            root_attrs = {k: v for k, v in trace.attributes.items() if k != "end_ns"}
+            spans.append({
+                "traceId": trace.trace_id,
+                "spanId": root_id,
+                "name": trace.name,
+                "kind": 2,
+                "startTimeUnixNano": unix_ns(trace.start_ns),
+                "endTimeUnixNano": unix_ns(trace.attributes["end_ns"]),
+                "attributes": _otlp_attributes(root_attrs)
+            })
+            for s in trace.spans:
+                spans.append({
+                    "traceId": trace.trace_id,
+                    "spanId": s.span_id,
+                    "parentSpanId": s.parent_id or root_id,
+                    "name": s.name,
+                    "kind": 1,
+                    "startTimeUnixNano": unix_ns(s.start_ns),
+                    "endTimeUnixNano": unix_ns(s.end_ns),
+                    "attributes": _otlp_attributes(s.attributes)
+                })
+
+        return {
+            "resourceSpans": [{
+                "resource": {"attributes": _otlp_attributes({"service.name": self.service_name})},
+                "scopeSpans": [{"scope": {"name": "compagent"}, "spans": spans}]
+            }]
+        }
+
+
+def _otlp_attributes(attributes: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Encode a flat dict as OTLP KeyValue list"""
+    encoded = []
+    for key, value in attributes.items():
+        if isinstance(value, bool):
+            encoded.append({"key": key, "value": {"boolValue": value}})
+        elif isinstance(value, int):
+            encoded.append({"key": key, "value": {"intValue": str(value)}})
+        elif isinstance(value, float):
+            encoded.append({"key": key, "value": {"doubleValue": value}})
+        else:
+            encoded.append({"key": key, "value": {"stringValue": str(value)}})
+    return encoded
+
+
+def _create_exporter() -> Optional[SpanExporter]:
+    mode = settings.TRACE_EXPORT.lower()
+    if mode not in ("file", "otlp"):
+        return None
+    logger.info(f"Trace export enabled ({mode})")
+    return SpanExporter(mode, settings.TRACE_EXPORT_PATH, settings.TRACE_OTLP_ENDPOINT)
+
+
+# Global instance
+span_exporter = _create_exporter()
@@ -4,12 +4,20 @@ SaaS Product Agent Platform - Main Application
 import uvicorn
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, Response
 from contextlib import asynccontextmanager
 import time
 
+from api.dependencies import client_key
+from api.middleware import AccessLogMiddleware, ServerTimingMiddleware
 from api.routes import agent, products, analytics, agents
+from agent.actions import action_executor
+from agent.analytics import event_store
+from agent.storage.agent_store import agent_store
+from core import metrics
 from core.config import settings
 from core.logging import setup_logging
+from core.rate_limit import rate_limiter
 
 # Setup logging
 logger = setup_logging()
@@ -20,9 +28,17 @@ async def lifespan(app: FastAPI):
     """Application lifespan events"""
     logger.info("Starting SaaS Product Agent Platform...")
     # Startup: Initialize connections, load models, etc.
+    now = time.time()
+    recent = event_store.rollups.top_agents(
+        now - 86400, now, settings.KNOWLEDGE_PRELOAD_AGENTS, kinds=["agent_chat", "upload"]
+    )
+    agents.knowledge_manager.preload_collections(
+        f"agent_{agent_id}" for agent_id in recent if agent_store.get_agent(agent_id)
+    )
     yield
     # Shutdown: Cleanup resources
     logger.info("Shutting down SaaS Product Agent Platform...")
+    await action_executor.close()
 
 
 app = FastAPI(
@@ -34,36 +50,41 @@ app = FastAPI(
     redoc_url="/redoc"
 )
 
-# Request logging middleware
+# Paths that are never rate limited
+RATE_LIMIT_EXEMPT_PATHS = {"/", "/health", "/metrics", "/docs", "/redoc", "/openapi.json"}
+
+
+# Rate limiting middleware
 @app.middleware("http")
-async def log_requests(request: Request, call_next):
-    start_time = time.time()
-    
-    # Log request details
-    logger.info(f"=== REQUEST START ===")
-    logger.info(f"Method: {request.method}")
-    logger.info(f"Path: {request.url.path}")
-    logger.info(f"Origin: {request.headers.get('origin', 'None')}")
-    logger.info(f"Content-Type: {request.headers.get('content-type', 'None')}")
-    
+async def rate_limit(request: Request, call_next):
+    if rate_limiter is None or request.method == "OPTIONS" or request.url.path in RATE_LIMIT_EXEMPT_PATHS:
+        return await call_next(request)
+
+    result = await rate_limiter.acquire(client_key(request))
+
+    if not result.allowed:
+        metrics.REJECTED_REQUESTS.labels("rate_limit").inc()
+        return JSONResponse(
+            status_code=429,
+            content={"detail": "Rate limit exceeded"},
+            headers={
+                "Retry-After": str(result.retry_after),
+                "X-RateLimit-Remaining": "0"
+            }
+        )
+
     response = await call_next(request)
-    
-    process_time = time.time() - start_time
-    
-    # Log response
-    logger.info(f"Status: {response.status_code}")
-    logger.info(f"Time: {process_time:.3f}s")
-    
-    # Log success/failure
-    if 200 <= response.status_code < 300:
-        logger.info(f"✅ SUCCESS: {request.method} {request.url.path} -> {response.status_code}")
-    else:
-        logger.error(f"❌ FAILED: {request.method} {request.url.path} -> {response.status_code}")
-    
-    logger.info(f"=== REQUEST END ===\n")
-    
+    response.headers["X-RateLimit-Remaining"] = str(result.remaining)
     return response
 
+
+# Access logging and request metrics
+app.add_middleware(AccessLogMiddleware)
+
+# Stage timing (Server-Timing header, optional span export)
+if settings.SERVER_TIMING_ENABLED:
+    app.add_middleware(ServerTimingMiddleware)
+
 # CORS Middleware
 logger.info(f"Allowed CORS origins: {settings.allowed_origins_list}")
 app.add_middleware(
@@ -92,6 +113,14 @@ async def root():
     }
 
 
+if settings.ENABLE_METRICS:
+    @app.get("/metrics", include_in_schema=False)
+    async def prometheus_metrics():
+        """Prometheus scrape endpoint"""
+        body, content_type = metrics.render_latest()
+        return Response(content=body, media_type=content_type)
+
+
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
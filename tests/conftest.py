@@ -0,0 +1,30 @@
+"""
+Test configuration - uygulama modülleri import edilmeden önce ortam ayarları
+"""
+import os
+import tempfile
+
+import pytest
+
+# Settings are read at import time; tests never reach a real LLM or the repo's data/
+_DATA_DIR = tempfile.mkdtemp(prefix="compagent-tests-")
+os.environ.setdefault("GROQ_API_KEY", "test")
+os.environ.setdefault("SECRET_KEY", "test")
+os.environ.setdefault("LLM_PROVIDER", "fake")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+os.environ.setdefault("ANALYTICS_DB_PATH", os.path.join(_DATA_DIR, "events.db"))
+os.environ.setdefault("TRACE_EXPORT_PATH", os.path.join(_DATA_DIR, "spans.jsonl"))
+os.environ.setdefault("RATE_LIMIT_REQUESTS", "100000")
+os.environ.setdefault("ACCESS_LOG_SAMPLE_RATE", "0")
+
+
+@pytest.fixture(scope="session")
+def client():
+    """TestClient of the whole application"""
+    # Agent store and Chroma use paths relative to the working directory
+    os.chdir(_DATA_DIR)
+    from fastapi.testclient import TestClient
+    from main import app
+
+    with TestClient(app) as test_client:
+        yield test_client
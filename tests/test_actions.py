@@ -0,0 +1,123 @@
+"""
+Action executor tests against the local fake endpoint host
+"""
+import asyncio
+import time
+
+import pytest
+
+from agent.actions import ActionExecutor
+from benchmarks.fake_api_server import FakeAPIConfig, FakeAPIServer
+
+
+@pytest.fixture(scope="module")
+def fake_api():
+    server = FakeAPIServer(FakeAPIConfig()).start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def server(fake_api):
+    fake_api.config = FakeAPIConfig(latency_ms=0, jitter_ms=0, seed=0)
+    fake_api.reset_stats()
+    return fake_api
+
+
+def _endpoint(server, path="/items", method="GET", **extra):
+    return {"id": path, "name": path.strip("/"), "method": method, "url": server.base_url + path, **extra}
+
+
+def _run(executor, calls):
+    async def run():
+        try:
+            return await executor.execute_many(calls)
+        finally:
+            await executor.close()
+
+    return asyncio.run(run())
+
+
+def test_execute_many_runs_calls_in_parallel(server):
+    server.config.latency_ms = 200
+    executor = ActionExecutor(allow_private=True, cache_ttl=0)
+    calls = [(_endpoint(server, f"/items/{i}"), None) for i in range(5)]
+
+    started = time.perf_counter()
+    results = _run(executor, calls)
+    elapsed = time.perf_counter() - started
+
+    assert [r.ok for r in results] == [True] * 5
+    assert [r.data["path"] for r in results] == [f"/items/{i}" for i in range(5)]
+    assert elapsed < 0.6
+
+
+def test_get_cache_honours_max_age(server):
+    server.config.max_age = 1
+    executor = ActionExecutor(allow_private=True, cache_ttl=30)
+    endpoint = _endpoint(server)
+
+    first, second = _run(executor, [(endpoint, None)]), _run(executor, [(endpoint, None)])
+    assert not first[0].cached and second[0].cached
+    assert server.stats["requests"] == 1
+
+    time.sleep(1.1)
+    assert not _run(executor, [(endpoint, None)])[0].cached
+    assert server.stats["requests"] == 2
+
+
+def test_get_cache_skips_no_store(server):
+    server.config.cache_control = "no-store"
+    executor = ActionExecutor(allow_private=True, cache_ttl=30)
+    endpoint = _endpoint(server)
+
+    for _ in range(3):
+        assert not _run(executor, [(endpoint, None)])[0].cached
+    assert server.stats["requests"] == 3
+
+
+def test_identical_inflight_gets_share_one_request(server):
+    server.config.latency_ms = 100
+    server.config.cache_control = "no-store"
+    executor = ActionExecutor(allow_private=True, cache_ttl=30)
+    endpoint = _endpoint(server)
+
+    results = _run(executor, [(endpoint, {"q": "x"})] * 4)
+
+    assert all(r.ok for r in results)
+    assert server.stats["requests"] == 1
+    assert sum(r.cached for r in results) == 3
+
+
+def test_timeout_is_reported(server):
+    server.config.latency_ms = 500
+    executor = ActionExecutor(allow_private=True, cache_ttl=0, timeout=0.1)
+
+    result = _run(executor, [(_endpoint(server), None)])[0]
+
+    assert not result.ok
+    assert result.error == "timeout"
+
+
+def test_mutation_needs_opt_in(server):
+    executor = ActionExecutor(allow_private=True, cache_ttl=0)
+    blocked = _endpoint(server, "/orders", method="POST")
+    allowed = _endpoint(server, "/orders", method="POST", allow_mutation=True)
+
+    refused, sent = _run(executor, [(blocked, {"qty": 1}), (allowed, {"qty": 2})])
+
+    assert refused.error == "POST endpoints need allow_mutation"
+    assert sent.ok and sent.data["body"] == {"qty": 2}
+    assert server.stats["requests"] == 1
+
+
+@pytest.mark.parametrize("url", ["http://127.0.0.1:{port}/items", "http://169.254.169.254/latest/meta-data/"])
+def test_default_config_refuses_private_addresses(server, url):
+    executor = ActionExecutor(cache_ttl=0)
+    endpoint = {"name": "internal", "method": "GET", "url": url.format(port=server.httpd.server_address[1])}
+
+    result = _run(executor, [(endpoint, None)])[0]
+
+    assert not result.ok
+    assert "non-public" in result.error
+    assert server.stats["requests"] == 0
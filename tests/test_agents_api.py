@@ -0,0 +1,44 @@
+"""
+Agent read API tests - ETag / 304
+"""
+
+
+def _create_agent(client, name):
+    response = client.post("/api/v1/agents", json={"name": name, "description": "ETag test"})
+    assert response.status_code == 200
+    return response.json()["id"]
+
+
+def test_get_agent_answers_304_for_current_etag(client):
+    agent_id = _create_agent(client, "etag-agent")
+
+    first = client.get(f"/api/v1/agents/{agent_id}")
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+    assert first.headers["last-modified"]
+
+    cached = client.get(f"/api/v1/agents/{agent_id}", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.content == b""
+    assert cached.headers["etag"] == etag
+
+
+def test_update_changes_the_etag(client):
+    agent_id = _create_agent(client, "etag-update")
+    etag = client.get(f"/api/v1/agents/{agent_id}").headers["etag"]
+
+    assert client.put(f"/api/v1/agents/{agent_id}", json={"description": "changed"}).status_code == 200
+
+    fresh = client.get(f"/api/v1/agents/{agent_id}", headers={"If-None-Match": etag})
+    assert fresh.status_code == 200
+    assert fresh.headers["etag"] != etag
+    assert fresh.json()["description"] == "changed"
+
+
+def test_agent_listing_etag(client):
+    _create_agent(client, "etag-list")
+    listing = client.get("/api/v1/agents")
+    assert listing.status_code == 200
+
+    cached = client.get("/api/v1/agents", headers={"If-None-Match": listing.headers["etag"]})
+    assert cached.status_code == 304
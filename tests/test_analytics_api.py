@@ -0,0 +1,23 @@
+"""
+Analytics API tests
+"""
+import time
+
+from agent.analytics import event_store
+from agent.analytics.events import InteractionEvent
+
+
+def test_dashboard_and_top_questions_include_buffered_events(client):
+    for i in range(3):
+        event_store.record(InteractionEvent(
+            kind="chat", agent_id="analytics-p1", session_id=f"s{i}", ts=time.time(),
+            latency_ms=120.0, user_id=f"u{i}", question="What is the price?"
+        ))
+
+    dashboard = client.get("/api/v1/analytics/dashboard")
+    assert dashboard.status_code == 200
+    assert dashboard.json()["overview"]["total_conversations_today"] >= 3
+
+    top = client.get("/api/v1/analytics/top-questions/analytics-p1", params={"min_count": 1})
+    assert top.status_code == 200
+    assert top.json()["items"][0]["count"] == 3
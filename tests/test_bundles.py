@@ -0,0 +1,102 @@
+"""
+Knowledge bundle export / import tests
+"""
+import io
+import tarfile
+
+import numpy as np
+import pytest
+
+from agent.knowledge_base.bundle import BundleError
+from agent.knowledge_base.knowledge_manager import KnowledgeManager
+from agent.knowledge_base.transfer import pack, unpack
+from tests.embeddings import HashEmbedding
+
+
+@pytest.fixture(params=["chroma", "mmap"])
+def manager(request, tmp_path):
+    # One shard: the clone lands in the same shard collection as its source
+    manager = KnowledgeManager(
+        persist_directory=str(tmp_path / "store"), chunk_strategy="paragraph", chunk_size=40,
+        layout="sharded", shards=1, backend=request.param
+    )
+    manager.embedding_function = HashEmbedding()
+    return manager
+
+
+def _records(manager, collection_name):
+    collection, where = manager.scoped_collection(collection_name)
+    found = collection.get(where=where, include=["documents", "metadatas", "embeddings"])
+    return {
+        chunk_id: (document, metadata, list(embedding))
+        for chunk_id, document, metadata, embedding
+        in zip(found["ids"], found["documents"], found["metadatas"], found["embeddings"])
+    }
+
+
+def test_export_import_round_trip(manager, tmp_path):
+    manager.add_document("agent_src", "Paragraph about pricing.\n\nParagraph about support.")
+    manager.add_document("agent_src", "Paragraph about returns.")
+    source = _records(manager, "agent_src")
+
+    manifest = manager.export_collection("agent_src", str(tmp_path / "bundle"))
+    assert manifest["count"] == 3
+    pack(str(tmp_path / "bundle"), str(tmp_path / "bundle.tar"))
+    with open(tmp_path / "bundle.tar", "rb") as f:
+        unpack(f, str(tmp_path / "unpacked"))
+
+    stats = manager.import_collection("agent_dst", str(tmp_path / "unpacked"))
+    assert stats["chunks"] == 3
+
+    clone = _records(manager, "agent_dst")
+    assert set(clone) == {f"{chunk_id}~dst" for chunk_id in source}
+    for chunk_id, (document, metadata, embedding) in source.items():
+        cloned_document, cloned_metadata, cloned_embedding = clone[f"{chunk_id}~dst"]
+        assert cloned_document == document
+        assert cloned_metadata == {**metadata, "agent_id": "dst"}
+        np.testing.assert_allclose(cloned_embedding, embedding, rtol=1e-6)
+    assert _records(manager, "agent_src") == source
+
+    # Importing again upserts instead of duplicating
+    manager.import_collection("agent_dst", str(tmp_path / "unpacked"))
+    assert len(_records(manager, "agent_dst")) == 3
+
+    manager.delete_collection("agent_src")
+    assert manager.search("agent_dst", "Paragraph about returns.", n_results=3).count("Paragraph") == 3
+
+
+def test_import_rejects_other_embedding_model(manager, tmp_path):
+    manager.add_document("agent_src", "Paragraph about pricing.")
+    manager.export_collection("agent_src", str(tmp_path / "bundle"))
+
+    class OtherModel(HashEmbedding):
+        MODEL_NAME = "other-model"
+
+    manager.embedding_function = OtherModel()
+    with pytest.raises(BundleError, match="embedded with"):
+        manager.import_collection("agent_dst", str(tmp_path / "bundle"))
+
+
+@pytest.mark.parametrize("name, kind", [
+    ("notes.txt", tarfile.REGTYPE),
+    ("../manifest.json", tarfile.REGTYPE),
+    ("manifest.json", tarfile.SYMTYPE),
+])
+def test_unpack_rejects_unexpected_members(tmp_path, name, kind):
+    archive = io.BytesIO()
+    with tarfile.open(fileobj=archive, mode="w") as tar:
+        member = tarfile.TarInfo(name)
+        member.type = kind
+        data = b"{}"
+        if kind == tarfile.SYMTYPE:
+            member.linkname = "/etc/passwd"
+            tar.addfile(member)
+        else:
+            member.size = len(data)
+            tar.addfile(member, io.BytesIO(data))
+    archive.seek(0)
+
+    with pytest.raises(BundleError, match="Unexpected bundle member"):
+        unpack(archive, str(tmp_path / "out"))
+    assert not (tmp_path / "manifest.json").exists()
+    assert list((tmp_path / "out").iterdir()) == []
@@ -0,0 +1,34 @@
+"""
+Chunking tests
+"""
+import pytest
+
+from agent.knowledge_base.knowledge_manager import KnowledgeManager
+
+
+@pytest.fixture
+def manager(tmp_path):
+    return KnowledgeManager(persist_directory=str(tmp_path), chunk_size=10, chunk_overlap=3)
+
+
+def test_fixed_chunks_overlap(manager):
+    assert manager.chunk_text("abcdefghijklmnopqrst") == ["abcdefghij", "hijklmnopq", "opqrst"]
+
+
+@pytest.mark.parametrize("overlap", [4, 9])
+def test_overlap_not_smaller_than_chunk_terminates(manager, overlap):
+    chunks = manager.chunk_fixed("abcdef", chunk_size=4, overlap=overlap)
+    assert chunks == ["abcd", "bcde", "cdef", "def", "ef", "f"]
+
+
+def test_invalid_chunk_settings_are_rejected(tmp_path):
+    with pytest.raises(ValueError, match="overlap"):
+        KnowledgeManager(persist_directory=str(tmp_path), chunk_size=100, chunk_overlap=100)
+
+
+def test_paragraph_chunks_keep_paragraphs(tmp_path):
+    manager = KnowledgeManager(persist_directory=str(tmp_path), chunk_strategy="paragraph", chunk_size=40)
+
+    assert manager.chunk_text("First paragraph.\n\nSecond one.\n\n" + "x" * 50) == [
+        "First paragraph.\n\nSecond one.", "x" * 40, "x" * 10
+    ]
@@ -0,0 +1,71 @@
+"""
+Collection handle registry tests
+"""
+import threading
+
+import pytest
+
+from agent.knowledge_base.knowledge_manager import KnowledgeManager
+from tests.embeddings import HashEmbedding
+
+
+@pytest.fixture(params=["chroma", "mmap"])
+def manager(request, tmp_path):
+    manager = KnowledgeManager(persist_directory=str(tmp_path), backend=request.param)
+    manager.embedding_function = HashEmbedding()
+    return manager
+
+
+def test_delete_and_create_replace_cached_handle(manager):
+    old = manager.create_collection("agent_x")
+    manager.add_document("agent_x", "Old catalogue")
+    assert manager.get_collection("agent_x") is old
+
+    manager.delete_collection("agent_x")
+    assert "agent_x" not in manager._collections
+    with pytest.raises(Exception):
+        manager.get_collection("agent_x")
+
+    new = manager.create_collection("agent_x")
+    assert manager.get_collection("agent_x") is new
+    assert new.count() == 0
+    manager.add_document("agent_x", "New catalogue")
+    assert manager.search("agent_x", "catalogue") == "New catalogue"
+
+
+def test_registry_is_bounded_lru(manager):
+    manager.collection_cache_size = 2
+    for name in ("col_a", "col_b", "col_c"):
+        manager.create_collection(name)
+    manager.get_collection("col_b")
+    manager.create_collection("col_d")
+
+    assert list(manager._collections) == ["col_b", "col_d"]
+    # Evicted handles are fetched again on demand
+    assert manager.get_collection("col_a").name == "col_a"
+
+
+def test_registry_survives_concurrent_use(manager):
+    names = [f"col_{i}" for i in range(6)]
+    for name in names:
+        manager.create_collection(name)
+    manager.collection_cache_size = 2
+    errors = []
+
+    def worker(offset):
+        try:
+            for i in range(300):
+                manager.get_collection(names[(i + offset) % len(names)])
+                if i % 50 == 0:
+                    manager.invalidate_collection(names[offset % len(names)])
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert len(manager._collections) <= 2
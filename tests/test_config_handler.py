@@ -0,0 +1,43 @@
+"""
+Configuration handler tests
+"""
+import asyncio
+
+from agent.config_manager.config_handler import ConfigHandler
+from agent.config_manager.pricing import PricingCatalog
+from agent.llm.providers import Completion
+from agent.scheduler import Priority
+
+
+class RecordingRouter:
+    """Model router stub remembering each call's task and priority"""
+
+    def __init__(self):
+        self.calls = []
+
+    async def complete(self, task, messages, **kwargs):
+        self.calls.append((task, kwargs["priority"]))
+        return Completion(text="- öneri")
+
+
+def test_admission_priority_reaches_router():
+    router = RecordingRouter()
+    handler = ConfigHandler(router=router, pricing=PricingCatalog())
+
+    asyncio.run(handler.generate_configuration("p1", {"scale": "large"}, ["sso"], priority=Priority.BATCH))
+    asyncio.run(handler.analyze_requirements("p1", ["sso"], priority=Priority.BATCH))
+
+    assert router.calls == [("recommendation", Priority.BATCH), ("analysis", Priority.BATCH)]
+
+
+def test_configuration_is_memoized():
+    router = RecordingRouter()
+    handler = ConfigHandler(router=router, pricing=PricingCatalog())
+
+    first = asyncio.run(handler.generate_configuration("p1", {"scale": "large"}, ["sso"]))
+    first["pricing"] = 0
+    second = asyncio.run(handler.generate_configuration("p1", {"scale": "large"}, ["sso"]))
+
+    assert len(router.calls) == 1
+    assert second["pricing"] == 198.0
+    assert router.calls[0][1] == Priority.ANALYSIS
@@ -0,0 +1,75 @@
+"""
+Document update tests - chunks are reused by content hash
+"""
+import pytest
+
+from agent.knowledge_base.knowledge_manager import KnowledgeManager
+from tests.embeddings import HashEmbedding
+
+
+class CountingEmbedding(HashEmbedding):
+    def __init__(self):
+        self.texts = []
+
+    def __call__(self, input):
+        self.texts.extend(input)
+        return super().__call__(input)
+
+
+def _paragraphs(*names):
+    return "\n\n".join(f"Paragraph about {name}." for name in names)
+
+
+@pytest.fixture(params=[("chroma", "per_agent"), ("chroma", "sharded"), ("mmap", "per_agent"), ("mmap", "sharded")],
+                ids=lambda p: "-".join(p))
+def manager(request, tmp_path):
+    backend, layout = request.param
+    manager = KnowledgeManager(
+        persist_directory=str(tmp_path), chunk_strategy="paragraph", chunk_size=40,
+        layout=layout, shards=2, backend=backend
+    )
+    manager.embedding_function = CountingEmbedding()
+    manager.create_collection("agent_docs")
+    return manager
+
+
+def _chunks(manager, doc_id):
+    collection, where = manager.scoped_collection("agent_docs")
+    found = collection.get(where=manager._document_filter(where, doc_id), include=["documents", "metadatas"])
+    return {document: (chunk_id, metadata) for chunk_id, document, metadata
+            in zip(found["ids"], found["documents"], found["metadatas"])}
+
+
+def test_only_changed_chunks_are_embedded(manager):
+    doc_id = manager.add_document("agent_docs", _paragraphs("pricing", "support", "billing", "legacy"))
+    before = _chunks(manager, doc_id)
+    assert len(before) == 4
+    manager.embedding_function.texts.clear()
+
+    stats = manager.update_document(
+        "agent_docs", doc_id, _paragraphs("pricing", "support", "invoices", "shipping", "returns")
+    )
+
+    assert stats == {"chunks": 5, "embedded": 3, "reused": 2, "deleted": 2}
+    assert manager.embedding_function.texts == [
+        "Paragraph about invoices.", "Paragraph about shipping.", "Paragraph about returns."
+    ]
+    after = _chunks(manager, doc_id)
+    assert len(after) == 5
+    for kept in ("Paragraph about pricing.", "Paragraph about support."):
+        assert after[kept][0] == before[kept][0]
+    assert sorted(metadata["chunk_index"] for _, metadata in after.values()) == list(range(5))
+    assert "Paragraph about legacy." not in after
+
+
+def test_moved_chunk_keeps_vector_and_updates_position(manager):
+    doc_id = manager.add_document("agent_docs", _paragraphs("pricing", "support"))
+    before = _chunks(manager, doc_id)
+
+    stats = manager.update_document("agent_docs", doc_id, _paragraphs("intro", "pricing", "support"))
+
+    assert stats["embedded"] == 1 and stats["reused"] == 2
+    after = _chunks(manager, doc_id)
+    assert after["Paragraph about pricing."][0] == before["Paragraph about pricing."][0]
+    assert after["Paragraph about pricing."][1]["chunk_index"] == 1
+    assert after["Paragraph about pricing."][1]["total_chunks"] == 3
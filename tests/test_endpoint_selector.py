@@ -0,0 +1,80 @@
+"""
+Endpoint selector tests
+"""
+import re
+
+import pytest
+
+from agent.actions import EndpointSelector
+from agent.actions.protocol import describe_endpoint
+from agent.actions.selector import estimate_tokens
+from core.config import settings
+
+
+TOPICS = ["weather", "invoice", "shipment", "inventory", "refund", "booking", "coupon", "ticket"]
+
+
+class TopicEmbedding:
+    """One dimension per topic word; counts calls"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, texts, operation="query"):
+        self.calls += 1
+        return [[1.0 + 10 * len(re.findall(topic, text.lower())) for topic in TOPICS] for text in texts]
+
+
+def _endpoints(padding=0):
+    return [
+        {"id": f"e{i}", "name": f"get_{topic}", "method": "GET", "url": f"https://api.example.com/{topic}",
+         "description": f"Look up {topic} records" + " details" * padding}
+        for i, topic in enumerate(TOPICS)
+    ]
+
+
+def test_relevant_endpoint_is_kept():
+    selector = EndpointSelector(TopicEmbedding(), max_endpoints=2, token_budget=10_000)
+
+    selected = selector.select("agent", "Where is my shipment?", _endpoints())
+
+    assert len(selected) == 2
+    assert selected[0]["name"] == "get_shipment"
+
+
+def test_settings_limit_count_and_tokens(monkeypatch):
+    monkeypatch.setattr(settings, "ACTIONS_MAX_ENDPOINTS", 3)
+    monkeypatch.setattr(settings, "ACTIONS_PROMPT_TOKENS", 150)
+    endpoints = _endpoints(padding=20)
+    cost = estimate_tokens(describe_endpoint(endpoints[0]))
+    assert 2 * cost <= 150 < 3 * cost
+
+    selector = EndpointSelector(TopicEmbedding())
+    selected = selector.select("agent", "I need a refund", endpoints)
+
+    assert selected[0]["name"] == "get_refund"
+    assert len(selected) == 2
+    assert sum(estimate_tokens(describe_endpoint(e)) for e in selected) <= 150
+
+    selector.token_budget = 10_000
+    assert len(selector.select("agent", "I need a refund", endpoints)) == 3
+
+
+def test_small_sets_skip_embedding():
+    embed = TopicEmbedding()
+    selector = EndpointSelector(embed, max_endpoints=10, token_budget=10_000)
+
+    assert selector.select("agent", "anything", _endpoints()) == _endpoints()
+    assert embed.calls == 0
+
+
+def test_endpoints_are_embedded_once():
+    embed = TopicEmbedding()
+    selector = EndpointSelector(embed, max_endpoints=2, token_budget=10_000)
+    endpoints = _endpoints()
+
+    selector.select("agent", "coupon code", endpoints)
+    selector.select("agent", "book a ticket", endpoints)
+
+    # One endpoint batch, then one message embedding per turn
+    assert embed.calls == 3
@@ -0,0 +1,43 @@
+"""
+Fast path tests
+"""
+from agent.qa_engine.fast_path import FAQ, FastPathResponder
+
+
+FAQ_ENTRIES = [
+    {"question": "What is the price?", "answer": "short"},
+    {"question": "What is the price of the pro plan and what is the price of the team plan?", "answer": "long"},
+]
+
+
+def test_exact_match_beats_longer_overlapping_entry():
+    answer = FastPathResponder(threshold=0.9).match("product:p1", "What is the price?", FAQ_ENTRIES, kind=FAQ)
+
+    assert answer is not None
+    assert answer.answer == "short"
+    assert answer.score >= 0.99
+
+
+def test_unrelated_question_falls_through():
+    responder = FastPathResponder(threshold=0.9)
+
+    assert responder.match("product:p1", "How do I reset my password?", FAQ_ENTRIES) is None
+
+
+def test_small_talk():
+    responder = FastPathResponder()
+
+    assert responder.match("agent:a", "merhaba").kind == "greeting"
+    assert responder.match("agent:a", "thanks a lot").answer.startswith("You're welcome")
+
+
+def test_indexes_are_bounded_lru():
+    responder = FastPathResponder(threshold=0.9, max_indexes=2)
+    for owner in ("product:a", "product:b"):
+        responder.match(owner, "What is the price?", FAQ_ENTRIES)
+    responder.match("product:a", "What is the price?", FAQ_ENTRIES)
+    responder.match("product:c", "What is the price?", FAQ_ENTRIES)
+
+    assert list(responder._indexes) == ["product:a", "product:c"]
+    # An evicted owner is rebuilt on its next lookup
+    assert responder.match("product:b", "What is the price?", FAQ_ENTRIES).answer == "short"
@@ -0,0 +1,70 @@
+"""
+HyperLogLog and rollup summary tests
+"""
+import time
+
+import numpy as np
+
+from agent.analytics.event_store import EventStore
+from agent.analytics.events import InteractionEvent
+from agent.analytics.hyperloglog import HyperLogLog
+
+
+def _sketch(precision, values):
+    sketch = HyperLogLog(precision)
+    for value in values:
+        sketch.add(value)
+    return sketch
+
+
+def test_reduced_matches_native_lower_precision():
+    for n in (50, 5000):
+        values = [f"user-{i}" for i in range(n)]
+        reduced = _sketch(14, values).reduced(10)
+        native = _sketch(10, values)
+        assert reduced.count() == native.count()
+        assert reduced.to_dict() == native.to_dict()
+
+
+def test_mixed_precision_merge_uses_lower_precision():
+    fine = _sketch(10, (f"a-{i}" for i in range(3000)))
+    coarse = _sketch(14, (f"b-{i}" for i in range(3000)))
+    coarse.merge(fine)
+
+    assert coarse.precision == 10
+    assert abs(coarse.count() - 6000) / 6000 < 0.1
+
+
+def test_dense_merge_is_register_max():
+    left = _sketch(10, (f"x-{i}" for i in range(2000)))
+    right = _sketch(10, (f"y-{i}" for i in range(2000)))
+    expected = np.maximum(left._dense, right._dense)
+    left.merge(right)
+    assert np.array_equal(left._dense, expected)
+
+
+def test_round_trip_and_legacy_data():
+    sketch = _sketch(10, (str(i) for i in range(1000)))
+    restored = HyperLogLog.from_dict(sketch.to_dict())
+    assert restored.precision == 10
+    assert restored.count() == sketch.count()
+
+    legacy = HyperLogLog.from_dict({"sparse": {"3": 2}})
+    assert legacy.precision == HyperLogLog.PRECISION
+    assert HyperLogLog.from_dict(None, precision=10).precision == 10
+
+
+def test_summary_figures_cover_the_same_events(tmp_path):
+    store = EventStore(str(tmp_path / "events.db"), flush_interval=60)
+    now = time.time()
+    for i in range(10):
+        store.record(InteractionEvent(
+            kind="chat", agent_id="hll", session_id=f"s{i % 4}", user_id=f"u{i % 3}",
+            ts=now, latency_ms=100.0
+        ))
+
+    summary = store.summarize(now - 1, now + 1, kinds=["chat"], agent_id="hll")
+    assert summary["count"] == 10
+    assert summary["sessions"] == 4
+    assert summary["users"] == 3
+    assert summary["avg_latency_ms"] == 100.0
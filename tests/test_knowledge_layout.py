@@ -0,0 +1,52 @@
+"""
+Sharded knowledge layout tests
+"""
+import pytest
+
+from agent.knowledge_base.knowledge_manager import KnowledgeManager
+from tests.embeddings import HashEmbedding
+
+
+@pytest.fixture(params=["chroma", "mmap"])
+def manager(request, tmp_path):
+    manager = KnowledgeManager(
+        persist_directory=str(tmp_path), layout="sharded", shards=1, backend=request.param
+    )
+    manager.embedding_function = HashEmbedding()
+    return manager
+
+
+def _ids(manager, collection_name):
+    collection, where = manager.scoped_collection(collection_name)
+    return set(collection.get(where=where, include=[])["ids"])
+
+
+def test_tenants_share_a_shard(manager):
+    assert manager.physical_name("agent_a") == manager.physical_name("agent_b")
+
+
+def test_delete_document_stays_in_its_tenant(manager):
+    doc_a = manager.add_document("agent_a", "Tenant A pricing sheet")
+    manager.add_document("agent_b", "Tenant B pricing sheet")
+    b_before = _ids(manager, "agent_b")
+
+    # Another tenant cannot delete A's document by id
+    assert manager.delete_document("agent_b", doc_a) == 0
+    assert _ids(manager, "agent_a")
+
+    assert manager.delete_document("agent_a", doc_a) == 1
+    assert _ids(manager, "agent_a") == set()
+    assert _ids(manager, "agent_b") == b_before
+
+
+def test_delete_collection_keeps_other_tenants(manager):
+    manager.add_document("agent_a", "Tenant A manual")
+    manager.add_document("agent_b", "Tenant B manual")
+    b_before = _ids(manager, "agent_b")
+
+    manager.delete_collection("agent_a")
+
+    assert _ids(manager, "agent_a") == set()
+    assert _ids(manager, "agent_b") == b_before
+    assert manager.search("agent_a", "manual") == ""
+    assert manager.search("agent_b", "manual") == "Tenant B manual"
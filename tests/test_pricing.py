@@ -0,0 +1,41 @@
+"""
+Pricing tests
+"""
+import random
+
+import numpy as np
+import pytest
+
+from agent.config_manager.pricing import PricingCatalog, round_cents
+from benchmarks.pricing_benchmark import FRACTIONAL_CATALOG, check_equivalence
+
+
+@pytest.fixture
+def table():
+    return PricingCatalog(FRACTIONAL_CATALOG).table()
+
+
+def test_half_cent_rounds_up(table):
+    # 149.99 * 1.5 = 224.985
+    assert table.price("large", [], []) == 224.99
+    assert table.price_many(["large"], [[]], [[]]).tolist() == [224.99]
+    assert table.price_grid(["large"], [[]], [[]]).item() == 224.99
+
+
+def test_scalar_many_and_grid_agree_with_non_integer_prices(table):
+    assert check_equivalence(table, random.Random(7), size=5000)
+
+
+def test_default_catalog_agrees():
+    assert check_equivalence(PricingCatalog().table(), random.Random(7), size=2000)
+
+
+def test_product_overrides_extend_default_prices():
+    catalog = PricingCatalog({"products": {"p1": {"base_price": 10.0, "feature_prices": {"sso": 40.0}}}})
+
+    assert catalog.quote("p1", {"scale": "standard", "features": ["sso", "api"]}) == 60.0
+    assert catalog.quote("unknown", {"features": ["sso"]}) == 109.0
+
+
+def test_round_cents():
+    assert np.array_equal(round_cents(np.array([0.5, 1.49, 22498.5])), np.array([0.01, 0.01, 224.99]))
@@ -0,0 +1,36 @@
+"""
+Bulk pricing API tests
+"""
+import json
+
+
+def _lines(response):
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+def test_explicit_configurations(client):
+    response = client.post("/api/v1/agent/pricing/quotes", json={
+        "product_id": "p1",
+        "configurations": [{"scale": "small"}, {"features": ["api"], "api_integrations": ["slack"]}]
+    })
+
+    assert response.status_code == 200
+    assert response.headers["X-Quote-Count"] == "2"
+    assert _lines(response) == [{"index": 0, "price": 49.5}, {"index": 1, "price": 129.0}]
+
+
+def test_grid(client):
+    response = client.post("/api/v1/agent/pricing/quotes", json={
+        "product_id": "p1", "scales": ["small", "large"], "feature_sets": [[], ["api"]]
+    })
+
+    assert response.status_code == 200
+    assert [line["price"] for line in _lines(response)] == [49.5, 59.5, 198.0, 208.0]
+
+
+def test_malformed_configuration_is_rejected(client):
+    for configuration in ({"scale": ["large"]}, {"features": "api"}, "standard"):
+        response = client.post("/api/v1/agent/pricing/quotes", json={
+            "product_id": "p1", "configurations": [configuration]
+        })
+        assert response.status_code == 422, configuration
@@ -0,0 +1,20 @@
+"""
+Quantizer tests
+"""
+import numpy as np
+
+from agent.knowledge_base.quantization import DECODE_CHUNK, ScalarQuantizer
+
+
+def test_int8_distances_match_full_decode():
+    rng = np.random.default_rng(0)
+    vectors = rng.normal(size=(DECODE_CHUNK * 2 + 17, 16)).astype(np.float32)
+    quantizer = ScalarQuantizer.fit(vectors)
+    codes = quantizer.encode(vectors)
+    queries = rng.normal(size=(3, 16)).astype(np.float32)
+
+    expected = ((queries[:, None, :] - quantizer.decode(codes)[None, :, :]) ** 2).sum(axis=2)
+    distances = quantizer.distances(queries, codes)
+
+    assert distances.shape == (3, len(vectors))
+    np.testing.assert_allclose(distances, expected, rtol=1e-4, atol=1e-3)
@@ -0,0 +1,45 @@
+"""
+Rate limiting tests
+"""
+from starlette.requests import Request
+
+from api import dependencies
+from api.dependencies import client_key
+from core.rate_limit import TokenBucketLimiter
+
+
+def _request(api_key=None, host="203.0.113.7"):
+    headers = [(b"x-api-key", api_key.encode())] if api_key else []
+    return Request({"type": "http", "headers": headers, "client": (host, 50000)})
+
+
+def test_bucket_exhausts_and_reports_retry_after():
+    limiter = TokenBucketLimiter(capacity=2, window=60)
+
+    assert [limiter.take("a").allowed for _ in range(3)] == [True, True, False]
+    assert limiter.take("a").retry_after >= 1
+    assert limiter.take("b").allowed
+
+
+def test_buckets_are_bounded_lru():
+    limiter = TokenBucketLimiter(capacity=1, window=3600, max_clients=3)
+    for key in ("a", "b", "c"):
+        limiter.take(key)
+    limiter.take("a")           # refresh a: b is now least recently seen
+    limiter.take("d")
+
+    assert list(limiter._buckets) == ["c", "a", "d"]
+    assert not limiter.take("a").allowed
+
+
+def test_unknown_api_keys_fall_back_to_client_address():
+    assert client_key(_request()) == "ip:203.0.113.7"
+    assert client_key(_request("random-1")) == client_key(_request("random-2")) == "ip:203.0.113.7"
+
+
+def test_configured_api_key_identifies_caller(monkeypatch):
+    monkeypatch.setattr(dependencies, "_API_KEY_DIGESTS", frozenset({dependencies._digest("team-key")}))
+
+    key = client_key(_request("team-key"))
+    assert key.startswith("key:") and "team-key" not in key
+    assert client_key(_request("team-key", host="198.51.100.1")) == key
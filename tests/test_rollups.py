@@ -0,0 +1,51 @@
+"""
+Rollup engine tests
+"""
+import sqlite3
+import threading
+import time
+
+import pytest
+
+from agent.analytics.events import InteractionEvent
+from agent.analytics.rollups import RollupEngine
+
+
+@pytest.fixture
+def conn(tmp_path):
+    conn = sqlite3.connect(str(tmp_path / "rollups.db"), check_same_thread=False)
+    yield conn
+    conn.close()
+
+
+def _events(now):
+    for agent, kind, count in (("a", "chat", 3), ("a", "configure", 1), ("b", "chat", 5), (None, "upload", 2)):
+        for i in range(count):
+            yield InteractionEvent(kind=kind, agent_id=agent, session_id=f"{agent}-{i}", ts=now, latency_ms=10.0)
+
+
+def test_queries_by_agent_and_kind(conn):
+    engine = RollupEngine(conn, threading.Lock())
+    now = time.time()
+    engine.add_events(_events(now))
+
+    assert engine.query(now - 60, now + 60).count == 11
+    assert engine.query(now - 60, now + 60, "a").count == 4
+    assert engine.query(now - 60, now + 60, "a", ["chat"]).count == 3
+    assert engine.query(now - 60, now + 60, kinds=["chat", "missing"]).count == 8
+    assert engine.distinct(now - 60, now + 60, "b", ["chat"])["sessions"] == 5
+    assert engine.active_agents(now - 60, now + 60) == 2
+    assert engine.top_agents(now - 60, now + 60, 5, ["chat"]) == ["b", "a"]
+
+
+def test_persisted_buckets_reload(conn):
+    lock = threading.Lock()
+    engine = RollupEngine(conn, lock)
+    now = time.time()
+    engine.add_events(_events(now))
+    engine.persist()
+    conn.commit()
+
+    reloaded = RollupEngine(conn, lock)
+    assert reloaded.query(now - 60, now + 60, "a", ["configure"]).count == 1
+    assert reloaded.query(now - 60, now + 60).count == 11
@@ -0,0 +1,27 @@
+"""
+Percentile tests
+"""
+import pytest
+
+from agent.scheduler.llm_scheduler import _percentile
+from benchmarks.report import percentile as report_percentile
+from core.stats import percentile
+
+
+@pytest.mark.parametrize("q, expected", [(0.0, 1), (0.01, 1), (0.07, 7), (0.5, 50), (0.95, 95), (0.99, 99), (1.0, 100)])
+def test_nearest_rank(q, expected):
+    assert percentile(list(range(1, 101)), q) == expected
+
+
+def test_small_samples():
+    assert percentile([], 0.5) == 0.0
+    assert percentile([3.0], 0.99) == 3.0
+    assert percentile([1.0, 2.0], 0.5) == 1.0
+    assert percentile([1.0, 2.0, 3.0, 4.0], 0.5) == 2.0
+
+
+def test_report_and_scheduler_share_the_definition():
+    samples = [0.1 * i for i in range(1, 21)]
+    for q in (0.5, 0.95, 0.99):
+        assert report_percentile(samples, q) == round(percentile(samples, q), 2)
+        assert _percentile(samples, q) == round(percentile(samples, q), 4)
@@ -0,0 +1,82 @@
+"""
+Memory-mapped vector store tests
+"""
+import json
+import threading
+
+import numpy as np
+import pytest
+
+from agent.knowledge_base.vector_store import MmapVectorClient
+
+
+def _vectors(count, dims=8, seed=0):
+    return np.random.default_rng(seed).normal(size=(count, dims)).astype(np.float32)
+
+
+@pytest.fixture
+def collection(tmp_path):
+    client = MmapVectorClient(str(tmp_path))
+    collection = client.get_or_create_collection("docs")
+    collection.add(ids=[f"c{i}" for i in range(5)], embeddings=_vectors(5).tolist(),
+                   metadatas=[{"n": i} for i in range(5)], documents=[f"doc {i}" for i in range(5)])
+    return collection
+
+
+def test_query_returns_nearest(collection):
+    result = collection.query(query_embeddings=_vectors(5)[2:3].tolist(), n_results=1)
+
+    assert result["ids"] == [["c2"]]
+
+
+def test_rows_committed_before_state_are_ignored(tmp_path, collection):
+    # A writer died (or is still running) between the SQLite commit and state.json
+    collection._conn.execute(
+        "INSERT INTO rows (row, id, document, metadata) VALUES (?, ?, ?, ?)", (5, "c5", "doc 5", "{}")
+    )
+    collection._conn.commit()
+
+    reader = MmapVectorClient(str(tmp_path)).get_or_create_collection("docs")
+    assert reader.count() == 5
+    assert len(reader.get()["ids"]) == 5
+
+    # The next writer reuses the orphaned slot
+    reader.add(ids=["c5", "c6"], embeddings=_vectors(2, seed=1).tolist(), documents=["new 5", "new 6"])
+    reader.upsert(ids=["c7"], embeddings=_vectors(1, seed=2).tolist(), documents=["new 7"])
+    assert reader.count() == 8
+    assert reader.get(ids=["c5"])["documents"] == ["new 5"]
+
+
+def test_reader_reload_waits_for_writer(tmp_path, collection):
+    reader = MmapVectorClient(str(tmp_path)).get_or_create_collection("docs")
+    assert reader.count() == 5
+    seen, errors = [], []
+
+    def read():
+        try:
+            seen.append(len(reader.get()["ids"]))
+        except Exception as e:
+            errors.append(e)
+
+    write_state = collection._write_state
+
+    def write_state_after_reader():
+        # Rows are committed, state.json still says 5 rows: the reader's
+        # reload must not interleave here
+        bump = json.loads((collection.path / "state.json").read_text())
+        bump["generation"] += 1
+        (collection.path / "state.json").write_text(json.dumps(bump))
+        thread = threading.Thread(target=read)
+        thread.start()
+        thread.join(timeout=0.5)
+        assert thread.is_alive(), "reader reloaded while the writer held the lock"
+        write_state()
+        threads.append(thread)
+
+    threads = []
+    collection._write_state = write_state_after_reader
+    collection.add(ids=["c5", "c6"], embeddings=_vectors(2, seed=1).tolist(), documents=["a", "b"])
+    threads[0].join(timeout=5)
+
+    assert not errors
+    assert seen == [7]